@@ -0,0 +1,147 @@
+import os
+import subprocess
+from random import Random
+from typing import List
+from lib.db.db import DBManager
+from lib.db.entity.user import UsersManager, RolesManager
+from lib.db.entity.task import TasksManager, TaskStatusManager, TaskAssignmentsManager, TaskTaskLabelPivotManager, \
+    TaskLabelsManager, TodoItemsManager
+
+
+class BenchmarkProject:
+    """
+    Database with generated data and its entities managers, used by benchmarks
+
+    """
+
+    PM_EMAIL: str = "pm@email.com"
+    PM_PASSWORD: str = "psw"
+
+    def __init__(self, directory: str, n_users: int = 20, n_tasks: int = 1000, seed: int = 0):
+        self.db_manager = DBManager.creating_database(os.path.join(directory, "database.db"))
+        self.db_manager.generate_base_db_structure(strict=True)
+
+        self.task_status_manager = TaskStatusManager(self.db_manager)
+        self.todo_items_manager = TodoItemsManager(self.db_manager)
+        self.task_assignment_manager = TaskAssignmentsManager(self.db_manager)
+        self.task_task_label_pivot_manager = TaskTaskLabelPivotManager(self.db_manager)
+        self.task_labels_manager = TaskLabelsManager(self.db_manager)
+        self.tasks_manager = TasksManager(self.db_manager, self.task_assignment_manager,
+                                          self.task_task_label_pivot_manager)
+        self.users_manager = UsersManager(self.db_manager)
+        self.roles_manager = RolesManager(self.db_manager)
+
+        self.fill(n_users, n_tasks, seed)
+
+    def fill(self, n_users: int, n_tasks: int, seed: int) -> None:
+        """
+        Fill database with random (but reproducible) data
+
+        :param n_users:
+        :param n_tasks:
+        :param seed:
+        :return:
+        """
+
+        rnd = Random(seed)
+        connection = self.db_manager.connection
+
+        connection.executemany("Insert Into user (username, email, password, avatar_hex_color, role_id) Values (?, ?, ?, ?, ?)",
+                               [(f"user{n}", f"user{n}@email.com", "psw", "#cfcfcf", rnd.randint(1, 4)) for n in range(1, n_users + 1)])
+
+        connection.executemany("Insert Into task (name, description, priority, author_id, task_status_id) Values (?, ?, ?, ?, ?)",
+                               [(f"Task {n}", "description " * 20, rnd.randint(1, 20), rnd.randint(1, n_users), rnd.randint(1, 8))
+                                for n in range(1, n_tasks + 1)])
+
+        connection.executemany("Insert Into task_assignment (task_id, user_id) Values (?, ?)",
+                               [(t, rnd.randint(1, n_users)) for t in range(1, n_tasks + 1) for _ in range(rnd.randint(1, 4))])
+
+        connection.executemany("Insert Into task_task_label_pivot (task_id, task_label_id) Values (?, ?)",
+                               [(t, rnd.randint(1, 4)) for t in range(1, n_tasks + 1)])
+
+        connection.commit()
+
+    @classmethod
+    def generated(cls, directory: str, n_tasks: int, seed: int = 0) -> 'BenchmarkProject':
+        """
+        Project with a project manager (PM_EMAIL, PM_PASSWORD) and a dataset of n_tasks tasks generated by Demo.populate
+
+        :param directory:
+        :param n_tasks:
+        :param seed:
+        :return:
+        """
+
+        from lib.app.service.demo import Demo
+
+        project = cls(directory, n_users=0, n_tasks=0, seed=seed)
+
+        project.users_manager.create_from_dict({"username": "pm", "email": cls.PM_EMAIL, "password": cls.PM_PASSWORD,
+                                                "role_id": project.db_manager.project_manager_role_id})
+
+        Demo.populate(project.db_manager, n_tasks, seed=seed)
+
+        return project
+
+    def close(self) -> None:
+        self.db_manager.close_connection()
+
+
+def generate_repo(directory: str, n_commits: int, n_branches: int = 8, merge_every: int = 20, tag_every: int = 500,
+                  seed: int = 0) -> str:
+    """
+    Generate a git repository with n_commits commits spread on branches (with merges in main and tags),
+    using git fast-import, so also big repositories are generated in few seconds
+
+    :param directory: directory in which repository is initialized
+    :param n_commits:
+    :param n_branches: branches other than main
+    :param merge_every: a branch is merged in main every N commits
+    :param tag_every: a tag is created every N commits
+    :param seed:
+    :return: repository path
+    """
+
+    rnd = Random(seed)
+
+    subprocess.run(["git", "init", "-q", "-b", "main", directory], check=True)
+
+    branches: List[str] = ["main"] + [f"feature-{n}" for n in range(n_branches)]
+    tips = dict()       # branch - mark of its last commit
+    base_timestamp = 1600000000
+
+    stream: List[str] = []
+    for n in range(1, n_commits + 1):
+        branch = "main" if n == 1 or n % merge_every == 0 else rnd.choice(branches)
+        parent = tips.get(branch, tips.get("main"))
+
+        merge = None
+        if n % merge_every == 0 and len(tips) > 1:
+            merge = tips[rnd.choice([b for b in tips.keys() if b != "main"])]
+
+        author = f"user{rnd.randint(1, 10)}"
+        message = f"commit {n} on {branch}\n"
+        content = f"{n}\n"
+
+        stream.append(f"commit refs/heads/{branch}\nmark :{n}\n")
+        stream.append(f"author {author} <{author}@email.com> {base_timestamp + n * 60} +0000\n")
+        stream.append(f"committer {author} <{author}@email.com> {base_timestamp + n * 60} +0000\n")
+        stream.append(f"data {len(message)}\n{message}")
+
+        if parent is not None:
+            stream.append(f"from :{parent}\n")
+
+        if merge is not None and merge != parent:
+            stream.append(f"merge :{merge}\n")
+
+        stream.append(f"M 644 inline {branch}.txt\ndata {len(content)}\n{content}\n")
+
+        if n % tag_every == 0:
+            stream.append(f"reset refs/tags/v{n // tag_every}\nfrom :{n}\n\n")
+
+        tips[branch] = n
+
+    subprocess.run(["git", "fast-import", "--quiet"], input="".join(stream).encode(), cwd=directory, check=True)
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=directory, check=True)
+
+    return directory
@@ -0,0 +1,67 @@
+"""
+RPC latency (to_dict wrapper on all tasks with relations) for large payloads with verbose on and off
+
+Usage: python -m benchmark.logger_benchmark [n_tasks]
+"""
+
+import io
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from statistics import median
+from time import perf_counter
+from lib.utils.logger import Logger
+from lib.utils.mixin.dcparser import to_dict
+from benchmark.fixtures import BenchmarkProject
+
+REPETITIONS = 10
+
+
+def eager_to_dict(method, verbose: bool = False):
+    """
+    to_dict wrapper which renders message before Logger call (old behaviour), used as reference
+    """
+
+    def wrapper(*args, **kwargs):
+        data_to_dict = [item.to_dict() for item in method(*args, **kwargs)]
+
+        Logger.log(msg=f"convert data to_dict: {data_to_dict}", is_verbose=verbose)
+
+        return data_to_dict
+
+    return wrapper
+
+
+def measure(rpc) -> float:
+    """
+    Return median latency (ms) of rpc, stdout is discarded
+    """
+
+    times = []
+    for _ in range(REPETITIONS):
+        with redirect_stdout(io.StringIO()):
+            start = perf_counter()
+            rpc()
+            times.append((perf_counter() - start) * 1000)
+
+    return median(times)
+
+
+def main(n_tasks: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        project = BenchmarkProject(directory, n_tasks=n_tasks)
+
+        payload = to_dict(project.tasks_manager.all_as_model)()
+        print(f"payload: {n_tasks} tasks, {len(str(payload)) // 1024} KB")
+
+        for name, wrapper in (("lazy", to_dict), ("eager", eager_to_dict)):
+            for verbose in (False, True):
+                latency = measure(wrapper(project.tasks_manager.all_as_model, verbose))
+
+                print(f"{name:<6} verbose={str(verbose):<5} median latency: {latency:.2f} ms")
+
+        project.close()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
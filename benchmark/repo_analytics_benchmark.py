@@ -0,0 +1,76 @@
+"""
+Time of commits analytics on columns of synthetic commits (default 10k, 100k and 500k commits):
+building columns (once for each refs change) and each aggregation.
+
+Usage: python -m benchmark.repo_analytics_benchmark [n_commits ...]
+"""
+
+import sys
+import random
+from datetime import datetime, timezone, timedelta
+from time import perf_counter
+from typing import List, Dict
+from lib.repo.record import CommitRecord
+from lib.repo.analytics import CommitColumns
+
+
+N_AUTHORS: int = 50
+N_REFS: int = 20
+
+
+def generate_records(n_commits: int, seed: int = 0) -> tuple:
+    """
+    Return synthetic commits (with diff stats), refs and membership bits
+    """
+
+    rnd = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp()
+    zones = [timezone(timedelta(hours=h)) for h in (-5, 0, 1, 2, 9)]
+
+    records: List[CommitRecord] = []
+    bits: Dict[str, int] = dict()
+    for i in range(n_commits):
+        timestamp = int(start + i * 600 + rnd.randrange(600))
+        author = rnd.randrange(N_AUTHORS)
+        hexsha = f"{i:040x}"
+
+        records.append(CommitRecord(hexsha=hexsha, parents=[], author_email=f"author{author}@example.com",
+                                    author_name=f"Author {author}", message="",
+                                    committed_at=datetime.fromtimestamp(timestamp, tz=rnd.choice(zones)).isoformat(),
+                                    committed_date=timestamp, additions=rnd.randrange(200), deletions=rnd.randrange(100),
+                                    files_changed=rnd.randrange(1, 10)))
+
+        bits[hexsha] = 1 | 1 << rnd.randrange(1, N_REFS)      # main and a branch
+
+    return records, ["main"] + [f"branch{i}" for i in range(1, N_REFS)], bits
+
+
+def timed(fn) -> float:
+    start = perf_counter()
+    fn()
+
+    return (perf_counter() - start) * 1000
+
+
+def main(*sizes: int) -> None:
+    for n_commits in sizes or (10000, 100000, 500000):
+        records, refs, bits = generate_records(n_commits)
+
+        columns: List[CommitColumns] = []
+        line = f"{n_commits:>7} commits  columns: {timed(lambda: columns.append(CommitColumns(records, refs, bits))):8.1f} ms"
+
+        aggregations = {
+            "per author per day": lambda: columns[0].commits_per_author_per_day(),
+            "branches": lambda: columns[0].branch_activity(),
+            "churn by day": lambda: columns[0].churn(by="day"),
+            "hour of week": lambda: columns[0].hour_of_week(),
+        }
+
+        for name, aggregation in aggregations.items():
+            line += f"  {name}: {timed(aggregation):7.1f} ms"
+
+        print(line)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Throughput of RepoManager backends to read commits (records per second) on generated repositories
+(default 1k, 10k and 50k commits): GitPython Commit objects against one streamed git log subprocess.
+
+Usage: python -m benchmark.repo_backend_benchmark [n_commits ...]
+"""
+
+import sys
+import tempfile
+from time import perf_counter
+from lib.repo.repo import RepoManager
+from benchmark.fixtures import generate_repo
+
+
+def read_all(directory: str, backend: str) -> float:
+    """
+    Return seconds to read all commits with backend
+    """
+
+    repo_manager = RepoManager(project_path=directory, backend=backend)
+    repo_manager.open_repo(directory)
+
+    start = perf_counter()
+    n = sum(1 for _ in repo_manager.iter_records(["--all"], []))
+    elapsed = perf_counter() - start
+
+    repo_manager.repo.close()
+
+    assert n > 0
+
+    return elapsed
+
+
+def main(*sizes: int) -> None:
+    for n_commits in sizes or (1000, 10000, 50000):
+        with tempfile.TemporaryDirectory() as directory:
+            generate_repo(directory, n_commits)
+
+            line = f"{n_commits:>7} commits"
+
+            for backend in (RepoManager.BACKEND_GITPYTHON, RepoManager.BACKEND_GIT_LOG):
+                elapsed = read_all(directory, backend)
+                line += f"  {backend}: {elapsed:8.2f} s ({n_commits / elapsed:>9.0f} commits/s)"
+
+            print(line)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
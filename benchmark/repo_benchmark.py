@@ -0,0 +1,118 @@
+"""
+RepoManager.get_commits and get_tree (with its serialization) time on generated repositories (default 1k, 10k and 50k commits).
+Old quadratic algorithm is measured too on repositories up to QUADRATIC_MAX_COMMITS commits
+
+JSON payload size of nested nodes and flat graph is printed too, as well as get_commits time with the persistent
+commits cache: first run (cold, the cache is filled), re-opened project (warm) and after one new commit (incremental).
+
+Usage: python -m benchmark.repo_benchmark [n_commits ...]
+"""
+
+import os
+import sys
+import json
+import tempfile
+from time import perf_counter
+from typing import List
+from lib.repo.repo import RepoManager, RepoNode
+from lib.settings.settings import SettingsBase
+from benchmark.fixtures import generate_repo
+
+QUADRATIC_MAX_COMMITS = 2000
+
+
+def quadratic_commits(repo_manager: RepoManager) -> List[RepoNode]:
+    """
+    Old get_commits elaboration: children of each commit are searched in all later commits, used as reference
+    """
+
+    _, context = repo_manager.read_commits()
+
+    commits = sorted(repo_manager.repo.iter_commits('--all', reverse=True), key=lambda c: c.committed_datetime)
+
+    nodes = []
+    for i in range(len(commits)):
+        node = RepoNode.from_commit(commits[i], context=context)
+
+        for j in range(i, len(commits)):
+            if node.hexsha in (parent.hexsha for parent in commits[j].parents):
+                node.add_child(RepoNode.from_commit(commits[j], context=context))
+
+        nodes.append(node)
+
+    return nodes
+
+
+def timed_commits(directory: str) -> float:
+    """
+    Return get_commits time of a new RepoManager on directory
+    """
+
+    repo_manager = RepoManager(project_path=directory)
+    repo_manager.open_repo(directory)
+
+    start = perf_counter()
+    repo_manager.get_commits()
+    elapsed = perf_counter() - start
+
+    repo_manager.repo.close()
+
+    return elapsed
+
+
+def cached_commits(directory: str) -> str:
+    """
+    Return get_commits times with the persistent commits cache
+    """
+
+    os.mkdir(os.path.join(directory, SettingsBase.WORK_DIRECTORY_NAME))
+
+    cold = timed_commits(directory)
+    warm = timed_commits(directory)
+
+    repo_manager = RepoManager(project_path=directory)
+    repo_manager.open_repo(directory)
+    repo_manager.repo.index.commit("new commit")
+    repo_manager.repo.close()
+
+    incremental = timed_commits(directory)
+
+    return f"cached get_commits: cold {cold:8.2f} s, warm {warm:8.2f} s, incremental {incremental:8.2f} s"
+
+
+def main(*sizes: int) -> None:
+    for n_commits in sizes or (1000, 10000, 50000):
+        with tempfile.TemporaryDirectory() as directory:
+            generate_repo(directory, n_commits)
+
+            repo_manager = RepoManager(project_path=directory)
+            repo_manager.open_repo(directory)
+
+            start = perf_counter()
+            commits = repo_manager.get_commits()
+            linear = perf_counter() - start
+
+            nested_kb = len(json.dumps([node.to_dict() for node in commits])) // 1024
+            flat_kb = len(json.dumps(repo_manager.get_commits(flat=True).to_dict())) // 1024
+
+            start = perf_counter()
+            repo_manager.get_tree().to_dict()
+            tree = perf_counter() - start
+
+            line = f"{n_commits:>7} commits  get_commits: {linear:8.2f} s  get_tree: {tree:8.2f} s"
+
+            if n_commits <= QUADRATIC_MAX_COMMITS:
+                start = perf_counter()
+                quadratic_commits(repo_manager)
+                line += f"  quadratic: {perf_counter() - start:8.2f} s"
+
+            print(line)
+            print(f"{'':>15}repo_commits payload: nested {nested_kb} KB, flat {flat_kb} KB")
+
+            repo_manager.repo.close()
+
+            print(f"{'':>15}{cached_commits(directory)}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""
+Scaling of parallel repo backend (ParallelReader) from 1 to N worker processes (default number of CPUs),
+reading all commits with diff stats of a generated repository (default 20k commits)
+
+Usage: python -m benchmark.repo_parallel_benchmark [n_commits] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+from time import perf_counter
+from lib.repo.ingest import ParallelReader
+from benchmark.fixtures import generate_repo
+
+
+def main(n_commits: int = 20000, max_workers: int = os.cpu_count() or 1) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        generate_repo(directory, n_commits)
+
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            reader = ParallelReader(workers=workers, with_stats=True)
+
+            start = perf_counter()
+            n = sum(1 for _ in reader.read(directory, ["--all"]))
+            elapsed = perf_counter() - start
+
+            baseline = baseline or elapsed
+
+            print(f"{workers:>3} worker(s)  {n} commits in {elapsed:8.2f} s  ({n / elapsed:>8.0f} commits/s, "
+                  f"speedup {baseline / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
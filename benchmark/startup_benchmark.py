@@ -0,0 +1,113 @@
+"""
+Startup cost of CLI commands: import time (sum of self times reported by python -X importtime) and wall time of
+the process, median of several runs. 'init' and 'run' execute the real commands through COMMAND_SCRIPT, with a
+temporary settings file (settings of repository are not touched): 'init' initializes a temporary project, 'run'
+builds AppManager and starts it with eel.start() stubbed (the window is not opened), then closes it.
+
+Results are compared with the recorded ones (benchmark/startup_baseline.json), --record records them.
+
+Usage: python -m benchmark.startup_benchmark [--record] [runs]
+"""
+
+import os
+import sys
+import json
+import statistics
+import shutil
+import subprocess
+import tempfile
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH: str = os.path.join(ROOT, "benchmark", "startup_baseline.json")
+
+# argv: settings path, main.py arguments
+COMMAND_SCRIPT: str = """
+import sys
+import eel
+from lib.settings.settings import SettingsManager
+
+SettingsManager.settings_path = staticmethod(lambda: sys.argv[1])
+eel.start = lambda *args, **kwargs: None
+
+import main
+main.main(sys.argv[2:])
+"""
+
+# {tmp} is replaced with a temporary directory
+COMMANDS: Dict[str, List[str]] = {
+    "version": ["main.py", "version"],
+    "help": ["main.py", "help"],
+    "init": ["-c", COMMAND_SCRIPT, "{tmp}/settings.json", "main.py", "init", "-f", "{tmp}/project"],
+    "run": ["-c", COMMAND_SCRIPT, "{tmp}/settings.json", "main.py", "run"],
+}
+
+
+def import_time(stderr: str) -> int:
+    """
+    Return total import time (microseconds) of -X importtime output
+    """
+
+    total = 0
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            total += int(line.split("|")[0].removeprefix("import time:").strip())
+
+    return total
+
+
+def measure(args: List[str]) -> Tuple[float, float]:
+    """
+    Return import time and wall time (milliseconds) of a process
+    """
+
+    start = perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True, text=True,
+                             check=True)
+    wall = (perf_counter() - start) * 1000
+
+    return import_time(process.stderr) / 1000, wall
+
+
+def main(*args: str) -> None:
+    record = "--record" in args
+    runs = next((int(arg) for arg in args if arg.isdigit()), 5)
+
+    baseline: Dict[str, Dict[str, float]] = dict()
+    if os.path.isfile(BASELINE_PATH):
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+
+    tmp_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(tmp_dir, "project"))
+
+    results: Dict[str, Dict[str, float]] = dict()
+    for command, command_args in COMMANDS.items():
+        command_args = [arg.replace("{tmp}", tmp_dir) for arg in command_args]
+        samples = [measure(command_args) for _ in range(runs)]
+
+        results[command] = {
+            "import_ms": round(statistics.median(sample[0] for sample in samples), 1),
+            "wall_ms": round(statistics.median(sample[1] for sample in samples), 1),
+        }
+
+        line = f"{command:>8}  imports: {results[command]['import_ms']:8.1f} ms  wall: {results[command]['wall_ms']:8.1f} ms"
+
+        if command in baseline:
+            line += f"  (recorded: {baseline[command]['import_ms']:8.1f} ms, {baseline[command]['wall_ms']:8.1f} ms)"
+
+        print(line)
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if record:
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+
+        print(f"recorded in '{BASELINE_PATH}'")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,340 @@
+"""
+Benchmark suite of hot paths, on generated data (Demo.populate) and generated git repositories:
+entities reads and writes, dashboard data (both permission modes), serialization of big lists, repository commits and
+tree, settings load and app startup. Each case is run several times, timings (milliseconds) are written as JSON
+(with commit, python and sizes) so results of different commits can be compared: --compare prints the ratio of each
+case against a previous results file.
+
+Usage: python -m benchmark.suite [--tasks N] [--commits N] [--repeats N] [--only PREFIX] [--output PATH] [--compare PATH]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, Any, List, Optional
+from unittest import mock
+from benchmark.fixtures import BenchmarkProject, generate_repo
+from benchmark.startup_benchmark import ROOT, measure as measure_process
+
+
+RESULTS_DIRECTORY: str = os.path.join(ROOT, "benchmark", "results")
+
+WARMUP: int = 1
+FINDS_PER_RUN: int = 200
+CREATES_PER_RUN: int = 50
+
+# AppManager init in a new process (arguments: settings file, which opens project, and output file of timings)
+APP_INIT_SCRIPT: str = """
+import os, sys, json
+from time import perf_counter
+from unittest import mock
+from lib.settings.settings import SettingsManager
+
+mock.patch.object(SettingsManager, "settings_path", return_value=sys.argv[1]).start()
+
+started_at = perf_counter()
+
+from lib.app.app import AppManager
+
+imported_at = perf_counter()
+app = AppManager()
+
+with open(sys.argv[2], "w") as file:
+    json.dump({"import_ms": (imported_at - started_at) * 1000, "init_ms": (perf_counter() - imported_at) * 1000,
+               **app.startup_timings}, file)
+
+os._exit(0)
+"""
+
+
+def summary(samples: List[float], **extra: Any) -> Dict[str, Any]:
+    """
+    Return statistics (milliseconds) of samples
+    """
+
+    ordered = sorted(samples)
+
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))], 3),
+        "runs": len(ordered),
+        **extra,
+    }
+
+
+class Suite:
+    """
+    Cases of benchmark and their results
+    """
+
+    def __init__(self, repeats: int, only: Optional[str] = None):
+        self.repeats = repeats
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = dict()
+
+    def selected(self, name: str) -> bool:
+        return self.only is None or name.startswith(self.only)
+
+    def case(self, name: str, fn: Callable[[], Any], repeats: Optional[int] = None, **extra: Any) -> None:
+        """
+        Run fn (after WARMUP runs) and record its timings
+
+        :param name:
+        :param fn:
+        :param repeats: runs (default repeats of suite)
+        :param extra: other values recorded with timings (e.g. sizes)
+        :return:
+        """
+
+        if not self.selected(name):
+            return
+
+        for _ in range(WARMUP):
+            fn()
+
+        samples: List[float] = []
+        for _ in range(repeats or self.repeats):
+            start = perf_counter()
+            fn()
+            samples.append((perf_counter() - start) * 1000)
+
+        self.record(name, summary(samples, **extra))
+
+    def record(self, name: str, result: Dict[str, Any]) -> None:
+        self.results[name] = result
+
+        print(f"{name:<40} median: {result['median_ms']:10.2f} ms  p95: {result['p95_ms']:10.2f} ms")
+
+
+def entities_cases(suite: Suite, directory: str, n_tasks: int, seed: int) -> None:
+    from lib.app.service.auth import AuthService
+    from lib.app.service.dashboard import DashboardService
+    from lib.app.service.demo import Demo
+    from lib.utils.mixin.dcparser import to_dict
+
+    project = BenchmarkProject.generated(directory, n_tasks=n_tasks, seed=seed)
+    tasks_manager = project.tasks_manager
+
+    rnd = random.Random(seed)
+    task_ids = [rnd.randint(1, n_tasks) for _ in range(FINDS_PER_RUN)]
+
+    suite.case("entities.all_as_model_with_relations", lambda: tasks_manager.all_as_model(with_relations=True),
+               tasks=n_tasks)
+
+    suite.case("entities.find", lambda: [tasks_manager.find(task_id) for task_id in task_ids], ops=FINDS_PER_RUN)
+
+    def create() -> None:
+        for n in range(CREATES_PER_RUN):
+            tasks_manager.create_from_dict({"name": f"Benchmark task {n}", "description": "description",
+                                            "priority": n % 20, "author_id": 1, "task_status_id": 1})
+
+    suite.case("entities.create_from_dict", create, ops=CREATES_PER_RUN)
+
+    # dashboard of a user who reads all tasks (project manager) and of a user who reads only own tasks
+    auth_service = AuthService(users_manager=project.users_manager, vault_path=os.path.join(directory, "vault.json"))
+    dashboard_service = DashboardService(tasks_manager=tasks_manager, task_status_manager=project.task_status_manager,
+                                         auth_service=auth_service, roles_manager=project.roles_manager)
+
+    teammate = project.db_manager.cursor.execute(f"Select u.email From {project.db_manager.user_table_name} u "
+                                                 f"Join {project.db_manager.role_table_name} r On r.id = u.role_id "
+                                                 f"Where r.permission_read_all = 0 Order By u.id Limit 1").fetchone()
+
+    for mode, email, password in (("read_all", BenchmarkProject.PM_EMAIL, BenchmarkProject.PM_PASSWORD),
+                                  ("own_tasks", teammate["email"], Demo.USERS_PASSWORD)):
+        auth_service.login(email, password)
+
+        suite.case(f"dashboard.get_data.{mode}", dashboard_service.get_data, tasks=len(dashboard_service.get_data().tasks))
+
+        auth_service.logout()
+
+    # serialization of big lists (as exposed methods do)
+    tasks = tasks_manager.all_as_model(with_relations=True)
+
+    suite.case("serialization.to_dict", lambda: [task.to_dict() for task in tasks], tasks=len(tasks),
+               payload_bytes=len(json.dumps(to_dict(lambda: tasks)(), default=str)))
+
+    project.close()
+
+
+def repo_cases(suite: Suite, directory: str, n_commits: int) -> None:
+    from lib.repo.repo import RepoManager
+
+    generate_repo(directory, n_commits)
+
+    def open_manager() -> RepoManager:
+        repo_manager = RepoManager(project_path=directory)
+        repo_manager.open_repo(directory)
+
+        return repo_manager
+
+    def cold(method: str) -> Callable[[], None]:
+        def run() -> None:
+            repo_manager = open_manager()       # no work directory, so no persistent commits cache
+            getattr(repo_manager, method)()
+            repo_manager.close()
+
+        return run
+
+    suite.case("repo.get_commits.cold", cold("get_commits"), commits=n_commits)
+    suite.case("repo.get_tree.cold", cold("get_tree"), commits=n_commits)
+
+    repo_manager = open_manager()
+
+    suite.case("repo.get_commits.warm", repo_manager.get_commits, commits=n_commits)
+    suite.case("repo.get_commits.flat", lambda: repo_manager.get_commits(flat=True).to_dict(), commits=n_commits)
+    suite.case("repo.get_tree.to_dict", lambda: repo_manager.get_tree().to_dict(), commits=n_commits)
+
+    repo_manager.close()
+
+
+def settings_cases(suite: Suite, directory: str) -> None:
+    from lib.file.file_manager import FileManger
+    from lib.settings.settings import SettingsManager
+
+    path = os.path.join(directory, SettingsManager.SETTINGS_FILE_NAME)
+
+    with mock.patch.object(SettingsManager, "settings_path", return_value=path):
+        SettingsManager().flush()       # file is created
+
+        def load() -> None:
+            FileManger.store.invalidate(path)       # file is parsed again
+            SettingsManager()
+
+        suite.case("settings.load", load)
+        suite.case("settings.load.cached", SettingsManager)
+
+
+def startup_cases(suite: Suite, directory: str) -> None:
+    from lib.db.db import DBManager
+    from lib.settings.settings import SettingsManager, SettingsBase
+
+    for command, args in (("version", ["main.py", "version"]), ("app_import", ["-c", "import main; main.app_manager_class()"])):
+        name = f"startup.{command}"
+
+        if suite.selected(name):
+            samples = [measure_process(args) for _ in range(suite.repeats)]
+
+            suite.record(name, summary([wall for _, wall in samples],
+                                       import_ms=round(statistics.median(imports for imports, _ in samples), 3)))
+
+    name = "startup.app_init"
+    if not suite.selected(name):
+        return
+
+    # initialized project (database with base structure) and settings file which opens it
+    project_path = os.path.join(directory, "project")
+    work_dir = os.path.join(project_path, SettingsBase.WORK_DIRECTORY_NAME)
+    os.makedirs(work_dir)
+
+    DBManager.creating_database(SettingsManager.assemble_db_path(work_dir_path=work_dir)).generate_base_db_structure(strict=True)
+
+    settings_path = os.path.join(directory, SettingsManager.SETTINGS_FILE_NAME)
+    with open(settings_path, "w") as file:
+        json.dump({SettingsBase.KEY_PROJECT_PATH: project_path, SettingsBase.KEY_VERBOSE: False}, file)
+
+    timings_path = os.path.join(directory, "timings.json")
+
+    samples: List[Dict[str, float]] = []
+    for _ in range(suite.repeats):
+        subprocess.run([sys.executable, "-c", APP_INIT_SCRIPT, settings_path, timings_path], cwd=ROOT,
+                       capture_output=True, check=True)
+
+        with open(timings_path) as file:
+            samples.append(json.load(file))
+
+    phases = {key: round(statistics.median(sample[key] for sample in samples), 3) for key in samples[0].keys()}
+
+    suite.record(name, summary([sample["import_ms"] + sample["init_ms"] for sample in samples], phases_ms=phases))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+
+    except Exception:
+        return None
+
+
+def compare(results: Dict[str, Dict[str, Any]], path: str) -> None:
+    """
+    Print ratio of median of each case against results file in path (> 1 means slower)
+    """
+
+    with open(path) as file:
+        previous: Dict[str, Dict[str, Any]] = json.load(file)["results"]
+
+    print(f"\ncompared with '{path}':")
+
+    for name, result in results.items():
+        if name not in previous:
+            continue
+
+        ratio = result["median_ms"] / previous[name]["median_ms"] if previous[name]["median_ms"] > 0 else float("inf")
+
+        print(f"{name:<40} {previous[name]['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:.2f}")
+
+
+def main(*args: str) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmark.suite", description="Benchmark suite of hot paths")
+    parser.add_argument("--tasks", type=int, default=2000, help="tasks of generated project")
+    parser.add_argument("--commits", type=int, default=5000, help="commits of generated repository")
+    parser.add_argument("--repeats", type=int, default=5, help="runs of each case")
+    parser.add_argument("--seed", type=int, default=0, help="seed of generated data")
+    parser.add_argument("--only", default=None, help="run only cases which start with this prefix (e.g. 'repo.')")
+    parser.add_argument("--output", default=None, help="results file (default benchmark/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="previous results file to compare with")
+    options = parser.parse_args(args)
+
+    suite = Suite(repeats=options.repeats, only=options.only)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cases, *case_args in (("entities", entities_cases, options.tasks, options.seed),
+                                        ("repo", repo_cases, options.commits),
+                                        ("settings", settings_cases),
+                                        ("startup", startup_cases)):
+            if options.only is None or options.only.split(".")[0] == name:
+                case_directory = os.path.join(directory, name)
+                os.mkdir(case_directory)
+
+                cases(suite, case_directory, *case_args)
+
+    commit = git_commit()
+
+    output = options.output or os.path.join(RESULTS_DIRECTORY, f"{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, "w") as file:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "tasks": options.tasks,
+                "commits": options.commits,
+                "repeats": options.repeats,
+                "seed": options.seed,
+            },
+            "results": suite.results,
+        }, file, indent=4, sort_keys=True)
+
+    print(f"results written in '{output}'")
+
+    if options.compare is not None:
+        compare(suite.results, options.compare)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -1,5 +1,12 @@
 import eel
-from typing import List, Dict, Any
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
 from lib.app.service.auth import AuthService
 from lib.app.service.dashboard import DashboardService
 from lib.db.entity.user import FuturePMData
@@ -9,49 +16,142 @@ from lib.app.service.exposer import ExposerService
 from lib.app.service.demo import Demo
 from lib.utils.utils import Utils
 from lib.settings.settings import SettingsManager
-from lib.utils.constants import PM_EMAIL, PM_USERNAME
+from lib.utils.constants import PM_EMAIL, PM_USERNAME, VERSION
+from lib.db.db import DBManager
+from lib.db.profiler import SqlProfiler, rpc_scope
+from lib.db.entity.user import UsersManager, RolesManager
+from lib.db.entity.task import TasksManager, TaskStatusManager, TaskAssignmentsManager, TaskTaskLabelPivotManager, \
+    TaskLabelsManager, TodoItemsManager
 
 
 class AppManager:
 
     APP_NAME: str = "Taskup"
-    VERSION: str = "1.2.1"
+    VERSION: str = VERSION
     SHUTDOWN_DELAY = 3                  # seconds
     SHUTDOWN_DELAY_IN_DEBUG_MODE = 600  # seconds
+    DEFERRED_JOIN_TIMEOUT: float = 5    # seconds, max wait of deferred startup phase on close
+
+    def __init__(self, headless: bool = False):
+        """
+        Init app in phases: only what first paint of window needs (settings, database, autologin, exposed methods,
+        frontend) is done here. Repository (GitPython import and opening), dashboard service, repository fetching and
+        backups are loaded on first use or in background after start (see start_deferred())
+
+        :param headless: app without GUI (see serve()), frontend is not loaded
+        """
 
-    def __init__(self):
         Logger.log_info(msg=f"{self.APP_NAME} init...", is_verbose=True)
 
-        # instance settings manager to take project configuration settings
-        Logger.log_info(msg="take settings...", is_verbose=True)
-        self.__settings_manager = SettingsManager()     # only one SettingsManager for each App
+        self.__init_started_at: float = time.perf_counter()
+        self.startup_timings: Dict[str, float] = dict()     # phase - milliseconds
+        self.__deferred: Optional[threading.Thread] = None
+        self.__closing = threading.Event()      # deferred startup phase stops at its next step when it is set
+        self.__dashboard_service: Optional[DashboardService] = None
+
+        with self.__phase("settings"):
+            # instance settings manager to take project configuration settings
+            Logger.log_info(msg="take settings...", is_verbose=True)
+            self.__settings_manager = SettingsManager()     # only one SettingsManager for each App
+
+            self.verbose = self.settings_manager.verbose
+
+            self.start_logger()     # from now logs are written in background
+
+            self.start_metrics()    # exposed methods are instrumented
+
+        with self.__phase("project"):
+            # each AppManager has only one ProjectManager, it opens database of current project
+            self.project_manager = ProjectManager(settings_manager=self.settings_manager)
+
+            # opt-in SQL profiler
+            if self.settings_manager.get_setting_by_key(self.settings_manager.KEY_SQL_PROFILER):
+                self.project_manager.db_manager.enable_profiler()
+
+        with self.__phase("auth"):
+            self.auth_service = AuthService(users_manager=self.project_manager.users_manager,
+                                            vault_path=self.settings_manager.vault_path,
+                                            verbose=self.verbose)
+
+        with self.__phase("expose"):
+            self.__expose()     # expose py methods
+
+        if not headless:
+            with self.__phase("frontend"):
+                # init Eel
+                frontend_dir = self.settings_manager.frontend_directory
+
+                Logger.log_info(msg=f"init frontend '{frontend_dir}'@{self.settings_manager.frontend_start}", is_verbose=self.verbose)
+                eel.init(frontend_dir, allowed_extensions=['.html'])  # init eel
+
+        self.startup_timings["init"] = (time.perf_counter() - self.__init_started_at) * 1000
+
+        Logger.log_info(msg="%s init done in %.1f ms", args=(self.APP_NAME, self.startup_timings["init"]), is_verbose=self.verbose)
+
+    @contextmanager
+    def __phase(self, name: str) -> Iterator[None]:
+        """
+        Time a startup phase, elapsed milliseconds are stored in startup_timings and logged
+
+        :param name:
+        :return:
+        """
+
+        started_at = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.startup_timings[name] = (time.perf_counter() - started_at) * 1000
+
+            Logger.log_info(msg="startup phase '%s' done in %.1f ms", args=(name, self.startup_timings[name]),
+                            is_verbose=self.verbose if hasattr(self, "verbose") else True)
+
+    @property
+    def dashboard_service(self) -> DashboardService:
+        """
+        Dashboard service, it is built on first use
+        """
+
+        if self.__dashboard_service is None:
+            self.__dashboard_service = DashboardService(tasks_manager=self.project_manager.tasks_manager,
+                                                        task_status_manager=self.project_manager.task_status_manager,
+                                                        auth_service=self.auth_service,
+                                                        roles_manager=self.project_manager.roles_manager,
+                                                        verbose=self.verbose)
+
+        return self.__dashboard_service
+
+    def __run_deferred(self) -> None:
+        with self.__phase("deferred"):
+            with self.__phase("repo"):
+                # GitPython is imported and repository of current project is opened (commits graph is loaded)
+                self.project_manager.repo_manager.valid_opened_repo()
 
-        self.verbose = self.settings_manager.verbose
+            if self.__closing.is_set():
+                return
 
-        # each AppManager has only one ProjectManager
-        self.project_manager = ProjectManager(settings_manager=self.settings_manager)
+            self.start_repo_fetching()      # remotes of project repository are fetched in background
 
-        self.auth_service = AuthService(users_manager=self.project_manager.users_manager,
-                                        vault_path=self.settings_manager.vault_path,
-                                        verbose=self.verbose)
+            if self.__closing.is_set():
+                return
 
-        self.dashboard_service = DashboardService(tasks_manager=self.project_manager.tasks_manager,
-                                                  task_status_manager=self.project_manager.task_status_manager,
-                                                  auth_service=self.auth_service,
-                                                  roles_manager=self.project_manager.roles_manager,
-                                                  verbose=self.verbose)
+            self.start_backups()        # database of project is backed up in background
 
-        # open project if already initialized
-        if ProjectManager.already_initialized(self.settings_manager.project_directory_path):
-            self.open_project(self.settings_manager.project_directory_path)
+    def start_deferred(self) -> None:
+        """
+        Run deferred startup phase in background: repository loading, repository fetching and database backups.
+        Repository is also loaded on first use if it is requested before
 
-        self.__expose()     # expose py methods
+        :return:
+        """
 
-        # init Eel
-        frontend_dir = self.settings_manager.frontend_directory
+        if self.__deferred is not None:
+            return
 
-        Logger.log_info(msg=f"init frontend '{frontend_dir}'@{self.settings_manager.frontend_start}", is_verbose=self.verbose)
-        eel.init(frontend_dir, allowed_extensions=['.html'])  # init eel
+        self.__deferred = threading.Thread(target=self.__run_deferred, name="startup-deferred", daemon=True)
+        self.__deferred.start()
 
     @classmethod
     def starter(cls) -> 'AppManager':
@@ -67,6 +167,38 @@ class AppManager:
 
         return app
 
+    @classmethod
+    def serve(cls, host: str = "127.0.0.1", port: Optional[int] = None, unix_socket: Optional[str] = None) -> None:
+        """
+        Start application without GUI: exposed methods (the same of Eel, with the same auth) are served by a local
+        HTTP/JSON server until it is interrupted. App is created and called in only one thread, because managers share
+        one database connection
+
+        :param host:
+        :param port: default port of settings
+        :param unix_socket: path of Unix socket to use instead of host and port
+        :return:
+        """
+
+        from lib.app.service.server import RpcServer       # asyncio is imported only in headless mode
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpc")
+
+        app: AppManager = executor.submit(cls, True).result()
+
+        server = RpcServer(ExposerService.rpc_methods, host=host,
+                           port=port if port is not None else int(app.settings_manager.port),
+                           unix_socket=unix_socket, executor=executor, verbose=app.verbose)
+
+        try:
+            app.start_deferred()
+
+            server.run()
+
+        finally:
+            executor.submit(app.close).result()
+            executor.shutdown()
+
     def start(self) -> None:
         """
         Start GUI using eel.start()
@@ -91,6 +223,13 @@ class AppManager:
         try:
             Logger.log_info(msg=f"start app... (mode: {mode})", is_verbose=self.verbose)
 
+            self.start_deferred()
+
+            self.startup_timings["time_to_start"] = (time.perf_counter() - self.__init_started_at) * 1000
+
+            Logger.log_info(msg="window is being opened %.1f ms after init", args=(self.startup_timings["time_to_start"],),
+                            is_verbose=self.verbose)
+
             eel.start(frontend_start, port=port, shutdown_delay=shutdown_delay, mode=mode,
                       cmdline_args=["--disable-translate"])  # start eel: this generates a loop
 
@@ -102,7 +241,8 @@ class AppManager:
             self.close()        # close app manually
 
     @classmethod
-    def demo(cls, project_path: str, force_demo: bool = False, open_app_at_end: bool = True, verbose: bool = False) -> None:
+    def demo(cls, project_path: str, force_demo: bool = False, open_app_at_end: bool = True, verbose: bool = False,
+             scale: Optional[int] = None, seed: int = Demo.SEED, until: Optional[datetime.datetime] = None) -> None:
         """
         Launch demo of app
 
@@ -110,20 +250,175 @@ class AppManager:
         :param project_path:
         :param force_demo:
         :param verbose:
+        :param scale: number of tasks of a generated dataset (None for the small demo)
+        :param seed: seed of generated dataset
+        :param until: end of generated history (default Demo.UNTIL)
         :return:
         """
 
         demo = Demo(project_path=project_path, settings_manager=SettingsManager(), verbose=verbose)
 
-        demo.launch(force_demo=force_demo)
+        demo.launch(force_demo=force_demo, scale=scale, seed=seed, until=until)
 
         if open_app_at_end:
             AppManager.starter()    # launch app
 
+    @classmethod
+    def profile(cls, project_path: str, last: bool = False, n_finds: int = 20, verbose: bool = False) -> None:
+        """
+        Print SQL profiler report of project in path.
+        It runs the main read RPCs against project database with SQL profiler enabled, or (if last)
+        it prints the report saved by the app in work directory
+
+        :param project_path:
+        :param last: print last report saved by app instead of run reads
+        :param n_finds: number of tasks to find one by one
+        :param verbose:
+        :return:
+        """
+
+        project_path = os.path.abspath(project_path)
+
+        if not ProjectManager.already_initialized(project_path, verbose=verbose):
+            Logger.log_error(msg=f"project '{project_path}' is not initialized", is_verbose=True)
+            return
+
+        work_dir = SettingsManager.assemble_work_directory_path(project_path)
+
+        if last:
+            report_path = os.path.join(work_dir, SettingsManager.SQL_PROFILE_FILE_NAME)
+
+            if not os.path.isfile(report_path):
+                Logger.log_warning(msg=f"no report found in '{work_dir}', enable '{SettingsManager.KEY_SQL_PROFILER}' setting",
+                                   is_verbose=True)
+                return
+
+            with open(report_path) as file:
+                print(SqlProfiler.format_report(json.load(file)))
+
+            return
+
+        db_manager = DBManager(db_path=SettingsManager.assemble_db_path(work_dir_path=work_dir), verbose=verbose)
+        profiler = db_manager.enable_profiler()
+
+        task_assignment_manager = TaskAssignmentsManager(db_manager, verbose=verbose)
+        task_task_label_pivot_manager = TaskTaskLabelPivotManager(db_manager, verbose=verbose)
+        tasks_manager = TasksManager(db_manager, task_assignment_manager, task_task_label_pivot_manager, verbose=verbose)
+
+        reads = {
+            "task_all": tasks_manager.all_as_dict,
+            "user_all": UsersManager(db_manager, verbose=verbose).all_as_dict,
+            "role_all": RolesManager(db_manager, verbose=verbose).all_as_dict,
+            "task_status_all": TaskStatusManager(db_manager, verbose=verbose).all_as_dict,
+            "task_label_all": TaskLabelsManager(db_manager, verbose=verbose).all_as_dict,
+            "todo_item_all": TodoItemsManager(db_manager, verbose=verbose).all_as_dict,
+        }
+
+        for alias, read in reads.items():
+            with rpc_scope(alias):
+                read()
+
+        for task in tasks_manager.all_as_dict(with_relations=False)[:n_finds]:
+            with rpc_scope("task_find"):
+                tasks_manager.find(task["id"])
+
+        db_manager.close_connection()
+
+        print(SqlProfiler.format_report(profiler.report()))
+
     @property
     def settings_manager(self) -> SettingsManager:
         return self.__settings_manager
 
+    def start_logger(self) -> None:
+        """
+        Start (or re-configure) background log writer based on settings.
+        Log file is written in work directory of current project (if it is initialized)
+
+        :return:
+        """
+
+        try:
+            sm = self.settings_manager
+
+            log_file_path: str | None = None
+            if sm.get_setting_by_key(sm.KEY_LOG_FILE) and ProjectManager.already_initialized(sm.project_directory_path):
+                log_file_path = sm.log_file_path
+
+            module_levels = {module: Logger.level_by_name(level)
+                             for module, level in sm.get_setting_by_key(sm.KEY_LOG_MODULES).items()}
+
+            Logger.start_writer(level=Logger.level_by_name(sm.get_setting_by_key(sm.KEY_LOG_LEVEL)),
+                                module_levels=module_levels,
+                                log_file_path=log_file_path,
+                                json_lines=bool(sm.get_setting_by_key(sm.KEY_LOG_JSON)),
+                                max_queue_size=int(sm.get_setting_by_key(sm.KEY_LOG_QUEUE_SIZE)),
+                                drop_policy=sm.get_setting_by_key(sm.KEY_LOG_DROP_POLICY))
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to start log writer: {e}", is_verbose=self.verbose)
+
+    def start_metrics(self) -> None:
+        """
+        Enable (or disable) metrics of exposed methods based on settings.
+        Metrics are dumped periodically in work directory of current project (if it is initialized)
+
+        :return:
+        """
+
+        try:
+            sm = self.settings_manager
+
+            ExposerService.metrics.enabled = bool(sm.get_setting_by_key(sm.KEY_METRICS))
+            ExposerService.metrics.verbose = self.verbose
+
+            ExposerService.metrics.stop_periodic_dump()
+
+            interval = float(sm.get_setting_by_key(sm.KEY_METRICS_DUMP_INTERVAL))
+
+            if ExposerService.metrics.enabled and interval > 0:
+                def metrics_file_path() -> str | None:
+                    if ProjectManager.already_initialized(sm.project_directory_path):
+                        return sm.metrics_file_path
+
+                    return None
+
+                ExposerService.metrics.start_periodic_dump(metrics_file_path, interval)
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to start metrics: {e}", is_verbose=self.verbose)
+
+    def start_repo_fetching(self) -> None:
+        """
+        Start background fetch of project repository based on settings
+
+        :return:
+        """
+
+        try:
+            sm = self.settings_manager
+
+            self.project_manager.start_repo_fetching(
+                interval=float(sm.get_setting_by_key(sm.KEY_REPO_FETCH_INTERVAL)),
+                max_interval=float(sm.get_setting_by_key(sm.KEY_REPO_FETCH_MAX_INTERVAL)))
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to start repo fetching: {e}", is_verbose=self.verbose)
+
+    def start_backups(self) -> None:
+        """
+        Start background backups of project database based on settings
+
+        :return:
+        """
+
+        try:
+            self.project_manager.start_backups(
+                interval=float(self.settings_manager.get_setting_by_key(self.settings_manager.KEY_BACKUP_INTERVAL)))
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to start backups: {e}", is_verbose=self.verbose)
+
     def __ng_serve(self) -> None:
         """
         Run ng serve in frontend
@@ -166,7 +461,8 @@ class AppManager:
             Logger.log_error(msg="app exposure error", is_verbose=self.verbose, full=True)
 
         # expose methods
-        exposer = ExposerService(self.project_manager, auth_service=self.auth_service, dashboard_service=self.dashboard_service,
+        exposer = ExposerService(self.project_manager, auth_service=self.auth_service,
+                                 dashboard_service=lambda: self.dashboard_service,
                                  verbose=self.verbose, debug_mode=self.settings_manager.debug_mode)
         exposer.expose_methods()
 
@@ -195,7 +491,12 @@ class AppManager:
         :return:
         """
 
-        return self.project_manager.open(path)
+        res: bool = self.project_manager.open(path)
+
+        if res:
+            self.start_logger()     # log file is moved in work directory of opened project
+
+        return res
 
     @classmethod
     def initializer(cls, project_path: str, open_on_init: bool = False, force_init: bool = False) -> 'AppManager':
@@ -255,8 +556,40 @@ class AppManager:
         try:
             Logger.log_info(msg="request to close app...", is_verbose=self.verbose)
 
+            deferred_running: bool = False
+
+            if self.__deferred is not None:
+                self.__closing.set()
+
+                # repository must not be loaded again after it is closed, but a slow loading doesn't block closing
+                self.__deferred.join(self.DEFERRED_JOIN_TIMEOUT)
+                deferred_running = self.__deferred.is_alive()
+
+                if deferred_running:
+                    Logger.log_warning(msg="repository is still loading after %s seconds, it is abandoned",
+                                       args=(self.DEFERRED_JOIN_TIMEOUT,), is_verbose=self.verbose)
+
+                self.__deferred = None
+
+            if not deferred_running:        # else closing waits for the loading (lock of repository)
+                self.project_manager.close_repos()
+
             self.project_manager.backup_work_dir()
 
+            if ProjectManager.already_initialized(self.settings_manager.project_directory_path):
+                if ExposerService.metrics.enabled:
+                    ExposerService.metrics.dump(self.settings_manager.metrics_file_path)
+
+                profiler = self.project_manager.db_manager.profiler
+                if profiler is not None:
+                    with open(self.settings_manager.sql_profile_path, "w") as file:
+                        json.dump(profiler.report(), file, indent=2)
+
+            self.settings_manager.flush()      # pending settings changes
+
+            if Logger.writer is not None:
+                Logger.writer.flush()
+
         except Exception:
             pass
 
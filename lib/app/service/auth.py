@@ -249,6 +249,10 @@ def login_required(func: Callable, auth: AuthService, verbose: bool = False) ->
 
         return func(*args, **kwargs)
 
+    # keep a reference of wrapped function, so who has already checked auth (i.e. batch) can call it directly
+    wrapper.login_required = True
+    wrapper.__wrapped__ = func
+
     return wrapper
 
 
@@ -1,9 +1,13 @@
 import datetime
+import itertools
+import random
+import time
 from lib.app.service.project import ProjectManager
+from lib.db.db import DBManager
 from lib.utils.logger import Logger
 from lib.utils.utils import Utils
 from random import randint
-from typing import Tuple
+from typing import Tuple, Dict, List, Optional, Sequence
 from lib.settings.settings import SettingsManager
 from lib.utils.constants import PM_EMAIL, PM_USERNAME
 
@@ -15,6 +19,28 @@ class Demo:
 
     N_USERS = 10
     N_TASKS = 50
+    USERS_PASSWORD: str = "asd123"      # password of demo users (project manager excluded)
+
+    # generator mode (launch(scale=...)): seeded datasets written with bulk inserts in only one transaction
+    SEED: int = 42
+    TASKS_PER_USER: int = 250
+    CHUNK_SIZE: int = 10000         # tasks generated (and inserted) together, so memory doesn't grow with scale
+    HISTORY_DAYS: int = 730         # tasks are created in the last HISTORY_DAYS days
+    UNTIL: datetime.datetime = datetime.datetime(2025, 1, 1)     # default end of history (fixed, so seed is enough)
+
+    ROLE_WEIGHTS: Dict[int, int] = {2: 10, 3: 60, 4: 25, 5: 5}     # role id - weight (1 is project manager)
+    ASSIGNEES_WEIGHTS: Tuple[int, ...] = (10, 45, 30, 10, 5)       # weight of 0, 1, 2... assignees
+    LABELS_WEIGHTS: Tuple[int, ...] = (30, 50, 15, 5)              # weight of 0, 1, 2... labels
+    TODOS_AVG: float = 4            # to-do items of a task follow an exponential distribution
+    TODOS_MAX: int = 25
+    PRIORITY_AVG: float = 3
+    PRIORITY_MAX: int = 20
+    DEADLINE_PROBABILITY: float = 0.4
+
+    VERBS: Tuple[str, ...] = ("Add", "Fix", "Refactor", "Remove", "Document", "Test", "Optimize", "Review", "Design",
+                              "Migrate")
+    SUBJECTS: Tuple[str, ...] = ("login page", "dashboard", "task list", "user profile", "settings", "database schema",
+                                 "search", "notifications", "export", "API client", "build pipeline", "roles editor")
 
     NAMES: Tuple[str] = (
     "Nicola", "Alessio", "Luca", "Mario", "Giovanni", "Giuseppe", "Matteo", "Filippo", "Enrico", "Laura", "Maria",
@@ -62,7 +88,20 @@ class Demo:
         except Exception as e:
             Logger.log_error(msg=f"error is occurred during the demo init", is_verbose=self.verbose)
 
-    def launch(self, n_users: int = N_USERS, n_tasks: int = N_TASKS, force_demo: bool = False) -> None:
+    def launch(self, n_users: int = N_USERS, n_tasks: int = N_TASKS, force_demo: bool = False,
+               scale: Optional[int] = None, seed: int = SEED, until: Optional[datetime.datetime] = None) -> None:
+        """
+        Init a demo project and fill it
+
+        :param n_users:
+        :param n_tasks:
+        :param force_demo:
+        :param scale: number of tasks of a generated dataset (see populate()), None to add n_users and n_tasks one by one
+        :param seed: seed of generated dataset, the same seed gives the same dataset
+        :param until: end of generated history (default UNTIL)
+        :return:
+        """
+
         try:
             Logger.log_info(msg="launch demo...", is_verbose=True)
 
@@ -99,11 +138,21 @@ class Demo:
             self.__pm.db_manager.refresh_connection(db_path=db_path, use_localtime=use_localtime)  # refresh connection
 
             # add data in DB
-            Logger.log_info(msg=f"Add {n_users} users...", is_verbose=self.verbose)
-            self.add_users(n_users)
+            if scale is not None:
+                Logger.log_info(msg=f"Generate {scale} tasks (seed: {seed})...", is_verbose=True)
+
+                started_at = time.perf_counter()
+                counts = Demo.populate(self.__pm.db_manager, scale, seed=seed, until=until, verbose=self.verbose)
+
+                Logger.log_success(msg="generated %s in %.1f s", args=(", ".join(f"{n} {table}" for table, n in counts.items()),
+                                                                      time.perf_counter() - started_at), is_verbose=True)
 
-            Logger.log_info(msg=f"Add {n_tasks} tasks...", is_verbose=self.verbose)
-            self.add_tasks(n_tasks, n_users)
+            else:
+                Logger.log_info(msg=f"Add {n_users} users...", is_verbose=self.verbose)
+                self.add_users(n_users)
+
+                Logger.log_info(msg=f"Add {n_tasks} tasks...", is_verbose=self.verbose)
+                self.add_tasks(n_tasks, n_users)
 
             # print credentials
             Logger.log_custom(msg=f"Project manager credentials:\nemail: {Demo.pm_email}\npassword: {Demo.pm_password}",
@@ -122,7 +171,7 @@ class Demo:
                                                       "email": f"{name}.{surname}{n}@email.com".lower(),
                                                       "name": name,
                                                       "surname": surname,
-                                                      "password": "asd123",
+                                                      "password": self.USERS_PASSWORD,
                                                       "avatar_hex_color": Utils.random_hex_color(),
                                                       "role_id": randint(2, 4)})
 
@@ -165,3 +214,175 @@ class Demo:
 
             for i in range(1, randint(1, 3)):
                 self.__pm.tasks_manager.add_label(task.id, i)
+
+    @staticmethod
+    def __datetime(value: datetime.datetime) -> str:
+        return value.isoformat(sep=" ", timespec="seconds")      # same format of database datetimes
+
+    @classmethod
+    def populate(cls, db_manager: DBManager, scale: int, seed: int = SEED, until: Optional[datetime.datetime] = None,
+                 verbose: bool = False) -> Dict[str, int]:
+        """
+        Fill database of a new project with a generated dataset of scale tasks and scale / TASKS_PER_USER users.
+        Distributions try to be realistic: few users author and are assigned to most of the tasks (Zipf-like),
+        most of the tasks are done or released, to-do items of done tasks are done, priorities are mostly low...
+        Rows are generated by a random generator seeded with seed (the same seed gives the same dataset) and written
+        in chunks with bulk inserts, all in only one transaction. Triggers which touch tasks when their assignments,
+        to-do items or labels change are suspended meanwhile: generated tasks have their own update datetime.
+
+        :param db_manager: manager of a database which has base structure (e.g. just initialized)
+        :param scale: number of tasks
+        :param seed:
+        :param until: end of generated history (default UNTIL), datetimes are the same for the same seed and until
+        :param verbose:
+        :return: table - inserted rows
+        """
+
+        rnd = random.Random(seed)
+        now = (until if until is not None else cls.UNTIL).replace(microsecond=0)
+
+        def next_id(table_name: str) -> int:
+            return db_manager.cursor.execute(f"Select Coalesce(Max(id), 0) + 1 As id From {table_name}").fetchone()["id"]
+
+        counts: Dict[str, int] = {
+            db_manager.user_table_name: 0,
+            db_manager.task_table_name: 0,
+            db_manager.task_assignment_table_name: 0,
+            db_manager.todo_item_table_name: 0,
+            db_manager.task_task_label_pivot_table_name: 0,
+        }
+
+        task_tables: Tuple[str, ...] = (db_manager.task_table_name, db_manager.task_assignment_table_name,
+                                        db_manager.todo_item_table_name, db_manager.task_task_label_pivot_table_name)
+
+        with db_manager.write_transaction(), db_manager.suspended_triggers(*task_tables):
+
+            # ::::::::: users :::::::::
+            first_user_id = next_id(db_manager.user_table_name)
+            n_users = max(cls.N_USERS, scale // cls.TASKS_PER_USER)
+            password = Utils.disguise(cls.USERS_PASSWORD)      # stored disguised, as create_from_dict() does
+            role_ids = rnd.choices(list(cls.ROLE_WEIGHTS.keys()), weights=list(cls.ROLE_WEIGHTS.values()), k=n_users)
+
+            users: List[Tuple] = []
+            for n, role_id in enumerate(role_ids):
+                name = rnd.choice(cls.NAMES)
+                surname = rnd.choice(cls.SURNAMES)
+                username = f"{name}.{surname}{first_user_id + n}".lower()
+
+                users.append((first_user_id + n, username, name, surname, f"{username}@email.com", password,
+                              f"#{rnd.getrandbits(24):06x}", role_id))
+
+            counts[db_manager.user_table_name] = db_manager.bulk_insert(db_manager.user_table_name,
+                                                                        ("id", "username", "name", "surname", "email", "password", "avatar_hex_color", "role_id"),
+                                                                        users)
+
+            # project manager and generated users, the most active first
+            user_ids: List[int] = [row["id"] for row in db_manager.cursor.execute(f"Select id From {db_manager.user_table_name}").fetchall()]
+            rnd.shuffle(user_ids)
+            user_weights: List[float] = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(user_ids))))     # cumulative
+
+            label_ids: List[int] = [row["id"] for row in db_manager.cursor.execute(f"Select id From {db_manager.task_label_table_name}").fetchall()]
+
+            status_weights: Dict[int, int] = {
+                db_manager.ideas_task_status_id: 5,
+                db_manager.backlog_task_status_id: 15,
+                db_manager.todo_task_status_id: 15,
+                db_manager.doing_task_status_id: 10,
+                db_manager.testing_task_status_id: 5,
+                db_manager.bug_fixing_task_status_id: 3,
+                db_manager.done_task_status_id: 20,
+                db_manager.release_task_status_id: 27,
+            }
+
+            # probability that a to-do item of a task in a status is done
+            done_probability: Dict[int, float] = {status_id: 0.1 for status_id in status_weights.keys()}
+            done_probability.update({
+                db_manager.doing_task_status_id: 0.5,
+                db_manager.testing_task_status_id: 0.8,
+                db_manager.bug_fixing_task_status_id: 0.7,
+                db_manager.done_task_status_id: 1,
+                db_manager.release_task_status_id: 1,
+            })
+
+            words: List[str] = cls.LOREM_IPSUM.split()
+
+            def deadline_after(value: datetime.datetime) -> Optional[str]:
+                if rnd.random() >= cls.DEADLINE_PROBABILITY:
+                    return None
+
+                deadline = value + datetime.timedelta(days=rnd.randint(3, 90))
+
+                return cls.__datetime(deadline.replace(hour=rnd.randint(8, 19), minute=rnd.randrange(0, 60, 15), second=0))
+
+            status_ids: List[int] = list(status_weights.keys())
+            status_cum_weights: List[int] = list(itertools.accumulate(status_weights.values()))
+
+            def pick_user() -> int:
+                return rnd.choices(user_ids, cum_weights=user_weights)[0]
+
+            def pick_users(k: int) -> Sequence[int]:
+                picked: Dict[int, None] = dict()        # distinct, in pick order
+
+                while len(picked) < k:
+                    picked[pick_user()] = None
+
+                return picked.keys()
+
+            # ::::::::: tasks (and their assignments, to-do items and labels), chunk by chunk :::::::::
+            task_id = next_id(db_manager.task_table_name)
+            max_assignees = min(len(cls.ASSIGNEES_WEIGHTS), len(user_ids) + 1)
+
+            for chunk_start in range(0, scale, cls.CHUNK_SIZE):
+                tasks: List[Tuple] = []
+                assignments: List[Tuple] = []
+                todos: List[Tuple] = []
+                labels: List[Tuple] = []
+
+                for n in range(chunk_start, min(scale, chunk_start + cls.CHUNK_SIZE)):
+                    # older tasks are fewer, project grows
+                    created = now - datetime.timedelta(seconds=int(cls.HISTORY_DAYS * 86400 * rnd.random() ** 1.5))
+                    created_at = cls.__datetime(created)
+                    updated_at = cls.__datetime(min(created + datetime.timedelta(minutes=rnd.randint(0, 60 * 24 * 30)), now))
+                    status_id = rnd.choices(status_ids, cum_weights=status_cum_weights)[0]
+                    author_id = pick_user()
+                    description = " ".join(words[:rnd.randint(10, len(words))])
+
+                    tasks.append((task_id, f"{rnd.choice(cls.VERBS)} {rnd.choice(cls.SUBJECTS)} #{n + 1}", description,
+                                  deadline_after(created), min(int(rnd.expovariate(1 / cls.PRIORITY_AVG)), cls.PRIORITY_MAX),
+                                  created_at, updated_at, author_id, status_id))
+
+                    n_assignees = rnd.choices(range(max_assignees), weights=cls.ASSIGNEES_WEIGHTS[:max_assignees])[0]
+                    for user_id in pick_users(n_assignees):
+                        assigned = created + datetime.timedelta(minutes=rnd.randint(0, 60 * 24 * 7))
+                        assignments.append((user_id, task_id, cls.__datetime(min(assigned, now))))
+
+                    for i in range(min(int(rnd.expovariate(1 / cls.TODOS_AVG)), cls.TODOS_MAX)):
+                        todos.append((f"{i + 1}° To-do of task", min(int(rnd.expovariate(1 / cls.PRIORITY_AVG)), cls.PRIORITY_MAX),
+                                      deadline_after(created), created_at, created_at,
+                                      int(rnd.random() < done_probability[status_id]), author_id, task_id))
+
+                    n_labels = rnd.choices(range(len(cls.LABELS_WEIGHTS)), weights=cls.LABELS_WEIGHTS)[0]
+                    for label_id in rnd.sample(label_ids, min(n_labels, len(label_ids))):
+                        labels.append((task_id, label_id))
+
+                    task_id += 1
+
+                counts[db_manager.task_table_name] += db_manager.bulk_insert(db_manager.task_table_name,
+                                                                             ("id", "name", "description", "deadline", "priority", "created_at", "updated_at", "author_id", "task_status_id"),
+                                                                             tasks)
+
+                counts[db_manager.task_assignment_table_name] += db_manager.bulk_insert(db_manager.task_assignment_table_name,
+                                                                                        ("user_id", "task_id", "assigned_at"),
+                                                                                        assignments)
+
+                counts[db_manager.todo_item_table_name] += db_manager.bulk_insert(db_manager.todo_item_table_name,
+                                                                                  ("description", "priority", "deadline", "created_at", "updated_at", "done", "author_id", "task_id"),
+                                                                                  todos)
+
+                counts[db_manager.task_task_label_pivot_table_name] += db_manager.bulk_insert(db_manager.task_task_label_pivot_table_name,
+                                                                                              ("task_id", "task_label_id"),
+                                                                                              labels)
+
+                Logger.log_info(msg="generated %s/%s tasks", args=(counts[db_manager.task_table_name], scale), is_verbose=verbose)
+
+        return counts
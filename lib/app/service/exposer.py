@@ -1,12 +1,17 @@
 import eel
 from lib.utils.logger import Logger
 from lib.app.service.auth import login_required, AuthService
-from typing import Callable
+from typing import Callable, Dict, List, Any
+from lib.utils.error import Errors, Error
 from lib.utils.mixin.dcparser import to_dict
 import json
 from lib.utils.utils import Utils
 from lib.app.service.project import ProjectManager
+from lib.db.db import DBManager
 from lib.app.service.dashboard import DashboardService
+from lib.app.service.metrics import MetricsService
+from lib.db.profiler import rpc_scope
+from functools import wraps
 
 
 def jsonify(func: Callable) -> Callable:
@@ -25,13 +30,46 @@ def jsonify(func: Callable) -> Callable:
     return wrapped
 
 
+def rpc_scoped(alias: str, func: Callable) -> Callable:
+    """
+    Decorator to mark DB statements executed by func as issued by RPC alias (used by SQL profiler to detect N+1)
+
+    :param alias: alias of exposed method
+    :param func:
+    :return: wrapped func
+    :rtype Callable:
+    """
+
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        with rpc_scope(alias):
+            return func(*args, **kwargs)
+
+    return wrapped
+
+
 class ExposerService:
     """
     Class to expose py method to js
 
     """
 
-    def __init__(self, project_manager: ProjectManager, auth_service: AuthService, dashboard_service: DashboardService, verbose: bool = False, debug_mode: bool = False):
+    BATCH_ALIAS: str = "batch"
+    AUTH_PREFIX: str = "auth_"      # calls which can change auth state (login, logout...)
+
+    METRICS_SNAPSHOT_ALIAS: str = "metrics_snapshot"
+    DB_PROFILER_REPORT_ALIAS: str = "db_profiler_report"
+
+    # alias - method of all exposed methods, it is used to dispatch batch calls
+    exposed_methods: Dict[str, Callable] = dict()
+
+    # alias - method as it is called by Eel (instrumented), it is served by headless server too (see RpcServer)
+    rpc_methods: Dict[str, Callable] = dict()
+
+    # metrics of all exposed methods, each method is instrumented on exposure
+    metrics: MetricsService = MetricsService()
+
+    def __init__(self, project_manager: ProjectManager, auth_service: AuthService, dashboard_service: Callable[[], DashboardService], verbose: bool = False, debug_mode: bool = False):
         self.verbose = verbose
         self.debug_mode = debug_mode
 
@@ -57,6 +95,9 @@ class ExposerService:
 
         self.__dashboard_service = dashboard_service
 
+        # DB statements issued by exposed methods are counted by DBManager
+        ExposerService.metrics.statements_counter = lambda: self.__project_manager.db_manager.statements_count
+
     def test(self, *args, **kwargs):
         """
         Method to test connection with frontend
@@ -107,11 +148,127 @@ class ExposerService:
     @staticmethod
     def expose(method: Callable, alias: str | None = None):
 
+        name: str = method.__name__ if alias is None else alias
+
+        # exposed method is wrapped to collect its metrics and to scope its DB statements
+        instrumented: Callable = ExposerService.metrics.instrument(name, rpc_scoped(name, method))
+
         if alias is None:
-            eel.expose(method)
+            eel.expose(instrumented)
 
         elif alias is not None:
-            eel._expose(alias, method)
+            eel._expose(alias, instrumented)
+
+        ExposerService.exposed_methods[name] = method
+        ExposerService.rpc_methods[name] = instrumented
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Return metrics (calls, latency percentiles, payload bytes, DB statements, errors) of exposed methods
+
+        :return: metrics snapshot
+        :rtype Dict[str, Any]:
+        """
+
+        return ExposerService.metrics.snapshot()
+
+    def db_profiler_report(self, limit: int | None = None) -> Dict[str, Any] | None:
+        """
+        Return report of SQL profiler (statements, probable N+1, full scans), None if profiler is disabled
+
+        :param limit: max number of statements
+        :return: report
+        :rtype Dict[str, Any] | None:
+        """
+
+        profiler = self.__project_manager.db_manager.profiler
+
+        if profiler is None:
+            return None
+
+        return profiler.report(limit=limit)
+
+    def batch(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute a list of exposed calls ({"method": alias, "args": [...] | {...}}) in only one round trip.
+        Calls are executed in order inside one DB read transaction with a shared identity map.
+        A call which writes ends the transaction (writes commit it): next calls read in a new one.
+        Auth is checked once and again after each auth call (e.g. auth_login, auth_logout).
+
+        :param calls: list of calls
+        :type calls: List[Dict[str, Any]]
+        :return: list of {"result": ..., "error": ...} in the same position of calls
+        :rtype List[Dict[str, Any]]:
+        """
+
+        db_manager: DBManager = self.__project_manager.db_manager
+        is_logged: bool = self.__auth_service.is_logged()
+
+        results: List[Dict[str, Any]] = []
+
+        while len(results) < len(calls):
+            with db_manager.read_transaction():
+                for call in calls[len(results):]:
+                    data_version = db_manager.data_version
+
+                    results.append(self.__batch_call(call, is_logged))
+
+                    if isinstance(call, dict) and str(call.get("method", "")).startswith(self.AUTH_PREFIX):
+                        is_logged = self.__auth_service.is_logged()
+
+                    if db_manager.data_version != data_version:     # snapshot is ended by a write
+                        break
+
+        Logger.log_eel(msg="batch of %s call(s) executed", args=(len(results),), is_verbose=self.verbose)
+
+        return results
+
+    def __batch_call(self, call: Dict[str, Any], is_logged: bool) -> Dict[str, Any]:
+        """
+        Execute a single call of a batch
+
+        :param call: {"method": alias, "args": [...] | {...}}
+        :param is_logged: if user is logged
+        :return: {"result": ..., "error": ...}
+        """
+
+        def error(e: Error) -> Dict[str, Any]:
+            return {"result": None, "error": e.to_dict()}
+
+        if not isinstance(call, dict) or not isinstance(call.get("method"), str):
+            return error(Errors.INVALID_CALL)
+
+        alias: str = call["method"]
+        method: Callable | None = self.exposed_methods.get(alias)
+
+        if method is None or alias == self.BATCH_ALIAS:
+            return error(Errors.METHOD_NOT_FOUND)
+
+        # auth is already checked, so call directly the wrapped method
+        if getattr(method, "login_required", False):
+            if not is_logged:
+                return error(Errors.LOGIN_REQUIRE)
+
+            method = method.__wrapped__
+
+        args = call.get("args", [])
+
+        try:
+            if isinstance(args, dict):
+                result = method(**args)
+
+            elif isinstance(args, list) or isinstance(args, tuple):
+                result = method(*args)
+
+            else:
+                return error(Errors.INVALID_CALL)
+
+            return {"result": result, "error": None}
+
+        except Exception as e:
+            Logger.log_error(msg="batch call '%s' failed: %s", args=(alias, e), is_verbose=self.verbose)
+
+            return error(Error(code=Errors.CALL_FAILED.code, message=f"{Errors.CALL_FAILED.message}: {e}"))
 
     def __expose_task_methods(self) -> None:
         """
@@ -280,7 +437,7 @@ class ExposerService:
                 self.__auth_service.logout,
                 self.__auth_service.refresh_me,
                 self.__auth_service.update_last_visit
-            ], prefix="auth_")
+            ], prefix=self.AUTH_PREFIX)
 
             self.expose(to_dict(self.__auth_service.login, self.debug_mode), "auth_login")
             self.expose(to_dict(self.__auth_service.me, self.debug_mode), "auth_me")
@@ -295,9 +452,27 @@ class ExposerService:
         :return: None
         """
 
+        def current_repo(name: str) -> Callable:
+            # method is resolved on each call: repo manager changes when another project is opened
+            def method(*args, **kwargs):
+                return getattr(self.__project_manager.repo_manager, name)(*args, **kwargs)
+
+            method.__name__ = name
+
+            return method
+
         try:
-            self.expose(to_dict(self.__project_manager.repo_manager.get_tree, self.debug_mode), "repo_tree")
-            self.expose(to_dict(self.__project_manager.repo_manager.get_commits, self.debug_mode), "repo_commits")
+            self.expose(to_dict(current_repo("get_tree"), self.debug_mode), "repo_tree")
+            self.expose(to_dict(current_repo("get_commits"), self.debug_mode), "repo_commits")
+            self.expose(current_repo("get_branches_of"), "repo_branches_of")
+            self.expose(current_repo("get_fetch_status"), "repo_fetch_status")
+            self.expose(current_repo("fetch_now"), "repo_fetch")
+            self.expose(login_required(self.__project_manager.git_activity_service.task_activity, self.__auth_service, self.verbose), "repo_task_activity")
+            self.expose(login_required(self.__project_manager.git_activity_service.summary, self.__auth_service, self.verbose), "repo_git_activity")
+            self.expose(login_required(self.__project_manager.repo_analytics_service.commits_per_author_per_day, self.__auth_service, self.verbose), "repo_commits_per_author_per_day")
+            self.expose(login_required(self.__project_manager.repo_analytics_service.branch_activity, self.__auth_service, self.verbose), "repo_branch_activity")
+            self.expose(login_required(self.__project_manager.repo_analytics_service.churn, self.__auth_service, self.verbose), "repo_churn")
+            self.expose(login_required(self.__project_manager.repo_analytics_service.hour_of_week, self.__auth_service, self.verbose), "repo_hour_of_week")
 
         except Exception as excepetion:
             Logger.log_error(msg="repo exposure error", is_verbose=self.verbose, full=True)
@@ -344,7 +519,10 @@ class ExposerService:
 
         try:
 
-            self.expose(to_dict(self.__dashboard_service.get_data, self.debug_mode), "dashboard_get_data")
+            def get_data():
+                return self.__dashboard_service().get_data()       # dashboard service is built on first use
+
+            self.expose(to_dict(get_data, self.debug_mode), "dashboard_get_data")
 
         except Exception as excepetion:
             Logger.log_error(msg="dashboard exposure error", is_verbose=self.verbose, full=True)
@@ -383,6 +561,9 @@ class ExposerService:
             Logger.log_info(msg="expose py methods...", is_verbose=self.verbose)
 
             self.expose(self.test)
+            self.expose(self.batch, self.BATCH_ALIAS)
+            self.expose(self.metrics_snapshot, self.METRICS_SNAPSHOT_ALIAS)
+            self.expose(login_required(self.db_profiler_report, self.__auth_service, self.verbose), self.DB_PROFILER_REPORT_ALIAS)
 
             self.__expose_task_methods()
             self.__expose_task_label_methods()
@@ -0,0 +1,182 @@
+import threading
+import time
+from typing import Dict, Optional, Any, Tuple, List, Callable, TYPE_CHECKING
+from lib.db.entity.task import TasksManager, TaskModel
+from lib.db.entity.user import UsersManager, UserModel
+from lib.repo.activity import GitActivityIndex
+from lib.utils.logger import Logger
+
+if TYPE_CHECKING:
+    from lib.repo.repo import RepoManager     # GitPython is imported only when repository is used
+
+
+class GitActivityService:
+    """
+    Maintain the index of links between tasks and commits (by task git branch) and between git authors and users
+    (by email). Index is rebuilt only when refs, task branches or user emails change, so requests read precomputed stats
+    without walking history. Also what is compared is not read on each request: task branches and user emails are read
+    again only after database writes, refs after a fetch (which invalidates repository) or every REFS_CHECK_INTERVAL
+    seconds (local commits)
+    """
+
+    LAST_COMMITS: int = 20      # commits returned for each task
+    REFS_CHECK_INTERVAL: float = 5      # seconds
+
+    def __init__(self, repo_manager: Callable[[], 'RepoManager'], tasks_manager: TasksManager, users_manager: UsersManager,
+                 verbose: bool = False):
+        """
+        :param repo_manager: function which returns manager of current repository (it changes when another project is opened)
+        :param tasks_manager:
+        :param users_manager:
+        :param verbose:
+        """
+
+        self.__repo_manager = repo_manager
+        self.__tasks_manager = tasks_manager
+        self.__users_manager = users_manager
+        self.verbose = verbose
+
+        self.__index: Optional[GitActivityIndex] = None
+        self.__key: Optional[Tuple] = None
+        self.__lock = threading.Lock()
+
+        # task branches and user emails, read at data version of database
+        self.__data_version: Optional[Tuple] = None
+        self.__task_branches: Dict[int, str] = dict()
+        self.__user_of_email: Dict[str, int] = dict()
+
+        # refs, read from repository manager at its generation
+        self.__refs_of: Optional[Tuple['RepoManager', int]] = None
+        self.__refs: Dict[str, str] = dict()
+        self.__refs_checked_at: float = 0
+
+    def __read_task_branches(self) -> Dict[int, str]:
+        tasks: List[TaskModel] = self.__tasks_manager.all_as_model(with_relations=False)
+
+        return {task.id: task.git_branch for task in tasks if task.git_branch is not None and task.git_branch != ""}
+
+    def __read_user_of_email(self) -> Dict[str, int]:
+        users: List[UserModel] = self.__users_manager.all_as_model(with_relations=False)
+
+        return {user.email.lower(): user.id for user in users if user.email is not None}
+
+    def __read_db(self) -> None:
+        """
+        Read task branches and user emails again if database is changed since last reading
+        """
+
+        data_version = self.__tasks_manager.db_manager.data_version
+
+        if data_version == self.__data_version:
+            return
+
+        self.__task_branches = self.__read_task_branches()
+        self.__user_of_email = self.__read_user_of_email()
+        self.__data_version = data_version
+
+    def __read_refs(self, repo_manager: 'RepoManager') -> None:
+        """
+        Read refs again if repository is changed (another project, fetch) or they are not checked recently
+        """
+
+        refs_of = (repo_manager, repo_manager.generation)
+        now = time.monotonic()
+
+        if refs_of == self.__refs_of and now - self.__refs_checked_at < self.REFS_CHECK_INTERVAL:
+            return
+
+        self.__refs = repo_manager.refs_snapshot()
+        self.__refs_of = refs_of
+        self.__refs_checked_at = now
+
+    def index(self) -> Optional[GitActivityIndex]:
+        """
+        Return index, it is rebuilt if refs, task branches or user emails are changed
+
+        :return: None if repository is not available
+        """
+
+        with self.__lock:
+            repo_manager = self.__repo_manager()
+
+            if not repo_manager.valid_opened_repo():
+                return None
+
+            self.__read_db()
+            self.__read_refs(repo_manager)
+
+            task_branches = self.__task_branches
+            user_of_email = self.__user_of_email
+            key = (repo_manager.project_path, GitActivityIndex.key(self.__refs, task_branches, user_of_email))
+
+            if self.__index is not None and key == self.__key:
+                return self.__index
+
+            Logger.log_info(msg="build git activity index...", is_verbose=self.verbose)
+
+            records, context = repo_manager.read_commits()
+
+            self.__index = GitActivityIndex.build(records, refs=context.membership.refs,
+                                                  bits=context.membership.bits, heads=context.heads,
+                                                  default_ref=repo_manager.get_default_branch(context),
+                                                  task_branches=task_branches, user_of_email=user_of_email)
+            self.__key = key
+
+            Logger.log_success(msg="git activity index built (%s task(s) with branch)", args=(len(task_branches),),
+                               is_verbose=self.verbose)
+
+            return self.__index
+
+    def invalidate(self) -> None:
+        """
+        Force rebuild of index on next request
+
+        :return:
+        """
+
+        with self.__lock:
+            self.__index = None
+            self.__key = None
+            self.__data_version = None
+            self.__refs_of = None
+
+    def task_activity(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Return git activity of a task: commit count, last commit, ahead/behind default branch and last commits
+
+        :param task_id:
+        :return: None if task has not a branch or repository is not available
+        """
+
+        try:
+            index = self.index()
+
+            if index is None:
+                return None
+
+            return index.task_activity(task_id, last=self.LAST_COMMITS)
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to get git activity of task {task_id}: {e}", is_verbose=self.verbose)
+
+            return None
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """
+        Return git activity of all tasks with a branch and of all users (for dashboard)
+
+        :return: None if repository is not available
+        """
+
+        try:
+            index = self.index()
+
+            if index is None:
+                return None
+
+            return index.summary()
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to get git activity: {e}", is_verbose=self.verbose)
+
+            return None
@@ -0,0 +1,272 @@
+import os
+import math
+import json
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Any, Optional, Deque
+from lib.utils.logger import Logger
+from lib.utils.error import Error
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """
+    Return p-percentile (nearest rank) of already sorted values
+
+    :param sorted_values:
+    :param p: percentile in [0, 100]
+    :return:
+    """
+
+    if len(sorted_values) == 0:
+        return 0
+
+    rank = math.ceil(p / 100 * len(sorted_values))
+
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+@dataclass
+class RpcMetrics:
+    """
+    Counters of an exposed method.
+    Latencies are kept in a bounded window of most recent calls, payload size is measured on a sample of calls
+
+    :ivar calls: number of calls
+    :ivar errors: number of calls which raised an exception or returned an error (e.g. login required)
+    :ivar db_statements: DB statements issued by calls
+    :ivar total_time: sum of latencies (seconds)
+    :ivar latencies: latencies (seconds) of most recent calls
+    :ivar payload_bytes: sum of serialized result sizes of sampled calls
+    :ivar payload_samples: number of sampled calls
+    """
+
+    calls: int = field(default=0)
+    errors: int = field(default=0)
+    db_statements: int = field(default=0)
+    total_time: float = field(default=0)
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=MetricsService.LATENCY_WINDOW))
+    payload_bytes: int = field(default=0)
+    payload_samples: int = field(default=0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return a summary of counters, latencies in milliseconds
+
+        :return:
+        """
+
+        latencies = sorted(self.latencies)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "db_statements": self.db_statements,
+            "db_statements_avg": self.db_statements / self.calls if self.calls > 0 else 0,
+            "latency_avg_ms": self.total_time / self.calls * 1000 if self.calls > 0 else 0,
+            "latency_p50_ms": percentile(latencies, 50) * 1000,
+            "latency_p95_ms": percentile(latencies, 95) * 1000,
+            "latency_p99_ms": percentile(latencies, 99) * 1000,
+            "latency_max_ms": latencies[-1] * 1000 if len(latencies) > 0 else 0,
+            "payload_bytes_avg": self.payload_bytes / self.payload_samples if self.payload_samples > 0 else 0,
+            "payload_samples": self.payload_samples,
+        }
+
+
+class MetricsService:
+    """
+    Collect per-RPC metrics (calls, latency percentiles, payload bytes, DB statements, errors) keyed by alias.
+    Instrumentation costs two clock reads and a counter read per call; payload is serialized only
+    once every PAYLOAD_SAMPLE_EVERY calls, because Eel already serializes results on its own.
+    """
+
+    LATENCY_WINDOW: int = 1024          # most recent latencies kept for each alias
+    PAYLOAD_SAMPLE_EVERY: int = 16      # serialize 1 result every N calls to measure payload
+    DUMP_FILE_NAME: str = "metrics.json"
+
+    def __init__(self, enabled: bool = True, verbose: bool = False):
+        self.enabled = enabled
+        self.verbose = verbose
+
+        # function which returns the number of DB statements executed until now
+        self.statements_counter: Optional[Callable[[], int]] = None
+
+        self.__metrics: Dict[str, RpcMetrics] = dict()
+        self.__lock = threading.Lock()
+        self.__started_at: float = time.time()
+
+        self.__dump_thread: Optional[threading.Thread] = None
+        self.__dump_stop: Optional[threading.Event] = None
+
+    def __statements(self) -> int:
+        counter = self.statements_counter
+
+        if counter is None:
+            return 0
+
+        try:
+            return counter()
+
+        except Exception:
+            return 0
+
+    def instrument(self, alias: str, method: Callable) -> Callable:
+        """
+        Wrap method to collect its metrics under alias.
+        Attributes of method (e.g. login_required) are preserved
+
+        :param alias: alias of exposed method
+        :param method: method to wrap
+        :return: wrapped method
+        """
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return method(*args, **kwargs)
+
+            statements = self.__statements()
+            start = time.perf_counter()
+            failed = False
+
+            try:
+                result = method(*args, **kwargs)
+
+            except Exception:
+                failed = True
+                raise
+
+            finally:
+                elapsed = time.perf_counter() - start
+                self.__record(alias, elapsed, self.__statements() - statements, failed,
+                              result if not failed else None)
+
+            return result
+
+        wrapper.metrics_alias = alias
+
+        return wrapper
+
+    def __record(self, alias: str, elapsed: float, statements: int, failed: bool, result: Any) -> None:
+        with self.__lock:
+            metrics = self.__metrics.get(alias)
+
+            if metrics is None:
+                metrics = RpcMetrics()
+                self.__metrics[alias] = metrics
+
+            metrics.calls += 1
+            metrics.total_time += elapsed
+            metrics.latencies.append(elapsed)
+            metrics.db_statements += statements
+
+            if failed:
+                metrics.errors += 1
+                return
+
+            if Error.is_error(result):
+                metrics.errors += 1
+
+            sample: bool = (metrics.calls - 1) % self.PAYLOAD_SAMPLE_EVERY == 0
+
+        if sample:
+            try:
+                # same serialization used by Eel
+                size = len(json.dumps(result, default=lambda o: None).encode("utf-8"))
+
+            except Exception:
+                return
+
+            with self.__lock:
+                metrics.payload_bytes += size
+                metrics.payload_samples += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return metrics of all exposed methods which have been called
+
+        :return: {"uptime": seconds, "methods": {alias: metrics}}
+        """
+
+        with self.__lock:
+            methods = {alias: metrics.to_dict() for alias, metrics in self.__metrics.items()}
+
+        return {
+            "uptime": time.time() - self.__started_at,
+            "methods": methods,
+        }
+
+    def reset(self) -> None:
+        """
+        Erase collected metrics
+
+        :return:
+        """
+
+        with self.__lock:
+            self.__metrics = dict()
+            self.__started_at = time.time()
+
+    def dump(self, path: str) -> bool:
+        """
+        Write snapshot in path (atomically)
+
+        :param path:
+        :return: True if dumped
+        """
+
+        try:
+            tmp_path = path + ".tmp"
+
+            with open(tmp_path, "w") as file:
+                json.dump(self.snapshot(), file, indent=2)
+
+            os.replace(tmp_path, path)
+
+            return True
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to dump metrics in '{path}': {e}", is_verbose=self.verbose)
+
+            return False
+
+    def start_periodic_dump(self, path_getter: Callable[[], Optional[str]], interval: float) -> None:
+        """
+        Dump metrics every interval seconds in a background thread.
+        path_getter is called at each dump, so dump file follows the opened project; if it returns None dump is skipped
+
+        :param path_getter: function which returns dump file path
+        :param interval: seconds between two dumps
+        :return:
+        """
+
+        self.stop_periodic_dump()
+
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                path = path_getter()
+
+                if path is not None:
+                    self.dump(path)
+
+        self.__dump_stop = stop
+        self.__dump_thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        self.__dump_thread.start()
+
+    def stop_periodic_dump(self) -> None:
+        """
+        Stop periodic dump
+
+        :return:
+        """
+
+        if self.__dump_stop is not None:
+            self.__dump_stop.set()
+            self.__dump_thread.join(1)
+
+        self.__dump_stop = None
+        self.__dump_thread = None
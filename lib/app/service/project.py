@@ -2,11 +2,19 @@ from lib.settings.settings import SettingsManager, SettingsBase
 from lib.db.db import DBManager
 from lib.utils.utils import Utils
 from lib.utils.logger import Logger
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 import os
+import threading
 from lib.db.entity.user import UsersManager, RolesManager, FuturePMData
 from lib.db.entity.task import TasksManager, TaskStatusManager, TaskAssignmentsManager, TaskTaskLabelPivotManager, TaskLabelsManager, TodoItemsManager
-from lib.repo.repo import RepoManager
+from lib.repo.cache import CommitGraphCache
+from lib.db.backup import BackupManager
+from lib.app.service.git_activity import GitActivityService
+from lib.app.service.repo_analytics import RepoAnalyticsService
+
+if TYPE_CHECKING:
+    from lib.repo.repo import RepoManager       # GitPython is imported only when repository is used
+    from lib.repo.pool import RepoManagerPool
 
 
 class ProjectManager:
@@ -65,9 +73,28 @@ class ProjectManager:
         self.roles_manager = RolesManager(db_manager=self.__db_manager,
                                           verbose=self.verbose)
 
-        # load repo manager
-        self.repo_manager = RepoManager(verbose=self.verbose,
-                                        project_path=self.project_path)
+        # repo managers are loaded on first use (GitPython import and repository opening are not in startup path),
+        # managers of recently opened projects are kept warm
+        self.__repo_pool: Optional['RepoManagerPool'] = None
+        self.__repo_manager: Optional['RepoManager'] = None
+        self.__repo_path: str = self.project_path
+        self.__repo_lock = threading.RLock()
+
+        # background fetch of current repository: (interval, max interval), None if it is not started
+        self.__fetching: Optional[Tuple[float, float]] = None
+
+        # links between tasks/users and commits
+        self.git_activity_service = GitActivityService(repo_manager=lambda: self.repo_manager,
+                                                       tasks_manager=self.tasks_manager,
+                                                       users_manager=self.users_manager,
+                                                       verbose=self.verbose)
+
+        # commits analytics
+        self.repo_analytics_service = RepoAnalyticsService(repo_manager=lambda: self.repo_manager, verbose=self.verbose)
+
+        # database backups, scheduled by start_backups()
+        self.backup_manager: BackupManager = self.__new_backup_manager()
+        self.__backup_interval: Optional[float] = None
 
     @property
     def settings(self) -> SettingsManager:
@@ -85,6 +112,39 @@ class ProjectManager:
     def db_manager(self) -> DBManager:
         return self.__db_manager
 
+    @property
+    def repo_pool(self) -> 'RepoManagerPool':
+        with self.__repo_lock:
+            if self.__repo_pool is None:
+                from lib.repo.pool import RepoManagerPool
+
+                self.__repo_pool = RepoManagerPool(capacity=int(self.settings.get_setting_by_key(SettingsBase.KEY_REPO_WARM_PROJECTS)),
+                                                   verbose=self.verbose,
+                                                   backend=self.settings.get_setting_by_key(SettingsBase.KEY_REPO_BACKEND),
+                                                   workers=int(self.settings.get_setting_by_key(SettingsBase.KEY_REPO_WORKERS)),
+                                                   diff_stats=bool(self.settings.get_setting_by_key(SettingsBase.KEY_REPO_DIFF_STATS)))
+
+            return self.__repo_pool
+
+    @property
+    def repo_manager(self) -> 'RepoManager':
+        """
+        Return manager of current repository, it is opened on first use (also background fetch is started then)
+        """
+
+        with self.__repo_lock:
+            if self.__repo_manager is None:
+                self.__repo_manager = self.repo_pool.get(self.__repo_path)
+
+                if self.__fetching is not None:
+                    self.__repo_manager.start_fetching(*self.__fetching)
+
+            return self.__repo_manager
+
+    @property
+    def repo_loaded(self) -> bool:
+        return self.__repo_manager is not None
+
     def create_work_directory(self, path: Optional[str] = None) -> str:
         """
         Create work directory in the project if it doesn't exist
@@ -160,7 +220,71 @@ class ProjectManager:
         self.__db_manager.refresh_connection(db_path=self.settings.db_path,
                                              use_localtime=self.__settings_manager.get_setting_by_key(self.__settings_manager.KEY_DB_LOCALTIME))
 
-        self.repo_manager.open_repo(self.settings.project_directory_path)
+        self.switch_repo(self.settings.project_directory_path)
+
+        if self.backup_manager.db_path != self.settings.db_path:     # another project
+            self.backup_manager.stop()
+            self.backup_manager = self.__new_backup_manager()
+
+            if self.__backup_interval is not None:
+                self.start_backups(self.__backup_interval)
+
+    def switch_repo(self, path: str) -> None:
+        """
+        Use repository of path (warm if it was opened recently), background fetch follows current repository
+
+        :param path:
+        :return:
+        """
+
+        with self.__repo_lock:
+            self.__repo_path = path
+
+            previous: Optional['RepoManager'] = self.__repo_manager
+
+            if previous is None:        # not loaded yet, it will be loaded on first use
+                return
+
+            self.__repo_manager = self.repo_pool.get(path)
+
+            if self.__repo_manager is previous:
+                self.__repo_manager.open_repo(path)       # e.g. work directory (so commits cache) is created
+                return
+
+            previous.stop_fetching()
+
+            if self.__fetching is not None:
+                self.__repo_manager.start_fetching(*self.__fetching)
+
+    def start_repo_fetching(self, interval: float, max_interval: float) -> None:
+        """
+        Fetch remotes of current repository in background, also after a project switch
+
+        :param interval: seconds, fetching is disabled if it is not positive
+        :param max_interval: seconds
+        :return:
+        """
+
+        with self.__repo_lock:
+            self.__fetching = (interval, max_interval)
+
+            if self.__repo_manager is not None:      # else it is started when repository is loaded
+                self.__repo_manager.start_fetching(interval=interval, max_interval=max_interval)
+
+    def close_repos(self) -> None:
+        """
+        Stop background fetch and close all opened repositories
+
+        :return:
+        """
+
+        with self.__repo_lock:
+            self.__fetching = None
+
+            if self.__repo_pool is not None:
+                self.__repo_pool.close()
+
+            self.__repo_manager = None
 
     def remove(self, project_path: str) -> bool:
         """
@@ -277,14 +401,47 @@ class ProjectManager:
 
             return False
 
+    def __new_backup_manager(self) -> BackupManager:
+        return BackupManager(db_path=self.settings.db_path,
+                             backup_dir=self.settings.backup_directory_path,
+                             generations=int(self.settings.get_setting_by_key(SettingsBase.KEY_BACKUP_GENERATIONS)),
+                             verbose=self.verbose)
+
+    def start_backups(self, interval: float) -> None:
+        """
+        Backup database of current project in background every interval seconds, also after a project switch
+
+        :param interval: seconds, 0 means only on close
+        :return:
+        """
+
+        self.__backup_interval = interval
+
+        if not self.settings.get_setting_by_key(SettingsManager.KEY_BACKUP):
+            Logger.log_info(msg="backup disabled", is_verbose=self.verbose)
+            return
+
+        self.backup_manager.start(interval)
+
     def backup_work_dir(self) -> None:
         """
-        Make backup of work directory
+        Make backup of work directory: other files are copied, database is backed up with online backup API
+        (if it is changed) only if backup on close is enabled or there are not background backups (interval 0),
+        because on a big database it makes closing slow
 
         :return:
         """
 
         # check for backup
         if self.settings.get_setting_by_key(SettingsManager.KEY_BACKUP):
-            if Utils.backup_dir_content(self.settings.work_directory_path):
+            final_backup: bool = bool(self.settings.get_setting_by_key(SettingsManager.KEY_BACKUP_ON_CLOSE)) \
+                                 or self.__backup_interval == 0
+
+            self.backup_manager.stop(final_backup=final_backup)
+
+            db_name: str = self.settings.db_name
+            exclude = (db_name, db_name + "-wal", db_name + "-shm", db_name + "-journal",
+                       CommitGraphCache.FILE_NAME, CommitGraphCache.FILE_NAME + "-wal", CommitGraphCache.FILE_NAME + "-shm")
+
+            if Utils.backup_dir_content(self.settings.work_directory_path, exclude=exclude):
                 Logger.log_success(msg="backup done successfully", is_verbose=self.verbose)
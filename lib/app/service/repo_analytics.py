@@ -0,0 +1,177 @@
+import threading
+import time
+from typing import Dict, Optional, Any, Tuple, List, Callable, TYPE_CHECKING
+from lib.repo.analytics import CommitColumns
+from lib.utils.logger import Logger
+
+if TYPE_CHECKING:
+    from lib.repo.repo import RepoManager     # GitPython is imported only when repository is used
+
+
+class RepoAnalyticsService:
+    """
+    Commits analytics (commits per author per day, branches activity, churn, hour-of-week heatmap) computed on
+    a columnar representation of commits, which is built again only when refs change.
+    Refs are not read on each request: only after a fetch (which invalidates repository) or every REFS_CHECK_INTERVAL
+    seconds (local commits)
+    """
+
+    REFS_CHECK_INTERVAL: float = 5      # seconds
+
+    def __init__(self, repo_manager: Callable[[], 'RepoManager'], verbose: bool = False):
+        """
+        :param repo_manager: function which returns manager of current repository (it changes when another project is opened)
+        :param verbose:
+        """
+
+        self.__repo_manager = repo_manager
+        self.verbose = verbose
+
+        self.__columns: Optional[CommitColumns] = None
+        self.__key: Optional[Tuple] = None
+        self.__lock = threading.Lock()
+
+        # refs, read from repository manager at its generation
+        self.__refs_of: Optional[Tuple['RepoManager', int]] = None
+        self.__refs: Tuple = tuple()
+        self.__refs_checked_at: float = 0
+
+    def __read_refs(self, repo_manager: 'RepoManager') -> None:
+        """
+        Read refs again if repository is changed (another project, fetch) or they are not checked recently
+        """
+
+        refs_of = (repo_manager, repo_manager.generation)
+        now = time.monotonic()
+
+        if refs_of == self.__refs_of and now - self.__refs_checked_at < self.REFS_CHECK_INTERVAL:
+            return
+
+        self.__refs = tuple(sorted(repo_manager.refs_snapshot().items()))
+        self.__refs_of = refs_of
+        self.__refs_checked_at = now
+
+    def columns(self) -> Optional[CommitColumns]:
+        """
+        Return commits as columns, they are built again if refs are changed
+
+        :return: None if repository is not available
+        """
+
+        with self.__lock:
+            repo_manager = self.__repo_manager()
+
+            if not repo_manager.valid_opened_repo():
+                return None
+
+            self.__read_refs(repo_manager)
+
+            key = (repo_manager.project_path, self.__refs)
+
+            if self.__columns is not None and key == self.__key:
+                return self.__columns
+
+            records, context = repo_manager.read_commits()
+
+            self.__columns = CommitColumns(records, refs=context.membership.refs, bits=context.membership.bits)
+            self.__key = key
+
+            Logger.log_info(msg="built columns of %s commit(s)", args=(len(self.__columns),), is_verbose=self.verbose)
+
+            return self.__columns
+
+    def __range(self, since: str | int | float | None, until: str | int | float | None) -> Tuple[Optional[float], Optional[float]]:
+        to_timestamp = self.__repo_manager().to_timestamp
+
+        return to_timestamp(since), to_timestamp(until)
+
+    def commits_per_author_per_day(self, since: str | int | float | None = None,
+                                   until: str | int | float | None = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return commits of each author for each day
+
+        :param since: ISO datetime or timestamp
+        :param until: ISO datetime or timestamp
+        :return: None if repository is not available
+        """
+
+        try:
+            columns = self.columns()
+
+            if columns is None:
+                return None
+
+            return columns.commits_per_author_per_day(*self.__range(since, until))
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to compute commits per author per day: {e}", is_verbose=self.verbose)
+
+            return None
+
+    def branch_activity(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return activity of each ref (commits, authors, churn, first and last commit)
+
+        :return: None if repository is not available
+        """
+
+        try:
+            columns = self.columns()
+
+            if columns is None:
+                return None
+
+            return columns.branch_activity()
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to compute branch activity: {e}", is_verbose=self.verbose)
+
+            return None
+
+    def churn(self, by: str = "day", since: str | int | float | None = None,
+              until: str | int | float | None = None) -> Optional[Dict[str, Any]]:
+        """
+        Return lines added and removed for each day or author (diff stats must be enabled)
+
+        :param by: 'day' or 'author'
+        :param since: ISO datetime or timestamp
+        :param until: ISO datetime or timestamp
+        :return: None if repository is not available
+        """
+
+        try:
+            columns = self.columns()
+
+            if columns is None:
+                return None
+
+            return columns.churn(by, *self.__range(since, until))
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to compute churn: {e}", is_verbose=self.verbose)
+
+            return None
+
+    def hour_of_week(self, since: str | int | float | None = None, until: str | int | float | None = None,
+                     author_email: Optional[str] = None) -> Optional[List[List[int]]]:
+        """
+        Return heatmap of commits by weekday (Monday first) and hour
+
+        :param since: ISO datetime or timestamp
+        :param until: ISO datetime or timestamp
+        :param author_email: only commits of this author
+        :return: None if repository is not available
+        """
+
+        try:
+            columns = self.columns()
+
+            if columns is None:
+                return None
+
+            return columns.hour_of_week(*self.__range(since, until), author_email)
+
+        except Exception as e:
+            Logger.log_error(msg=f"unable to compute hour of week heatmap: {e}", is_verbose=self.verbose)
+
+            return None
@@ -0,0 +1,324 @@
+import os
+import json
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple, List, Set
+from lib.utils.error import Errors, Error
+from lib.utils.logger import Logger
+
+
+class HttpError(Exception):
+    """
+    Error of a request which is answered with an HTTP status (e.g. malformed request)
+    """
+
+    def __init__(self, status: int, error: Error):
+        super().__init__(error.message)
+
+        self.status = status
+        self.error = error
+
+
+class RpcServer:
+    """
+    Headless HTTP/JSON server of exposed methods (the same registry used by Eel), on TCP or on a Unix socket:
+
+    - POST /rpc/<alias>: body is a JSON array (positional args) or object (keyword args), empty body means no args;
+      response is {"result": ..., "error": null} as in batch calls (login required methods answer the login error as
+      result, as they do to Eel)
+    - GET /rpc: aliases of exposed methods
+    - GET /health
+
+    Connections are HTTP/1.1 keep-alive (closed after KEEP_ALIVE_TIMEOUT seconds of inactivity) and served concurrently
+    by asyncio; methods run in executor, by default only one thread, because managers share one SQLite connection
+    (as with Eel, where calls are run one at a time)
+    """
+
+    RPC_PATH: str = "/rpc"
+    HEALTH_PATH: str = "/health"
+
+    KEEP_ALIVE_TIMEOUT: float = 15          # seconds
+    MAX_BODY_SIZE: int = 16 * 1024 * 1024   # bytes
+    MAX_HEADERS: int = 100
+
+    REASONS: Dict[int, str] = {
+        200: "OK",
+        400: "Bad Request",
+        404: "Not Found",
+        405: "Method Not Allowed",
+        413: "Payload Too Large",
+        431: "Request Header Fields Too Large",
+        500: "Internal Server Error",
+        501: "Not Implemented",
+    }
+
+    def __init__(self, methods: Dict[str, Callable], host: str = "127.0.0.1", port: int = 8000,
+                 unix_socket: Optional[str] = None, executor: Optional[Executor] = None,
+                 keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT, verbose: bool = False):
+        """
+        :param methods: alias - method, it is read on each request (methods exposed later are served too)
+        :param host:
+        :param port: 0 to use a free port (see address)
+        :param unix_socket: path of Unix socket, if it is passed host and port are not used
+        :param executor: where methods are run, default only one thread (methods never run concurrently)
+        :param keep_alive_timeout: seconds
+        :param verbose:
+        """
+
+        self.methods = methods
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.executor: Executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpc")
+        self.keep_alive_timeout = keep_alive_timeout
+        self.verbose = verbose
+
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__connections: Set[asyncio.Task] = set()       # tasks which serve opened connections
+
+    @property
+    def address(self) -> Optional[str]:
+        """
+        Return address on which server is listening (URL or Unix socket path), None if it is not started
+        """
+
+        if self.__server is None:
+            return None
+
+        if self.unix_socket is not None:
+            return self.unix_socket
+
+        host, port = self.__server.sockets[0].getsockname()[:2]
+
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        """
+        Start listening
+
+        :return:
+        """
+
+        if self.unix_socket is not None:
+            if os.path.exists(self.unix_socket):        # socket of a previous run
+                os.remove(self.unix_socket)
+
+            self.__server = await asyncio.start_unix_server(self.__handle, path=self.unix_socket)
+
+        else:
+            self.__server = await asyncio.start_server(self.__handle, host=self.host, port=self.port)
+
+        Logger.log_success(msg=f"serving {len(self.methods)} exposed method(s) on {self.address}", is_verbose=True)
+
+    async def stop(self) -> None:
+        """
+        Stop listening and close connections
+
+        :return:
+        """
+
+        if self.__server is None:
+            return
+
+        self.__server.close()
+
+        # opened connections (also keep-alive ones) are closed
+        for task in list(self.__connections):
+            task.cancel()
+
+        await asyncio.gather(*self.__connections, return_exceptions=True)
+
+        await self.__server.wait_closed()
+        self.__server = None
+
+        if self.unix_socket is not None and os.path.exists(self.unix_socket):
+            os.remove(self.unix_socket)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+
+        try:
+            await self.__server.serve_forever()
+
+        finally:
+            await self.stop()
+
+    def run(self) -> None:
+        """
+        Serve until interrupted (e.g. Ctrl+C)
+
+        :return:
+        """
+
+        try:
+            asyncio.run(self.serve_forever())
+
+        except KeyboardInterrupt:
+            Logger.log_custom(msg="KeyboardInterrupt is handled", is_verbose=self.verbose)
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """
+        Read a request
+
+        :return: (method, path, version, headers, body), None if connection is closed or idle
+        """
+
+        try:
+            line: bytes = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout)
+
+        except asyncio.TimeoutError:
+            return None
+
+        if len(line) == 0:
+            return None
+
+        parts: List[str] = line.decode("latin-1").split()
+
+        if len(parts) != 3:
+            raise HttpError(400, Errors.INVALID_CALL)
+
+        method, path, version = parts
+
+        headers: Dict[str, str] = dict()
+        while True:
+            line = await reader.readline()
+
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+            if len(headers) >= self.MAX_HEADERS:
+                raise HttpError(431, Errors.INVALID_CALL)
+
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(501, Errors.INVALID_CALL)
+
+        length: int = int(headers.get("content-length", "0") or "0")
+
+        if length > self.MAX_BODY_SIZE:
+            raise HttpError(413, Errors.INVALID_CALL)
+
+        body: bytes = await reader.readexactly(length) if length > 0 else b""
+
+        return method, path, version, headers, body
+
+    @staticmethod
+    def __keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get("connection", "").lower()
+
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+
+        return connection != "close"
+
+    def __response(self, status: int, payload: Any, keep_alive: bool) -> bytes:
+        body: bytes = json.dumps(payload, default=lambda o: None).encode()      # as Eel does
+
+        head = [
+            f"HTTP/1.1 {status} {self.REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close",
+        ]
+
+        if keep_alive:
+            head.append(f"Keep-Alive: timeout={int(self.keep_alive_timeout)}")
+
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    def __call(method: Callable, args: Any) -> Any:
+        if isinstance(args, dict):
+            return method(**args)
+
+        return method(*args)
+
+    async def __dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """
+        Execute a request
+
+        :return: (status, payload)
+        """
+
+        if path == self.HEALTH_PATH:
+            return 200, {"status": "ok"}
+
+        if path == self.RPC_PATH:
+            return 200, {"result": sorted(self.methods.keys()), "error": None}
+
+        if not path.startswith(self.RPC_PATH + "/"):
+            raise HttpError(404, Errors.METHOD_NOT_FOUND)
+
+        if method != "POST":
+            raise HttpError(405, Errors.INVALID_CALL)
+
+        alias: str = path[len(self.RPC_PATH) + 1:]
+        exposed: Optional[Callable] = self.methods.get(alias)
+
+        if exposed is None:
+            raise HttpError(404, Errors.METHOD_NOT_FOUND)
+
+        try:
+            args = json.loads(body) if len(body) > 0 else []
+
+        except ValueError:
+            raise HttpError(400, Errors.INVALID_CALL)
+
+        if not isinstance(args, (list, dict)):
+            raise HttpError(400, Errors.INVALID_CALL)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, self.__call, exposed, args)
+
+            return 200, {"result": result, "error": None}
+
+        except Exception as e:
+            Logger.log_error(msg=f"call '{alias}' failed: {e}", is_verbose=self.verbose)
+
+            return 500, {"result": None, "error": Error(code=Errors.CALL_FAILED.code,
+                                                        message=f"{Errors.CALL_FAILED.message}: {e}").to_dict()}
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve requests of a connection, one after the other, until it is closed (or idle)
+        """
+
+        task = asyncio.current_task()
+        self.__connections.add(task)
+
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+
+                    if request is None:
+                        break
+
+                    method, path, version, headers, body = request
+                    keep_alive = self.__keep_alive(version, headers)
+
+                    status, payload = await self.__dispatch(method, path.split("?", 1)[0], body)
+
+                except HttpError as e:
+                    keep_alive = False      # request may be not read entirely
+                    status, payload = e.status, {"result": None, "error": e.error.to_dict()}
+
+                except (asyncio.IncompleteReadError, ValueError):
+                    keep_alive = False
+                    status, payload = 400, {"result": None, "error": Errors.INVALID_CALL.to_dict()}
+
+                writer.write(self.__response(status, payload, keep_alive))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+
+        except ConnectionError:
+            pass
+
+        finally:
+            self.__connections.discard(task)
+
+            writer.close()
@@ -0,0 +1,292 @@
+import os
+import gzip
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+from lib.utils.logger import Logger
+
+
+class BackupManager:
+    """
+    Backup of a SQLite database with the online backup API: pages are copied in steps (other connections can read and
+    write between steps), so each backup is a consistent snapshot even while app is running. Snapshot is checked
+    (PRAGMA integrity_check), compressed in a new generation and verified again; only the newest generations are kept.
+    Backups run in a background thread every interval seconds (only if database is changed) and on stop.
+    """
+
+    PREFIX: str = "database-"
+    EXTENSION: str = ".db.gz"
+    TMP_EXTENSION: str = ".tmp"
+
+    PAGES_PER_STEP: int = 256
+    STEP_SLEEP: float = 0.005       # seconds between steps, writers are not starved
+    JOIN_TIMEOUT: float = 30        # seconds
+
+    def __init__(self, db_path: str, backup_dir: str, generations: int = 5, pages_per_step: int = PAGES_PER_STEP,
+                 verbose: bool = False):
+        """
+        :param db_path: database to backup
+        :param backup_dir: directory of generations, it is created if it doesn't exist
+        :param generations: number of generations kept (at least 1)
+        :param pages_per_step: pages copied in each step of backup
+        :param verbose:
+        """
+
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.generations = max(1, generations)
+        self.pages_per_step = pages_per_step
+        self.verbose = verbose
+
+        self.last_backup_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self.__backup_lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__stop: bool = True
+        self.__final: bool = False
+        self.__thread: Optional[threading.Thread] = None
+
+    def generation_paths(self) -> List[str]:
+        """
+        Return paths of generations, newest first
+
+        :return:
+        """
+
+        if not os.path.isdir(self.backup_dir):
+            return []
+
+        names = [name for name in os.listdir(self.backup_dir) if name.startswith(self.PREFIX) and name.endswith(self.EXTENSION)]
+
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def changed(self) -> bool:
+        """
+        Return True if database (or its WAL) is modified after the newest generation
+
+        :return:
+        """
+
+        if not os.path.isfile(self.db_path):
+            return False
+
+        paths = self.generation_paths()
+
+        if len(paths) == 0:
+            return True
+
+        newest: int = os.stat(paths[0]).st_mtime_ns
+
+        return any(os.path.isfile(path) and os.stat(path).st_mtime_ns > newest for path in (self.db_path, self.db_path + "-wal"))
+
+    @staticmethod
+    def check(db_path: str) -> Optional[str]:
+        """
+        Run integrity check of a database
+
+        :param db_path:
+        :return: None if database is ok, else the problem
+        """
+
+        connection = sqlite3.connect(db_path)
+
+        try:
+            result: str = "\n".join(row[0] for row in connection.execute("PRAGMA integrity_check").fetchall())
+
+            return None if result == "ok" else result
+
+        finally:
+            connection.close()
+
+    @classmethod
+    def verify(cls, path: str) -> Optional[str]:
+        """
+        Verify a generation: it is decompressed (gzip checks CRC) and its integrity is checked
+
+        :param path: generation path
+        :return: None if generation is valid, else the problem
+        """
+
+        tmp_path: str = path + cls.TMP_EXTENSION
+
+        try:
+            with gzip.open(path, "rb") as source, open(tmp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+
+            return cls.check(tmp_path)
+
+        except Exception as e:
+            return str(e)
+
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def __snapshot(self, snapshot_path: str) -> None:
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(snapshot_path)
+
+        try:
+            source.backup(target, pages=self.pages_per_step, sleep=self.STEP_SLEEP)
+
+        finally:
+            target.close()
+            source.close()
+
+    def backup(self, force: bool = False) -> Optional[str]:
+        """
+        Make a new generation, if database is changed after the newest generation (or force)
+
+        :param force: True to make a generation also if database is not changed
+        :return: path of new generation, None if it is not made
+        """
+
+        with self.__backup_lock:
+            if not os.path.isfile(self.db_path):
+                return None
+
+            if not force and not self.changed():
+                Logger.log_info(msg="database is not changed, backup skipped", is_verbose=self.verbose)
+                return None
+
+            os.makedirs(self.backup_dir, exist_ok=True)
+
+            # leftovers of backups interrupted (e.g. app killed)
+            for leftover in os.listdir(self.backup_dir):
+                if leftover.startswith(self.PREFIX) and leftover.endswith(self.TMP_EXTENSION):
+                    os.remove(os.path.join(self.backup_dir, leftover))
+
+            name: str = self.PREFIX + datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            snapshot_path: str = os.path.join(self.backup_dir, name + ".db" + self.TMP_EXTENSION)
+            tmp_path: str = os.path.join(self.backup_dir, name + self.EXTENSION + self.TMP_EXTENSION)
+            path: str = os.path.join(self.backup_dir, name + self.EXTENSION)
+
+            started_at: int = time.time_ns()
+
+            try:
+                self.__snapshot(snapshot_path)
+
+                problem: Optional[str] = self.check(snapshot_path)
+                if problem is not None:
+                    raise RuntimeError(f"snapshot is corrupted: {problem}")
+
+                with open(snapshot_path, "rb") as source, gzip.open(tmp_path, "wb", compresslevel=6) as target:
+                    shutil.copyfileobj(source, target)
+
+                problem = self.verify(tmp_path)
+                if problem is not None:
+                    raise RuntimeError(f"generation is corrupted: {problem}")
+
+                os.replace(tmp_path, path)      # only verified generations have the final name
+
+                # changes made while backup was running are newer than generation
+                os.utime(path, ns=(started_at, started_at))
+
+                self.last_backup_at = datetime.now().timestamp()
+                self.last_error = None
+
+                Logger.log_success(msg=f"database backup done: '{path}'", is_verbose=self.verbose)
+
+            except Exception as e:
+                self.last_error = str(e)
+
+                Logger.log_error(msg=f"database backup failed: {e}", is_verbose=self.verbose)
+
+                return None
+
+            finally:
+                for leftover in (snapshot_path, tmp_path):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+            self.rotate()
+
+            return path
+
+    def rotate(self) -> None:
+        """
+        Remove generations older than the newest ones
+
+        :return:
+        """
+
+        for path in self.generation_paths()[self.generations:]:
+            os.remove(path)
+
+    def verify_all(self) -> Dict[str, Optional[str]]:
+        """
+        Verify all generations
+
+        :return: generation path - None if it is valid, else the problem
+        """
+
+        return {path: self.verify(path) for path in self.generation_paths()}
+
+    def __run(self, interval: float) -> None:
+        while not self.__stop:
+            self.__wake.wait(interval if interval > 0 else None)
+            self.__wake.clear()
+
+            if not self.__stop or self.__final:
+                self.backup()
+
+    def start(self, interval: float) -> None:
+        """
+        Start backups in background every interval seconds (0 means only on stop)
+
+        :param interval: seconds
+        :return:
+        """
+
+        if self.running:
+            return
+
+        self.__stop = False
+        self.__final = False
+        self.__wake.clear()
+
+        self.__thread = threading.Thread(target=self.__run, args=(interval,), name="db-backup", daemon=True)
+        self.__thread.start()
+
+    def stop(self, final_backup: bool = False) -> None:
+        """
+        Stop background backups
+
+        :param final_backup: True to make a last backup (if database is changed), it is waited at most JOIN_TIMEOUT seconds
+        :return:
+        """
+
+        if not self.running:
+            if final_backup:
+                self.backup()
+
+            return
+
+        self.__final = final_backup
+        self.__stop = True
+        self.__wake.set()
+
+        self.__thread.join(self.JOIN_TIMEOUT)
+        self.__thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return backup status
+
+        :return:
+        """
+
+        return {
+            "running": self.running,
+            "generations": [os.path.basename(path) for path in self.generation_paths()],
+            "last_backup_at": datetime.fromtimestamp(self.last_backup_at).isoformat() if self.last_backup_at is not None else None,
+            "last_error": self.last_error,
+        }
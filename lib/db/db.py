@@ -1,9 +1,11 @@
 import sqlite3
+from contextlib import contextmanager
 from lib.db.query import QueryBuilder
 from lib.utils.logger import Logger
-from typing import List, Tuple, Dict, Optional, Any
+from typing import List, Tuple, Dict, Optional, Any, Iterator, Iterable
 from lib.db.component import Table, Field, FKConstraint, WhereCondition, Trigger
 from lib.db.seeder import Seeder
+from lib.db.profiler import SqlProfiler, ProfilingCursor, ProfilingConnection
 from lib.utils.utils import Utils, SqlUtils
 from lib.utils.collections import DictUtils
 
@@ -122,6 +124,23 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
         self.use_localtime = use_localtime
         self.__db_path = db_path
 
+        # identity map (table, id) - record, it is active only inside a read transaction
+        self.__identity_map: Optional[Dict[Tuple[str, int], Dict]] = None
+
+        # True inside write_transaction(), to tell nested calls from a pending implicit transaction
+        self.__in_write_transaction: bool = False
+
+        # incremented by open_connection(), so data_version changes also when connection (or database) changes
+        self.__connection_generation: int = 0
+
+        # number of statements executed on connections of this manager (it is used by metrics)
+        self.statements_count: int = 0
+
+        # opt-in statements profiler, when it is enabled cursor is a profiling proxy
+        self.__profiler: Optional[SqlProfiler] = None
+        self.__profiling_cursor: Optional[ProfilingCursor] = None
+        self.__profiling_connection: Optional[ProfilingConnection] = None
+
         # open a new connection
         self.__db_connection = None     # initialized in __init__ to use it in open_connection()
         self.__db_cursor = None         # initialized in __init__ to use it in open_connection()
@@ -193,6 +212,9 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
         self.__db_connection = None
         self.__db_cursor = None
+        self.__profiling_cursor = None
+        self.__profiling_connection = None
+        self.__connection_generation += 1
 
         # open connection if and only if database already exists
         if Utils.exist(self.__db_path):
@@ -206,6 +228,12 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
             self.__db_connection = sqlite3.connect(self.__db_path)  # connect to db
             self.__db_connection.row_factory = dict_factory  # set row factory to get dict instead of tuple
             self.__db_cursor = self.__db_connection.cursor()  # set cursor as attr
+            self.__db_connection.set_trace_callback(self.__count_statement)     # count executed statements
+
+            if self.__profiler is not None:
+                self.__profiler.connection = self.__db_connection
+                self.__profiling_cursor = ProfilingCursor(self.__db_cursor, self.__profiler)
+                self.__profiling_connection = ProfilingConnection(self.__db_connection, self.__profiler)
 
             Logger.log_success(msg=f"Connection successful with db: '{self.__db_path}'", is_verbose=self.verbose)
 
@@ -216,6 +244,24 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
             Logger.log_error(exception, is_verbose=self.verbose)
 
+    def __count_statement(self, statement: str) -> None:
+        if not statement.startswith(SqlProfiler.EXPLAIN_PREFIX):       # query plans captured by profiler
+            self.statements_count += 1
+
+    @property
+    def data_version(self) -> Tuple[int, int]:
+        """
+        Return a value which changes when rows are inserted, updated or deleted by this manager (without queries),
+        so callers can cache data read from database until it changes
+
+        :return: (connection generation, rows changed on connection)
+        """
+
+        if self.__db_connection is None:
+            return self.__connection_generation, 0
+
+        return self.__connection_generation, self.__db_connection.total_changes
+
     def refresh_connection(self, **kwargs) -> None:
         """
         Refresh DB connection
@@ -246,6 +292,133 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
         except Exception as e:
             Logger.log_warning(msg="database connection can't be closed", is_verbose=self.verbose)
 
+    @property
+    def identity_map(self) -> Optional[Dict[Tuple[str, int], Dict]]:
+        """
+        Return the identity map of the current read transaction, None if there is not a read transaction
+
+        :return: identity map
+        """
+
+        return self.__identity_map
+
+    def invalidate_identity_map(self) -> None:
+        """
+        Erase records cached in identity map (if it is active)
+
+        :return:
+        """
+
+        if self.__identity_map is not None:
+            self.__identity_map.clear()
+
+    @contextmanager
+    def read_transaction(self) -> Iterator['DBManager']:
+        """
+        Open a read transaction with a shared identity map, so all reads inside it see the same snapshot
+        and the same record is fetched only once. Nested calls re-use the outer transaction.
+        Writes inside the transaction commit it and erase the identity map.
+
+        :return: this DBManager
+        """
+
+        # nested read transaction => re-use outer
+        if self.__identity_map is not None:
+            yield self
+            return
+
+        began: bool = False
+        self.__identity_map = dict()
+
+        try:
+            if self.is_open() and not self.connection.in_transaction:
+                self.connection.execute("Begin")
+                began = True
+
+            yield self
+
+        finally:
+            self.__identity_map = None
+
+            if began and self.connection.in_transaction:
+                self.connection.commit()
+
+    @contextmanager
+    def write_transaction(self) -> Iterator['DBManager']:
+        """
+        Open a write transaction: statements executed by bulk_insert() inside it are committed together at the end,
+        or rolled back if an exception is raised. Nested calls re-use the outer transaction.
+        A transaction already pending (e.g. implicitly opened by sqlite3 or a read transaction) is committed before.
+
+        :return: this DBManager
+        """
+
+        # nested write transaction => re-use outer
+        if self.__in_write_transaction:
+            yield self
+            return
+
+        if self.connection.in_transaction:
+            self.connection.commit()
+
+        self.connection.execute("Begin")
+        self.__in_write_transaction = True
+
+        try:
+            yield self
+
+        except BaseException:
+            self.connection.rollback()
+
+            raise
+
+        else:
+            self.connection.commit()
+
+        finally:
+            self.__in_write_transaction = False
+            self.invalidate_identity_map()
+
+    def bulk_insert(self, table_name: str, columns: List[str] | Tuple[str, ...], rows: Iterable[Tuple]) -> int:
+        """
+        Insert rows using only one prepared statement (executemany), without commit: use it inside write_transaction()
+
+        :param table_name:
+        :param columns: columns of each row
+        :param rows: values, in the same order of columns
+        :return: number of inserted rows
+        """
+
+        query: str = f"Insert Into {table_name} ({', '.join(columns)}) Values ({', '.join('?' * len(columns))})"
+
+        cursor = self.cursor.executemany(query, rows)
+
+        return cursor.rowcount
+
+    @contextmanager
+    def suspended_triggers(self, *table_names: str) -> Iterator['DBManager']:
+        """
+        Drop triggers of tables and create them again at the end, so bulk inserts don't run them for each row.
+        Use it inside write_transaction(): triggers are never missing for other connections
+
+        :param table_names:
+        :return: this DBManager
+        """
+
+        triggers: List[Dict] = self.cursor.execute(f"Select name, sql From sqlite_master Where type = 'trigger' "
+                                                   f"And tbl_name In ({', '.join('?' * len(table_names))})",
+                                                   table_names).fetchall()
+
+        for trigger in triggers:
+            self.cursor.execute(f"Drop Trigger If Exists {trigger['name']}")
+
+        try:
+            yield self
+
+        finally:
+            for trigger in triggers:
+                self.cursor.execute(trigger["sql"])
+
     @property
     def tables(self) -> Dict[str, Table]:
         """
@@ -473,12 +646,53 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
     @property
     def connection(self):
+        if self.__profiling_connection is not None:
+            return self.__profiling_connection
+
         return self.__db_connection
 
     @property
     def cursor(self):
+        if self.__profiling_cursor is not None:
+            return self.__profiling_cursor
+
         return self.__db_cursor
 
+    @property
+    def profiler(self) -> Optional[SqlProfiler]:
+        return self.__profiler
+
+    def enable_profiler(self, explain: bool = True) -> SqlProfiler:
+        """
+        Enable statements profiler (if it is not already enabled), from now statements executed using cursor or
+        connection are recorded
+
+        :param explain: capture query plan of full scans
+        :return: profiler
+        """
+
+        if self.__profiler is None:
+            self.__profiler = SqlProfiler(connection=self.__db_connection, explain=explain)
+
+            if self.__db_cursor is not None:
+                self.__profiling_cursor = ProfilingCursor(self.__db_cursor, self.__profiler)
+                self.__profiling_connection = ProfilingConnection(self.__db_connection, self.__profiler)
+
+            Logger.log_info(msg="SQL profiler enabled", is_verbose=self.verbose)
+
+        return self.__profiler
+
+    def disable_profiler(self) -> None:
+        """
+        Disable statements profiler, collected data are lost
+
+        :return:
+        """
+
+        self.__profiler = None
+        self.__profiling_cursor = None
+        self.__profiling_connection = None
+
     def create_table(self, table_name: str, if_not_exists: bool = True) -> None:
         """
         Create table from table component
@@ -656,6 +870,8 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
         self.connection.commit()
 
+        self.invalidate_identity_map()
+
     def insert_from_dict(self, table_name: str, values: Dict | List[Dict], columns: List[str] | Tuple[str] | None = None) -> int:
         """
         Insert all dict values passed in a table
@@ -690,6 +906,8 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
         self.connection.commit()
 
+        self.invalidate_identity_map()
+
         return self.cursor.lastrowid
 
     def where(self, table_name: str, *conditions: WhereCondition, columns: List[str] | None = None) -> List[Dict]:
@@ -743,6 +961,8 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
         self.connection.commit()
 
+        self.invalidate_identity_map()
+
         return res
 
     def update(self, table_name: str, *conditions: WhereCondition, **data):
@@ -773,6 +993,8 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
 
         self.connection.commit()
 
+        self.invalidate_identity_map()
+
         return res
 
     def execute(self, raw_query: str) -> Any:
@@ -784,6 +1006,8 @@ class DBManager(TableNamesMixin, BaseTaskStatusIdMixin, BaseRoleIdMixin):
         :return: execution result
         """
 
+        self.invalidate_identity_map()      # raw query can modify any record
+
         return self.cursor.executescript(raw_query)
 
     def drop_table(self, table_name: str) -> bool:
@@ -150,7 +150,7 @@ class EntitiesManager(ABC, Generic[EntityModel]):
         models = self.__all_as_model(table_name=self.table_name, with_relations=with_relations, model=self.EM,
                                      safe=safe)
 
-        Logger.log_info(msg=f"get {len(models)} entities from database")
+        Logger.log_info(msg="get %s entities from %s", args=(len(models), self.table_name), is_verbose=self.verbose)
 
         return models
 
@@ -209,6 +209,11 @@ class EntitiesManager(ABC, Generic[EntityModel]):
         :rtype Dict:
         """
 
+        # inside a read transaction the same record is fetched only once
+        identity_map = self.db_manager.identity_map
+        if identity_map is not None and (table_name, entity_id) in identity_map:
+            return dict(identity_map[(table_name, entity_id)])
+
         query = self.__get_find_query(entity_id, table_name)
 
         res = self.db_manager.cursor.execute(query)
@@ -221,6 +226,9 @@ class EntitiesManager(ABC, Generic[EntityModel]):
         if data is None:
             return None
 
+        if identity_map is not None:
+            identity_map[(table_name, entity_id)] = data
+
         return dict(data)
 
     def __get_find_query(self, entity_id: int, table_name: str) -> str:
@@ -260,13 +268,14 @@ class EntitiesManager(ABC, Generic[EntityModel]):
             # find entity created to return its
             entity = self.find(self.db_manager.cursor.lastrowid)
 
-            Logger.log_success(msg=f"created a new resource in {self.table_name} with data: {data}\nresult: {entity}", is_verbose=self.verbose)
+            Logger.log_success(msg="created a new resource in %s with data: %s\nresult: %s", args=(self.table_name, data, entity),
+                               is_verbose=self.verbose)
 
             return entity
 
         except Exception as exception:
 
-            Logger.log_error(msg=f"{exception} during inserting with data: {data}", is_verbose=self.__verbose)
+            Logger.log_error(msg="%s during inserting with data: %s", args=(exception, data), is_verbose=self.__verbose)
 
             if not safe:
                 raise exception
@@ -416,7 +425,7 @@ class EntitiesManager(ABC, Generic[EntityModel]):
 
         except Exception as exception:
 
-            Logger.log_warning(msg=f"{relation} is wrong!\nUsing {em}\nBecause: {exception}")
+            Logger.log_warning(msg="%s is wrong!\nUsing %s\nBecause: %s", args=(relation, em, exception))
 
             if not safe:
                 raise exception
@@ -531,7 +540,7 @@ class EntitiesManager(ABC, Generic[EntityModel]):
         """
 
         try:
-            Logger.log_info(msg=f"delete from {self.table_name} where {conditions}", is_verbose=self.verbose)
+            Logger.log_info(msg="delete from %s where %s", args=(self.table_name, conditions), is_verbose=self.verbose)
 
             self.__delete(self.table_name, *conditions)
 
@@ -590,7 +599,7 @@ class EntitiesManager(ABC, Generic[EntityModel]):
 
         try:
 
-            Logger.log_info(msg=f"updating {self.table_name} with data: {data}", is_verbose=self.verbose)
+            Logger.log_info(msg="updating %s with data: %s", args=(self.table_name, data), is_verbose=self.verbose)
 
             if entity_id is None and create_if_not_exists:
                 Logger.log_warning(msg=f"it doesn't exist, so it will be created")
@@ -601,7 +610,7 @@ class EntitiesManager(ABC, Generic[EntityModel]):
 
                 self.db_manager.update(self.table_name, WhereCondition("id", "=", entity_id), **data)
 
-                Logger.log_success(msg=f"Updated {self.table_name} where id = {entity_id}")
+                Logger.log_success(msg="Updated %s where id = %s", args=(self.table_name, entity_id), is_verbose=self.verbose)
 
             return self.find(entity_id)         # return entity
 
@@ -328,7 +328,7 @@ class TasksManager(EntitiesManager, TableNamesMixin):
 
         try:
 
-            Logger.log_info(msg=f"removing assigned user (id: {user_id}) from task with id: {task_id}")
+            Logger.log_info(msg="removing assigned user (id: %s) from task with id: %s", args=(user_id, task_id), is_verbose=self.verbose)
 
             self.__task_assignment_manager.remove_assignment(task_id, user_id)
 
@@ -402,7 +402,7 @@ class TasksManager(EntitiesManager, TableNamesMixin):
 
         try:
 
-            Logger.log_info(msg=f"removing label (id: {label_id}) from task with id: {task_id}")
+            Logger.log_info(msg="removing label (id: %s) from task with id: %s", args=(label_id, task_id), is_verbose=self.verbose)
 
             self.__task_task_label_pivot_manager.remove_from(task_id, label_id)
 
@@ -0,0 +1,408 @@
+import re
+import sys
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+
+STRING_LITERAL_REGEX = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+NUMBER_LITERAL_REGEX = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+IN_LIST_REGEX = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+WHITESPACE_REGEX = re.compile(r"\s+")
+SELECT_WITH_WHERE_REGEX = re.compile(r"\s*(select|with)\b.*\bwhere\b", re.IGNORECASE | re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Return the shape of a statement: literals are replaced by ?, lists of values by (?...) and whitespaces are collapsed,
+    so statements which differ only in values have the same shape
+
+    :param sql:
+    :return: normalized statement
+    """
+
+    sql = STRING_LITERAL_REGEX.sub("?", sql)
+    sql = NUMBER_LITERAL_REGEX.sub("?", sql)
+    sql = IN_LIST_REGEX.sub("(?...)", sql)
+
+    return WHITESPACE_REGEX.sub(" ", sql).strip()
+
+
+def params_shape(params: Any) -> str:
+    """
+    Return the shape of bound parameters, i.e. their types
+
+    :param params: tuple, list or dict of parameters
+    :return: e.g. "(int, str)" or "{id: int}"
+    """
+
+    if params is None:
+        return "()"
+
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+
+    return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+
+
+@dataclass
+class RpcScope:
+    """
+    Statements executed during an RPC
+
+    :ivar name: RPC alias
+    :ivar shapes: statement shape - number of executions
+    """
+
+    name: str
+    shapes: Counter = field(default_factory=Counter)
+
+
+# scope of RPC which is running in current context
+current_rpc_scope: ContextVar[Optional[RpcScope]] = ContextVar("current_rpc_scope", default=None)
+
+
+@contextmanager
+def rpc_scope(name: str) -> Iterator[RpcScope]:
+    """
+    Mark statements executed inside as issued by RPC name (nested scopes re-use outer)
+
+    :param name: RPC alias
+    :return: scope
+    """
+
+    scope = current_rpc_scope.get()
+
+    if scope is not None:
+        yield scope
+        return
+
+    scope = RpcScope(name=name)
+    token = current_rpc_scope.set(scope)
+
+    try:
+        yield scope
+
+    finally:
+        current_rpc_scope.reset(token)
+
+
+@dataclass
+class StatementStats:
+    """
+    Stats of a statement shape
+
+    :ivar sql: normalized statement
+    :ivar calls: executions
+    :ivar total_time: sum of wall time (seconds)
+    :ivar max_time: max wall time (seconds)
+    :ivar rows: rows returned (fetched) or modified
+    :ivar params_shapes: shape of bound parameters - executions
+    :ivar callers: calling manager method - executions
+    :ivar plan: EXPLAIN QUERY PLAN details, if statement does a full scan
+    """
+
+    sql: str
+    calls: int = field(default=0)
+    total_time: float = field(default=0)
+    max_time: float = field(default=0)
+    rows: int = field(default=0)
+    params_shapes: Counter = field(default_factory=Counter)
+    callers: Counter = field(default_factory=Counter)
+    plan: Optional[List[str]] = field(default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": self.total_time * 1000,
+            "avg_ms": self.total_time / self.calls * 1000 if self.calls > 0 else 0,
+            "max_ms": self.max_time * 1000,
+            "rows": self.rows,
+            "params_shapes": dict(self.params_shapes),
+            "callers": dict(self.callers.most_common(5)),
+            "full_scan_plan": self.plan,
+        }
+
+
+class ProfilingCursor:
+    """
+    Proxy of a sqlite3 cursor which records each execute/executemany/executescript (and fetched rows) on a profiler
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, profiler: 'SqlProfiler'):
+        self.__cursor = cursor
+        self.__profiler = profiler
+        self.__last: Optional[StatementStats] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__cursor, name)
+
+    def __iter__(self):
+        return self.fetchall().__iter__()
+
+    def __execute(self, method: str, sql: str, params: Any, shape: str, explain_params: Any) -> 'ProfilingCursor':
+        start = time.perf_counter()
+
+        if params is None:
+            getattr(self.__cursor, method)(sql)
+        else:
+            getattr(self.__cursor, method)(sql, params)
+
+        elapsed = time.perf_counter() - start
+
+        self.__last = self.__profiler.record(sql, shape, elapsed, params=explain_params, rowcount=self.__cursor.rowcount)
+
+        return self
+
+    def execute(self, sql: str, params: Any = None) -> 'ProfilingCursor':
+        return self.__execute("execute", sql, params, params_shape(params), params)
+
+    def executemany(self, sql: str, params: Any) -> 'ProfilingCursor':
+        params = list(params)
+
+        return self.__execute("executemany", sql, params, params_shape(params[0]) if len(params) > 0 else "()", None)
+
+    def executescript(self, script: str) -> 'ProfilingCursor':
+        return self.__execute("executescript", script, None, "()", None)
+
+    def __fetched(self, rows: int) -> None:
+        if self.__last is not None:
+            self.__profiler.add_rows(self.__last, rows)
+
+    def fetchall(self) -> List[Any]:
+        records = self.__cursor.fetchall()
+        self.__fetched(len(records))
+
+        return records
+
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        records = self.__cursor.fetchmany(size)
+        self.__fetched(len(records))
+
+        return records
+
+    def fetchone(self) -> Any:
+        record = self.__cursor.fetchone()
+
+        if record is not None:
+            self.__fetched(1)
+
+        return record
+
+
+class ProfilingConnection:
+    """
+    Proxy of a sqlite3 connection whose shortcuts execute/executemany/executescript (which use a new cursor)
+    are recorded on a profiler, other attributes (commit, in_transaction...) are the ones of connection
+    """
+
+    def __init__(self, connection: sqlite3.Connection, profiler: 'SqlProfiler'):
+        self.__connection = connection
+        self.__profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__connection, name)
+
+    def execute(self, sql: str, params: Any = None) -> ProfilingCursor:
+        return ProfilingCursor(self.__connection.cursor(), self.__profiler).execute(sql, params)
+
+    def executemany(self, sql: str, params: Any) -> ProfilingCursor:
+        return ProfilingCursor(self.__connection.cursor(), self.__profiler).executemany(sql, params)
+
+    def executescript(self, script: str) -> ProfilingCursor:
+        return ProfilingCursor(self.__connection.cursor(), self.__profiler).executescript(script)
+
+
+class SqlProfiler:
+    """
+    Opt-in profiler of statements executed by a DBManager.
+    For each statement shape it records calls, wall time, rows, bound-parameter shapes and calling manager method;
+    shapes executed at least N_PLUS_ONE_THRESHOLD times inside the same RPC are reported as probable N+1 and
+    EXPLAIN QUERY PLAN is captured (once per shape) for filtered SELECT which do a full table scan
+    """
+
+    N_PLUS_ONE_THRESHOLD: int = 5
+
+    # prefix of statements executed by profiler itself (they are not statements of application)
+    EXPLAIN_PREFIX: str = "Explain Query Plan "
+
+    # modules which are skipped to find calling manager method
+    INTERNAL_MODULES: Tuple[str, ...] = (__name__, "lib.db.db", "contextlib")
+
+    def __init__(self, connection: Optional[sqlite3.Connection] = None, explain: bool = True):
+        self.connection = connection
+        self.explain = explain
+
+        self.__stats: Dict[str, StatementStats] = dict()
+        self.__explained: set = set()
+        self.__n_plus_one: Counter = Counter()      # (rpc, shape) - number of RPCs with N+1
+        self.__lock = threading.RLock()
+
+    @staticmethod
+    def caller() -> str:
+        """
+        Return first method (as Class.method) outside DB layer in call stack
+
+        :return:
+        """
+
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_globals.get("__name__") in SqlProfiler.INTERNAL_MODULES:
+            frame = frame.f_back
+
+        if frame is None:
+            return "?"
+
+        instance = frame.f_locals.get("self")
+
+        if instance is not None:
+            return f"{type(instance).__name__}.{frame.f_code.co_name}"
+
+        return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+    def record(self, sql: str, shape: str, elapsed: float, params: Any = None, rowcount: int = -1) -> StatementStats:
+        """
+        Record an executed statement
+
+        :param sql: executed statement
+        :param shape: shape of bound parameters
+        :param elapsed: wall time (seconds)
+        :param params: bound parameters (used by EXPLAIN)
+        :param rowcount: rows modified (-1 for queries)
+        :return: stats of statement shape
+        """
+
+        normalized: str = normalize_sql(sql)
+        caller: str = self.caller()
+
+        with self.__lock:
+            stats = self.__stats.get(normalized)
+
+            if stats is None:
+                stats = StatementStats(sql=normalized)
+                self.__stats[normalized] = stats
+
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.params_shapes[shape] += 1
+            stats.callers[caller] += 1
+
+            if rowcount > 0:
+                stats.rows += rowcount
+
+            scope = current_rpc_scope.get()
+            if scope is not None:
+                scope.shapes[normalized] += 1
+
+                if scope.shapes[normalized] == self.N_PLUS_ONE_THRESHOLD:
+                    self.__n_plus_one[(scope.name, normalized)] += 1
+
+            to_explain: bool = self.explain and normalized not in self.__explained
+            self.__explained.add(normalized)
+
+        if to_explain:
+            self.__explain(stats, sql, params)
+
+        return stats
+
+    def add_rows(self, stats: StatementStats, rows: int) -> None:
+        with self.__lock:
+            stats.rows += rows
+
+    def __explain(self, stats: StatementStats, sql: str, params: Any) -> None:
+        """
+        Capture query plan of a filtered SELECT, it is stored only if there is a full scan
+        (SELECT without Where read whole table on purpose)
+
+        :return:
+        """
+
+        if self.connection is None or SELECT_WITH_WHERE_REGEX.match(sql) is None:
+            return
+
+        try:
+            cursor = self.connection.cursor()       # a new cursor, so results of profiled cursor are not touched
+            cursor.row_factory = None
+
+            if params is None:
+                rows = cursor.execute(self.EXPLAIN_PREFIX + sql).fetchall()
+            else:
+                rows = cursor.execute(self.EXPLAIN_PREFIX + sql, params).fetchall()
+
+            cursor.close()
+
+            details: List[str] = [row[-1] for row in rows]
+
+            if any(detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail
+                   for detail in details):
+                stats.plan = details
+
+        except sqlite3.Error:
+            pass
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__stats = dict()
+            self.__explained = set()
+            self.__n_plus_one = Counter()
+
+    def report(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return profiling report: statements sorted by total time, probable N+1 and full scans
+
+        :param limit: max number of statements
+        :return:
+        """
+
+        with self.__lock:
+            statements = sorted(self.__stats.values(), key=lambda s: s.total_time, reverse=True)
+
+            return {
+                "statements": [s.to_dict() for s in statements[:limit]],
+                "n_plus_one": [{"rpc": rpc, "sql": sql, "occurrences": n}
+                               for (rpc, sql), n in self.__n_plus_one.most_common()],
+                "full_scans": [s.sql for s in statements if s.plan is not None],
+                "total_statements": sum(s.calls for s in statements),
+                "total_ms": sum(s.total_time for s in statements) * 1000,
+            }
+
+    @staticmethod
+    def format_report(report: Dict[str, Any]) -> str:
+        """
+        Return a report as human-readable text
+
+        :param report:
+        :return:
+        """
+
+        lines: List[str] = [f"{report['total_statements']} statement(s) in {report['total_ms']:.2f} ms", ""]
+
+        lines.append(f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'rows':>8}  statement")
+        for s in report["statements"]:
+            lines.append(f"{s['calls']:>7} {s['total_ms']:>10.2f} {s['avg_ms']:>8.3f} {s['rows']:>8}  {s['sql'][:120]}")
+            lines.append(f"{'':>37}  by {', '.join(s['callers'])}; params {', '.join(s['params_shapes'])}")
+
+        if len(report["n_plus_one"]) > 0:
+            lines.append("")
+            lines.append("probable N+1:")
+
+            for n in report["n_plus_one"]:
+                lines.append(f"  [{n['rpc']}] x{n['occurrences']}  {n['sql'][:120]}")
+
+        if len(report["full_scans"]) > 0:
+            lines.append("")
+            lines.append("full scans:")
+
+            for s in report["statements"]:
+                if s["full_scan_plan"] is not None:
+                    lines.append(f"  {s['sql'][:120]}")
+                    lines.extend(f"    {detail}" for detail in s["full_scan_plan"])
+
+        return "\n".join(lines)
@@ -1,31 +1,159 @@
+import os
+import copy
 import json
-from typing import Any
+import tempfile
+import threading
+from typing import Any, Dict, Tuple, Optional
+
+
+class JsonStore:
+    """
+    Parsed JSON files kept in memory: a file is parsed again only if its (mtime_ns, size) is changed,
+    otherwise a copy of the parsed object is returned (callers can modify it). Writes go through the store,
+    so a written file is not parsed again
+    """
+
+    def __init__(self):
+        self.__entries: Dict[str, Tuple[int, int, Any]] = dict()        # path - (mtime_ns, size, data)
+        self.__lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def __signature(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, path: str) -> Any:
+        """
+        Return the content of a JSON file
+
+        :param path: file path
+        :return: file content
+        :raise OSError: if file doesn't exist
+        :raise json.JSONDecodeError: if file is not valid
+        """
+
+        path = os.path.abspath(path)
+        signature = self.__signature(path)
+
+        with self.__lock:
+            entry: Optional[Tuple[int, int, Any]] = self.__entries.get(path)
+
+            if entry is not None and entry[:2] == signature:
+                self.hits += 1
+
+                return copy.deepcopy(entry[2])
+
+            self.misses += 1
+
+        with open(path, "r") as file:
+            data = json.load(file)
+
+        with self.__lock:
+            self.__entries[path] = (*signature, data)
+
+        return copy.deepcopy(data)
+
+    def write(self, path: str, data: Any, sort_keys: bool = True, indent: int = 4) -> None:
+        """
+        Write data in the JSON file atomically
+
+        :param path: file path
+        :param data: data to write
+        :param sort_keys:
+        :param indent:
+        """
+
+        path = os.path.abspath(path)
+
+        FileManger.write_atomic(path, json.dumps(data, sort_keys=sort_keys, indent=indent))
+
+        with self.__lock:
+            self.__entries[path] = (*self.__signature(path), copy.deepcopy(data))
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Forget a file (None means all files)
+
+        :param path:
+        :return:
+        """
+
+        with self.__lock:
+            if path is None:
+                self.__entries.clear()
+
+            else:
+                self.__entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hits, misses and number of files in store
+
+        :return:
+        """
+
+        with self.__lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.__entries)}
 
 
 class FileManger:
 
+    # JSON files read by the app (e.g. settings, vault)
+    store: JsonStore = JsonStore()
+
     @staticmethod
     def read_json(path: str) -> Any:
         """
-        Return the content of a JSON file
+        Return the content of a JSON file, parsed again only if file is changed
 
         :param path: file path
         :type path: str
         :return: file content
         :rtype: Any
         """
-        with open(path, "r") as file:
-            return json.load(file)
+
+        return FileManger.store.read(path)
 
     @staticmethod
     def write_json(path: str, data: Any, sort_keys: bool = True, indent: int = 4) -> None:
         """
-        Write body in the JSON file
+        Write body in the JSON file (atomically)
 
         :param indent:
         :param sort_keys:
         :param path: file path
         :param data: data to write
         """
-        with open(path, "w") as file:
-            file.write(json.dumps(data, sort_keys=sort_keys, indent=indent))
+
+        FileManger.store.write(path, data, sort_keys=sort_keys, indent=indent)
+
+    @staticmethod
+    def write_atomic(path: str, content: str) -> None:
+        """
+        Write content in a temporary file of the same directory, then rename it to path:
+        readers (and a crash) never see a partially written file
+
+        :param path: file path
+        :param content: content to write
+        """
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.replace(tmp_path, path)
+
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            raise
@@ -0,0 +1,264 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any, Tuple
+from lib.repo.record import CommitRecord
+from lib.utils.mixin.dcparser import DCToDictMixin
+
+
+@dataclass
+class LinkedCommit(DCToDictMixin):
+    """
+    Commit linked to a task
+
+    :ivar hexsha:
+    :ivar message:
+    :ivar committed_at:
+    :ivar author_email:
+    :ivar user_id: user with author email (None if there is not)
+    """
+
+    hexsha: str
+    message: str
+    committed_at: str
+    author_email: str
+    user_id: Optional[int] = field(default=None)
+
+
+@dataclass
+class TaskGitStats(DCToDictMixin):
+    """
+    Git activity of a task, i.e. of its branch
+
+    :ivar task_id:
+    :ivar git_branch: branch of task
+    :ivar ref: ref of repository which is the branch (e.g. 'origin/<branch>' if it is only remote), None if not found
+    :ivar commits: commits of branch since it diverged from default branch (first-parent line of branch)
+    :ivar last_commit_at: datetime of the newest commit of branch
+    :ivar last_commit_hexsha:
+    :ivar ahead: commits in branch but not in default branch
+    :ivar behind: commits in default branch but not in branch
+    :ivar user_ids: users who authored commits of branch
+    """
+
+    task_id: int
+    git_branch: str
+    ref: Optional[str] = field(default=None)
+    commits: int = field(default=0)
+    last_commit_at: Optional[str] = field(default=None)
+    last_commit_hexsha: Optional[str] = field(default=None)
+    ahead: int = field(default=0)
+    behind: int = field(default=0)
+    user_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class UserGitStats(DCToDictMixin):
+    """
+    Git activity of a user (commits authored with its email)
+
+    :ivar user_id:
+    :ivar commits:
+    :ivar last_commit_at:
+    """
+
+    user_id: int
+    commits: int = field(default=0)
+    last_commit_at: Optional[str] = field(default=None)
+
+
+class GitActivityIndex:
+    """
+    Links between tasks and commits (by task branch) and between authors and users (by email), with precomputed stats.
+    It is built with only one pass on commits (plus a first-parent walk of each branch), using refs membership bitsets
+    """
+
+    def __init__(self, default_ref: Optional[str], tasks: Dict[int, TaskGitStats], users: Dict[int, UserGitStats],
+                 task_commits: Dict[int, List[LinkedCommit]], user_of_email: Dict[str, int]):
+        self.default_ref = default_ref
+        self.tasks = tasks
+        self.users = users
+        self.task_commits = task_commits        # task id - commits, newest first
+        self.user_of_email = user_of_email
+
+    @staticmethod
+    def resolve_ref(branch: str, refs: List[str]) -> Optional[str]:
+        """
+        Return ref of a branch: local branch, else a remote branch with the same name
+
+        :param branch:
+        :param refs: available refs
+        :return:
+        """
+
+        if branch in refs:
+            return branch
+
+        return next((ref for ref in refs if not ref.startswith("tags/") and ref.endswith("/" + branch)), None)
+
+    @staticmethod
+    def first_parent_line(tip: str, parents_of: Dict[str, List[str]], stop: set) -> List[str]:
+        """
+        Return commits on first-parent line from tip until a commit in stop (excluded)
+
+        :param tip:
+        :param parents_of:
+        :param stop:
+        :return: hexsha, newest first
+        """
+
+        line: List[str] = []
+
+        current: Optional[str] = tip
+        while current is not None and current not in stop and current in parents_of:
+            line.append(current)
+
+            parents = parents_of[current]
+            current = parents[0] if len(parents) > 0 else None
+
+        return line
+
+    @classmethod
+    def build(cls, records: List[CommitRecord], refs: List[str], bits: Dict[str, int], heads: Dict[str, str],
+              default_ref: Optional[str], task_branches: Dict[int, str], user_of_email: Dict[str, int]) -> 'GitActivityIndex':
+        """
+        Build index
+
+        :param records: commits
+        :param refs: refs of membership (bit i is refs[i])
+        :param bits: hexsha - bitset of refs which contain commit
+        :param heads: ref - hexsha of its head
+        :param default_ref: ref used to compute ahead/behind (e.g. 'main')
+        :param task_branches: task id - git branch
+        :param user_of_email: email (lower case) - user id
+        :return:
+        """
+
+        by_hexsha: Dict[str, CommitRecord] = {record.hexsha: record for record in records}
+        parents_of: Dict[str, List[str]] = {record.hexsha: record.parents for record in records}
+
+        def user_of(record: CommitRecord) -> Optional[int]:
+            return user_of_email.get(record.author_email.lower()) if record.author_email is not None else None
+
+        # users
+        users: Dict[int, UserGitStats] = {user_id: UserGitStats(user_id=user_id) for user_id in set(user_of_email.values())}
+        last_of_user: Dict[int, CommitRecord] = dict()
+        for record in records:
+            user_id = user_of(record)
+
+            if user_id is not None:
+                users[user_id].commits += 1
+
+                if user_id not in last_of_user or record.committed_date > last_of_user[user_id].committed_date:
+                    last_of_user[user_id] = record
+
+        for user_id, record in last_of_user.items():
+            users[user_id].last_commit_at = record.committed_at
+
+        # tasks
+        ref_bit: Dict[str, int] = {ref: i for i, ref in enumerate(refs)}
+        default_bit: Optional[int] = ref_bit.get(default_ref) if default_ref is not None else None
+
+        tasks: Dict[int, TaskGitStats] = dict()
+        task_of_bit: Dict[int, List[int]] = dict()      # bit of ref - tasks with that ref
+        for task_id, branch in task_branches.items():
+            ref = cls.resolve_ref(branch, refs)
+            tasks[task_id] = TaskGitStats(task_id=task_id, git_branch=branch, ref=ref)
+
+            if ref is not None:
+                task_of_bit.setdefault(ref_bit[ref], []).append(task_id)
+
+        tasks_mask: int = 0
+        for bit in task_of_bit.keys():
+            tasks_mask |= 1 << bit
+
+        # only one pass: commits in default and in branch (both), or in branch but not in default (ahead)
+        in_default: int = 0
+        both: Dict[int, int] = dict()       # bit - commits
+        ahead: Dict[int, int] = dict()      # bit - commits
+        for record in records:
+            commit_bits = bits.get(record.hexsha, 0)
+            is_in_default = default_bit is not None and commit_bits >> default_bit & 1
+            counter = both if is_in_default else ahead
+
+            if is_in_default:
+                in_default += 1
+
+            task_bits = commit_bits & tasks_mask
+            while task_bits:
+                low = task_bits & -task_bits
+                bit = low.bit_length() - 1
+                counter[bit] = counter.get(bit, 0) + 1
+                task_bits ^= low
+
+        # first-parent line of default branch: task commits are on first-parent line of task branch until it
+        default_line: set = set()
+        if default_ref is not None and default_ref in heads:
+            default_line = set(cls.first_parent_line(heads[default_ref], parents_of, set()))
+
+        task_commits: Dict[int, List[LinkedCommit]] = dict()
+        for bit, task_ids in task_of_bit.items():
+            ref = refs[bit]
+            line = cls.first_parent_line(heads[ref], parents_of, default_line if ref != default_ref else set())
+
+            commits = [LinkedCommit(hexsha=h, message=by_hexsha[h].message, committed_at=by_hexsha[h].committed_at,
+                                    author_email=by_hexsha[h].author_email, user_id=user_of(by_hexsha[h]))
+                       for h in line]
+
+            newest: Optional[CommitRecord] = max((by_hexsha[h] for h in line), key=lambda r: r.committed_date, default=None)
+
+            for task_id in task_ids:
+                stats = tasks[task_id]
+                stats.commits = len(commits)
+                stats.ahead = ahead.get(bit, 0) if default_bit is not None else 0
+                stats.behind = in_default - both.get(bit, 0) if default_bit is not None else 0
+                stats.user_ids = sorted(set(c.user_id for c in commits if c.user_id is not None))
+
+                if newest is not None:
+                    stats.last_commit_at = newest.committed_at
+                    stats.last_commit_hexsha = newest.hexsha
+
+                task_commits[task_id] = commits
+
+        return cls(default_ref, tasks, users, task_commits, user_of_email)
+
+    def task_activity(self, task_id: int, last: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return stats and commits of a task
+
+        :param task_id:
+        :param last: max number of commits (newest)
+        :return: None if task has not a branch
+        """
+
+        stats = self.tasks.get(task_id)
+
+        if stats is None:
+            return None
+
+        return {
+            **stats.to_dict(),
+            "default_ref": self.default_ref,
+            "last_commits": [c.to_dict() for c in self.task_commits.get(task_id, [])[:last]],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return stats of all tasks and users
+
+        :return:
+        """
+
+        return {
+            "default_ref": self.default_ref,
+            "tasks": [stats.to_dict() for stats in self.tasks.values()],
+            "users": [stats.to_dict() for stats in self.users.values()],
+        }
+
+    @staticmethod
+    def key(heads: Dict[str, str], task_branches: Dict[int, str], user_of_email: Dict[str, int]) -> Tuple:
+        """
+        Return a key which changes when index must be rebuilt
+
+        :return:
+        """
+
+        return tuple(sorted(heads.items())), tuple(sorted(task_branches.items())), tuple(sorted(user_of_email.items()))
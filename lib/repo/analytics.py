@@ -0,0 +1,281 @@
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from itertools import accumulate, repeat
+from typing import List, Dict, Optional, Any, Tuple, Sequence, Iterator
+from lib.repo.record import CommitRecord
+
+
+SECONDS_OF_DAY: int = 86400
+SECONDS_OF_HOUR: int = 3600
+HOURS_OF_WEEK: int = 168
+MONDAY_SHIFT: int = 72      # 1970-01-01 (day 0) is a Thursday: hours to add to count hours of week from Monday
+
+
+def utc_offset_of(committed_at: str) -> int:
+    """
+    Return UTC offset (seconds) of an ISO datetime like '2024-01-31T10:00:00+02:00' (0 if it has not an offset)
+
+    :param committed_at:
+    :return:
+    """
+
+    if committed_at.endswith("Z"):
+        return 0
+
+    sign = committed_at[-6:-5]
+
+    if sign not in ("+", "-") or committed_at[-3:-2] != ":":
+        return 0
+
+    offset = int(committed_at[-5:-3]) * SECONDS_OF_HOUR + int(committed_at[-2:]) * 60
+
+    return -offset if sign == "-" else offset
+
+
+def day_to_iso(day: int) -> str:
+    return (datetime(1970, 1, 1) + timedelta(days=day)).date().isoformat()
+
+
+def timestamp_to_iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class Groups:
+    """
+    Positions of a column grouped by value: positions are sorted by value once (in C), then each group is a range of
+    sorted positions, so sums of other columns by group are differences of prefix sums
+    """
+
+    def __init__(self, keys: Sequence[int]):
+        self.order: List[int] = sorted(range(len(keys)), key=keys.__getitem__)      # stable: positions stay sorted
+
+        sorted_keys: List[int] = list(map(keys.__getitem__, self.order))
+        self.keys: List[int] = sorted(set(sorted_keys))
+        self.ends: List[int] = [bisect_right(sorted_keys, key) for key in self.keys]
+        self.starts: List[int] = [0] + self.ends[:-1]
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Iterate on groups as (key, start, end) of self.order
+        """
+
+        return zip(self.keys, self.starts, self.ends)
+
+    def counts(self) -> List[int]:
+        return list(map(operator.sub, self.ends, self.starts))
+
+    def sums(self, values: Sequence[int]) -> List[int]:
+        prefix: List[int] = list(accumulate(map(values.__getitem__, self.order), initial=0))
+
+        return list(map(operator.sub, map(prefix.__getitem__, self.ends), map(prefix.__getitem__, self.starts)))
+
+
+class CommitColumns:
+    """
+    Columnar representation of commits: one array for each attribute (timestamps, author ids, diff stats...),
+    sorted by commit datetime. Aggregations bucket whole columns with map/zip/Counter (loops run in C)
+    instead of walking commit objects, time ranges are selected with a binary search on timestamps.
+    Days and hours are local to committer (its UTC offset)
+    """
+
+    def __init__(self, records: List[CommitRecord], refs: List[str], bits: Dict[str, int]):
+        """
+        :param records: commits
+        :param refs: refs of membership (bit i is refs[i])
+        :param bits: hexsha - bitset of refs which contain commit
+        """
+
+        records = sorted(records, key=lambda record: record.committed_date)
+
+        self.refs = refs
+        self.has_stats: bool = len(records) > 0 and all(record.additions is not None for record in records)
+
+        # authors are encoded as int (index of self.authors), by email
+        self.authors: List[Tuple[str, str]] = []        # (email, name)
+        author_ids: Dict[str, int] = dict()
+
+        def author_id_of(record: CommitRecord) -> int:
+            email = record.author_email.lower()
+
+            if email not in author_ids:
+                author_ids[email] = len(self.authors)
+                self.authors.append((record.author_email, record.author_name))
+
+            return author_ids[email]
+
+        self.timestamps = array("q", (record.committed_date for record in records))
+        self.author_ids = array("l", map(author_id_of, records))
+        self.additions = array("q", (record.additions or 0 for record in records))
+        self.deletions = array("q", (record.deletions or 0 for record in records))
+        self.bits: List[int] = [bits.get(record.hexsha, 0) for record in records]
+
+        # local time of committer
+        offsets = array("q", (utc_offset_of(record.committed_at) for record in records))
+        local = array("q", map(operator.add, self.timestamps, offsets))
+
+        self.days = array("q", map(operator.floordiv, local, repeat(SECONDS_OF_DAY)))
+        self.hours = array("q", map(operator.floordiv, local, repeat(SECONDS_OF_HOUR)))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def range_of(self, since: Optional[float] = None, until: Optional[float] = None) -> slice:
+        """
+        Return slice of commits committed in [since, until]
+
+        :param since: timestamp (None means from the first commit)
+        :param until: timestamp (None means until the last commit)
+        :return:
+        """
+
+        start = bisect_left(self.timestamps, since) if since is not None else 0
+        stop = bisect_right(self.timestamps, until) if until is not None else len(self.timestamps)
+
+        return slice(start, stop)
+
+    def author(self, author_id: int) -> Dict[str, str]:
+        email, name = self.authors[author_id]
+
+        return {"author_email": email, "author_name": name}
+
+    def commits_per_author_per_day(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Return number of commits of each author for each day
+
+        :param since: timestamp
+        :param until: timestamp
+        :return: for each author, day (ISO date) - commits
+        """
+
+        selection = self.range_of(since, until)
+        days = self.days[selection]
+
+        if len(days) == 0:
+            return []
+
+        # (author, day) encoded as only one int: author * span + day offset
+        first_day = min(days)
+        span = max(days) - first_day + 1
+        counts: Counter = Counter(map(operator.add, map(operator.mul, self.author_ids[selection], repeat(span)),
+                                      map(operator.sub, days, repeat(first_day))))
+
+        iso_days: List[str] = [day_to_iso(first_day + day) for day in range(span)]
+
+        per_author: Dict[int, Dict[str, int]] = dict()
+        for key in sorted(counts.keys()):
+            author_id, day = divmod(key, span)
+            per_author.setdefault(author_id, dict())[iso_days[day]] = counts[key]
+
+        return [{**self.author(author_id), "commits": sum(days.values()), "days": days}
+                for author_id, days in per_author.items()]
+
+    def branch_activity(self) -> List[Dict[str, Any]]:
+        """
+        Return activity of each ref: commits, authors, churn, first and last commit datetime.
+        Commits are grouped by refs bitset (few distinct values), then each group is added to its refs
+
+        :return:
+        """
+
+        groups = Groups(self.bits)
+        group_commits = groups.counts()
+        group_additions = groups.sums(self.additions)
+        group_deletions = groups.sums(self.deletions)
+
+        commits: List[int] = [0] * len(self.refs)
+        additions: List[int] = [0] * len(self.refs)
+        deletions: List[int] = [0] * len(self.refs)
+        authors: List[set] = [set() for _ in self.refs]
+        first: List[Optional[int]] = [None] * len(self.refs)
+        last: List[Optional[int]] = [None] * len(self.refs)
+
+        for i, (commit_bits, start, end) in enumerate(groups):
+            if commit_bits == 0:
+                continue
+
+            positions = groups.order[start:end]     # sorted by datetime
+            group_authors = set(map(self.author_ids.__getitem__, positions))
+            group_first = self.timestamps[positions[0]]
+            group_last = self.timestamps[positions[-1]]
+
+            while commit_bits:
+                low = commit_bits & -commit_bits
+                bit = low.bit_length() - 1
+                commit_bits ^= low
+
+                commits[bit] += group_commits[i]
+                additions[bit] += group_additions[i]
+                deletions[bit] += group_deletions[i]
+                authors[bit] |= group_authors
+                first[bit] = group_first if first[bit] is None else min(first[bit], group_first)
+                last[bit] = group_last if last[bit] is None else max(last[bit], group_last)
+
+        return [{
+            "ref": ref,
+            "commits": commits[i],
+            "authors": len(authors[i]),
+            "additions": additions[i] if self.has_stats else None,
+            "deletions": deletions[i] if self.has_stats else None,
+            "first_commit_at": timestamp_to_iso(first[i]) if first[i] is not None else None,
+            "last_commit_at": timestamp_to_iso(last[i]) if last[i] is not None else None,
+        } for i, ref in enumerate(self.refs)]
+
+    def churn(self, by: str = "day", since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return lines added and removed for each day or author
+
+        :param by: 'day' or 'author'
+        :param since: timestamp
+        :param until: timestamp
+        :return: churn rows, empty if diff stats are not available
+        :raise ValueError: if by is not valid
+        """
+
+        if by not in ("day", "author"):
+            raise ValueError(f"invalid churn bucket: {by}")
+
+        if not self.has_stats:
+            return {"stats_available": False, "rows": []}
+
+        selection = self.range_of(since, until)
+        keys = self.days[selection] if by == "day" else self.author_ids[selection]
+
+        groups = Groups(keys)
+
+        rows: List[Dict[str, Any]] = []
+        for key, commits, additions, deletions in zip(groups.keys, groups.counts(), groups.sums(self.additions[selection]),
+                                                      groups.sums(self.deletions[selection])):
+            row = {"day": day_to_iso(key)} if by == "day" else self.author(key)
+
+            rows.append({**row, "commits": commits, "additions": additions, "deletions": deletions})
+
+        return {"stats_available": True, "rows": rows}
+
+    def hour_of_week(self, since: Optional[float] = None, until: Optional[float] = None,
+                     author_email: Optional[str] = None) -> List[List[int]]:
+        """
+        Return heatmap of commits by weekday (Monday first) and hour (committer local time)
+
+        :param since: timestamp
+        :param until: timestamp
+        :param author_email: only commits of this author
+        :return: 7 rows of 24 counts
+        """
+
+        selection = self.range_of(since, until)
+        hours = self.hours[selection]
+
+        if author_email is not None:
+            author_id = next((i for i, (email, _) in enumerate(self.authors) if email.lower() == author_email.lower()), None)
+
+            if author_id is None:
+                return [[0] * 24 for _ in range(7)]
+
+            hours = [hour for hour, commit_author in zip(hours, self.author_ids[selection]) if commit_author == author_id]
+
+        counts: Counter = Counter(map(operator.mod, map(operator.add, hours, repeat(MONDAY_SHIFT)), repeat(HOURS_OF_WEEK)))
+
+        return [[counts.get(day * 24 + hour, 0) for hour in range(24)] for day in range(7)]
@@ -0,0 +1,200 @@
+import sqlite3
+from contextlib import closing
+from typing import List, Tuple, Dict, Optional, Iterable, Callable
+from lib.repo.record import CommitRecord
+from lib.utils.logger import Logger
+
+
+class CommitGraphCache:
+    """
+    Persistent commits graph of a repository (SQLite file in work directory), keyed by last seen ref tips.
+
+    Cached commits are always closed on ancestors, so on refresh only commits reachable from new tips, but not from
+    previous tips, are read; commits no longer reachable from refs (e.g. after a force-push) are pruned.
+    Commits are stored with a sequence number: sorted by it, parents are always before their children.
+    """
+
+    FILE_NAME: str = "repo_cache.db"
+    SCHEMA_VERSION: int = 2     # file with another version is rebuilt
+
+    def __init__(self, path: str, verbose: bool = False, with_stats: bool = False):
+        """
+        :param path: cache file path
+        :param verbose:
+        :param with_stats: True if cached commits must have diff stats (cache without them is rebuilt)
+        """
+
+        self.path = path
+        self.verbose = verbose
+        self.with_stats = with_stats
+
+        # tips and records of last refresh, so they are not re-read from file if tips are unchanged
+        self.__tips: Optional[Dict[str, str]] = None
+        self.__records: Optional[List[CommitRecord]] = None
+
+    def __connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+
+        if connection.execute("Pragma user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            connection.executescript(f"""\
+                Drop Table If Exists commit_record;
+                Drop Table If Exists ref_tip;
+                Pragma user_version = {self.SCHEMA_VERSION};
+            """)
+
+        connection.executescript("""\
+            Create Table If Not Exists commit_record (
+                hexsha TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                parents TEXT NOT NULL,
+                author_email TEXT,
+                author_name TEXT,
+                message TEXT,
+                committed_at TEXT,
+                committed_date INTEGER,
+                additions INTEGER,
+                deletions INTEGER,
+                files_changed INTEGER
+            );
+            Create Table If Not Exists ref_tip (
+                name TEXT PRIMARY KEY,
+                hexsha TEXT NOT NULL
+            );
+        """)
+
+        return connection
+
+    @staticmethod
+    def __load_tips(connection: sqlite3.Connection) -> Dict[str, str]:
+        return dict(connection.execute("Select name, hexsha From ref_tip").fetchall())
+
+    @staticmethod
+    def __load_records(connection: sqlite3.Connection) -> List[CommitRecord]:
+        """
+        Return cached commits, children before parents
+        """
+
+        rows = connection.execute("""Select hexsha, parents, author_email, author_name, message, committed_at, committed_date,
+                                            additions, deletions, files_changed
+                                     From commit_record Order By seq Desc""")
+
+        return [CommitRecord(hexsha=hexsha, parents=parents.split(" ") if parents != "" else [], author_email=author_email,
+                             author_name=author_name, message=message, committed_at=committed_at,
+                             committed_date=committed_date, additions=additions, deletions=deletions,
+                             files_changed=files_changed)
+                for hexsha, parents, author_email, author_name, message, committed_at, committed_date,
+                    additions, deletions, files_changed in rows]
+
+    def refresh(self, heads: List[Tuple[str, str]],
+                read_commits: Callable[[List[str], List[str]], Iterable[CommitRecord]]) -> List[CommitRecord]:
+        """
+        Update cache with current ref heads and return all cached commits reachable from them
+
+        :param heads: (ref name, hexsha of its head)
+        :param read_commits: function which takes tips to include and tips to exclude and returns commits
+                             reachable from the first ones but not from the second ones, children before parents
+        :return: commits in topological order, children before parents
+        """
+
+        tips: Dict[str, str] = dict(heads)
+
+        if self.__tips == tips and self.__records is not None:
+            return list(self.__records)
+
+        with closing(self.__connect()) as connection:
+            cached_tips = self.__load_tips(connection)
+            records = self.__load_records(connection)
+
+            if self.with_stats and any(record.additions is None for record in records):     # read without stats
+                Logger.log_info(msg="cached commits have not diff stats, cache is rebuilt", is_verbose=self.verbose)
+
+                cached_tips = dict()
+                records = []
+                connection.execute("Delete From commit_record")
+
+            if cached_tips != tips:
+                cached: set = set(record.hexsha for record in records)
+
+                include: List[str] = list(set(h for h in tips.values() if h not in cached))
+                exclude: List[str] = list(set(h for h in cached_tips.values() if h in cached))
+
+                new_records: List[CommitRecord] = []
+                if len(include) > 0:
+                    try:
+                        new_records = [record for record in read_commits(include, exclude) if record.hexsha not in cached]
+
+                    except Exception as e:      # e.g. an excluded tip has been removed by gc: read all again
+                        Logger.log_warning(msg=f"incremental reading of commits failed ({e}), cache is rebuilt",
+                                           is_verbose=self.verbose)
+
+                        records = []
+                        new_records = list(read_commits(list(set(tips.values())), []))
+
+                        connection.execute("Delete From commit_record")
+
+                Logger.log_info(msg="%s new commit(s) cached", args=(len(new_records),), is_verbose=self.verbose)
+
+                records = new_records + records
+
+                # prune commits which are not reachable from current tips (e.g. after a force-push)
+                records = self.__reachable(records, set(tips.values()))
+
+                self.__store(connection, new_records, records, tips)
+
+        self.__tips = tips
+        self.__records = records
+
+        return list(records)
+
+    @staticmethod
+    def __reachable(records: List[CommitRecord], tips: set) -> List[CommitRecord]:
+        """
+        Return records reachable from tips (order is kept)
+
+        :param records: children before parents
+        :param tips:
+        :return:
+        """
+
+        reachable: set = set(tips)
+        for record in records:
+            if record.hexsha in reachable:
+                reachable.update(record.parents)
+
+        return [record for record in records if record.hexsha in reachable]
+
+    @staticmethod
+    def __store(connection: sqlite3.Connection, new_records: List[CommitRecord], records: List[CommitRecord],
+                tips: Dict[str, str]) -> None:
+        """
+        Store new commits (parents first), remove unreachable commits and replace tips, in one transaction
+        """
+
+        with connection:
+            start = connection.execute("Select Coalesce(Max(seq), 0) From commit_record").fetchone()[0] + 1
+
+            connection.executemany("""Insert Or Replace Into commit_record
+                                      (hexsha, seq, parents, author_email, author_name, message, committed_at, committed_date,
+                                       additions, deletions, files_changed)
+                                      Values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                                   ((r.hexsha, start + i, " ".join(r.parents), r.author_email, r.author_name, r.message,
+                                     r.committed_at, r.committed_date, r.additions, r.deletions, r.files_changed)
+                                    for i, r in enumerate(reversed(new_records))))
+
+            connection.execute("Create Temp Table If Not Exists reachable (hexsha TEXT PRIMARY KEY)")
+            connection.execute("Delete From reachable")
+            connection.executemany("Insert Into reachable Values (?)", ((r.hexsha,) for r in records))
+            connection.execute("Delete From commit_record Where hexsha Not In (Select hexsha From reachable)")
+
+            connection.execute("Delete From ref_tip")
+            connection.executemany("Insert Into ref_tip (name, hexsha) Values (?, ?)", tips.items())
+
+    def invalidate(self) -> None:
+        """
+        Forget tips of last refresh, so next refresh checks tips in file again
+
+        :return:
+        """
+
+        self.__tips = None
+        self.__records = None
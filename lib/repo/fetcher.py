@@ -0,0 +1,184 @@
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Optional, Dict, Any
+from lib.utils.logger import Logger
+
+
+class FetchScheduler:
+    """
+    Run a fetch function in a background thread every interval seconds.
+    After a failure the next fetch is delayed with an exponential back-off (up to max_interval),
+    a success restores the base interval. Callers never wait for network: they read what is local.
+    """
+
+    IDLE: str = "idle"
+    FETCHING: str = "fetching"
+    FAILED: str = "failed"
+    STOPPED: str = "stopped"
+
+    JOIN_TIMEOUT: float = 5     # seconds
+
+    def __init__(self, fetch: Callable[[], bool], interval: float, max_interval: Optional[float] = None,
+                 backoff_factor: float = 2, verbose: bool = False):
+        """
+        :param fetch: function which fetches, returns True if refs are changed; it raises an exception on failure
+        :param interval: seconds between two fetches
+        :param max_interval: max seconds between two fetches after failures (default interval)
+        :param backoff_factor: multiplier of interval for each consecutive failure
+        :param verbose:
+        """
+
+        self.fetch = fetch
+        self.interval = interval
+        self.max_interval = max_interval if max_interval is not None else interval
+        self.backoff_factor = backoff_factor
+        self.verbose = verbose
+
+        self.state: str = self.STOPPED
+        self.failures: int = 0              # consecutive failures
+        self.last_error: Optional[str] = None
+        self.last_attempt_at: Optional[float] = None
+        self.last_fetch_at: Optional[float] = None          # last successful fetch
+        self.last_change_at: Optional[float] = None         # last fetch which changed refs
+        self.next_fetch_at: Optional[float] = None
+
+        self.__fetch_lock = threading.Lock()
+        # each run has its own events, so a run not stopped within JOIN_TIMEOUT is not restarted by start()
+        self.__wake = threading.Event()
+        self.__stop = threading.Event()
+        self.__stop.set()
+        self.__thread: Optional[threading.Thread] = None
+
+    @property
+    def delay(self) -> float:
+        """
+        Return seconds to wait before next fetch, based on consecutive failures
+
+        :return:
+        """
+
+        if self.failures == 0:
+            return self.interval
+
+        return min(self.interval * self.backoff_factor ** self.failures, self.max_interval)
+
+    def fetch_once(self) -> bool:
+        """
+        Fetch now (in caller thread) and update status
+
+        :return: True if fetch succeeded
+        """
+
+        with self.__fetch_lock:
+            self.state = self.FETCHING
+            self.last_attempt_at = time.time()
+
+            try:
+                changed: bool = self.fetch()
+
+                self.failures = 0
+                self.last_error = None
+                self.last_fetch_at = time.time()
+
+                if changed:
+                    self.last_change_at = self.last_fetch_at
+
+                self.state = self.IDLE
+
+                return True
+
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                self.state = self.FAILED
+
+                Logger.log_warning(msg="fetch failed (%s consecutive failure(s)), next in %ss",
+                                   args=(self.failures, round(self.delay, 2)), is_verbose=self.verbose)
+
+                return False
+
+    def __run(self, stop: threading.Event, wake: threading.Event) -> None:
+        while not stop.is_set():
+            self.fetch_once()
+
+            if stop.is_set():
+                break
+
+            self.next_fetch_at = time.time() + self.delay
+
+            wake.wait(self.delay)
+            wake.clear()
+
+        if stop is self.__stop:         # status belongs to a newer run otherwise
+            self.next_fetch_at = None
+            self.state = self.STOPPED
+
+    def start(self) -> None:
+        """
+        Start fetching in background, first fetch is immediate
+
+        :return:
+        """
+
+        if self.running:
+            return
+
+        self.__stop = threading.Event()
+        self.__wake = threading.Event()
+
+        self.__thread = threading.Thread(target=self.__run, args=(self.__stop, self.__wake), name="repo-fetch",
+                                         daemon=True)
+        self.__thread.start()
+
+    def wake(self) -> None:
+        """
+        Anticipate next background fetch to now (without waiting for it)
+
+        :return:
+        """
+
+        self.__wake.set()
+
+    def stop(self) -> None:
+        """
+        Stop background fetching, a running fetch is waited at most JOIN_TIMEOUT seconds
+        (then its thread exits by itself when fetch ends)
+
+        :return:
+        """
+
+        self.__stop.set()
+        self.__wake.set()
+
+        if self.__thread is not None:
+            self.__thread.join(self.JOIN_TIMEOUT)
+
+        self.__thread = None
+        self.state = self.STOPPED
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @staticmethod
+    def __iso(timestamp: Optional[float]) -> Optional[str]:
+        return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return fetch status, times in ISO format
+
+        :return:
+        """
+
+        return {
+            "state": self.state,
+            "interval": self.interval,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_attempt_at": self.__iso(self.last_attempt_at),
+            "last_fetch_at": self.__iso(self.last_fetch_at),
+            "last_change_at": self.__iso(self.last_change_at),
+            "next_fetch_at": self.__iso(self.next_fetch_at),
+        }
@@ -0,0 +1,128 @@
+import os
+import math
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterator
+from lib.repo.record import CommitRecord
+from lib.repo.log_reader import LOG_FORMAT, parse_log
+
+
+def git(repo_path: str, *args: str, stdin: Optional[str] = None) -> bytes:
+    """
+    Run a git command in repository and return its output
+
+    :raise subprocess.CalledProcessError: if command fails
+    """
+
+    return subprocess.run(["git", "-C", repo_path, *args], input=stdin.encode() if stdin is not None else None,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True).stdout
+
+
+def diff_stats(repo_path: str, hexshas: List[str]) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Return diff stats of commits against their parent (merges have no stats, as in git log)
+
+    :param repo_path:
+    :param hexshas:
+    :return: hexsha - (added lines, deleted lines, changed files)
+    """
+
+    output: str = git(repo_path, "log", "--no-walk=unsorted", "--stdin", "--format=%x00%H", "--numstat",
+                      stdin="\n".join(hexshas) + "\n").decode("utf-8", errors="replace")
+
+    stats: Dict[str, Tuple[int, int, int]] = dict()
+    for entry in output.split("\x00")[1:]:
+        lines = entry.splitlines()
+        additions = deletions = files = 0
+
+        for line in lines[1:]:
+            if line == "":
+                continue
+
+            added, deleted, _ = line.split("\t", 2)
+            files += 1
+
+            if added != "-":        # binary files have no lines
+                additions += int(added)
+                deletions += int(deleted)
+
+        stats[lines[0]] = (additions, deletions, files)
+
+    return stats
+
+
+def read_chunk(task: Tuple[str, List[str], bool]) -> List[CommitRecord]:
+    """
+    Read commits of a chunk (executed by worker processes)
+
+    :param task: repository path, hexsha of commits, True to compute diff stats
+    :return: commits in the same order of chunk
+    """
+
+    repo_path, hexshas, with_stats = task
+
+    output: bytes = git(repo_path, "log", "--no-walk=unsorted", "--stdin", "-z", f"--format={LOG_FORMAT}",
+                        stdin="\n".join(hexshas) + "\n")
+
+    records: List[CommitRecord] = list(parse_log([output]))
+
+    if with_stats:
+        stats = diff_stats(repo_path, hexshas)
+
+        for record in records:
+            record.additions, record.deletions, record.files_changed = stats.get(record.hexsha, (0, 0, 0))
+
+    return records
+
+
+class ParallelReader:
+    """
+    Read commits partitioning them in chunks which are parsed by a pool of worker processes.
+    Only hexsha of commits (in topological order) are listed in parent process, each worker reads metadata
+    (and diff stats, the most expensive part) of its chunk and returns compact records, which are merged in order
+    """
+
+    MIN_CHUNK_SIZE: int = 500
+    CHUNKS_PER_WORKER: int = 4      # more chunks than workers, so workers are balanced
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None, with_stats: bool = False):
+        """
+        :param workers: number of worker processes (None or not positive means number of CPUs), 1 reads in-process
+        :param chunk_size: commits of each chunk (None means based on number of commits and workers)
+        :param with_stats: True to compute diff stats of commits
+        """
+
+        self.workers = workers if workers is not None and workers > 0 else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.with_stats = with_stats
+
+    def read(self, repo_path: str, revisions: List[str]) -> Iterator[CommitRecord]:
+        """
+        Iterate on commits of revisions in topological order (children before parents)
+
+        :param repo_path:
+        :param revisions: e.g. ["--all"] or [hexsha, "^hexsha"]
+        :return:
+        :raise subprocess.CalledProcessError: if git fails (e.g. unknown revision)
+        """
+
+        hexshas: List[str] = git(repo_path, "rev-list", "--topo-order", *revisions, "--").decode().split()
+
+        chunk_size = self.chunk_size
+        if chunk_size is None:
+            chunk_size = max(self.MIN_CHUNK_SIZE, math.ceil(len(hexshas) / (self.workers * self.CHUNKS_PER_WORKER)))
+
+        tasks = [(repo_path, hexshas[i:i + chunk_size], self.with_stats) for i in range(0, len(hexshas), chunk_size)]
+
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield from read_chunk(task)
+
+            return
+
+        # spawn: workers don't inherit threads (e.g. log writer) of app process
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            for records in pool.map(read_chunk, tasks):
+                yield from records
@@ -0,0 +1,87 @@
+import git
+import codecs
+from typing import List, Iterable, Iterator
+from lib.repo.record import CommitRecord
+
+
+# fields of each commit are separated by US (unit separator), commits by NUL (-z):
+# hexsha, parents, author email, author name, commit ISO datetime, commit timestamp, raw message (last, it may contain anything)
+FIELD_SEPARATOR: str = "\x1f"
+RECORD_SEPARATOR: str = "\x00"
+LOG_FORMAT: str = "%x1f".join(("%H", "%P", "%ae", "%an", "%cI", "%ct", "%B"))
+N_FIELDS: int = 7
+
+CHUNK_SIZE: int = 64 * 1024
+
+
+def parse_record(entry: str) -> CommitRecord:
+    """
+    Return commit of a log entry
+
+    :param entry: fields of LOG_FORMAT
+    :return:
+    """
+
+    hexsha, parents, author_email, author_name, committed_at, committed_date, message = entry.split(FIELD_SEPARATOR, N_FIELDS - 1)
+
+    return CommitRecord(hexsha=hexsha,
+                        parents=parents.split(" ") if parents != "" else [],
+                        author_email=author_email,
+                        author_name=author_name,
+                        message=message,
+                        committed_at=committed_at,
+                        committed_date=int(committed_date))
+
+
+def parse_log(chunks: Iterable[bytes]) -> Iterator[CommitRecord]:
+    """
+    Parse output of git log with LOG_FORMAT incrementally: each commit is yielded as soon as it is complete,
+    so whole output is never in memory
+
+    :param chunks: output bytes, split anyhow
+    :return:
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending: str = ""
+
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+
+        entries: List[str] = pending.split(RECORD_SEPARATOR)
+        pending = entries.pop()     # incomplete entry
+
+        for entry in entries:
+            yield parse_record(entry)
+
+    pending += decoder.decode(b"", final=True)
+
+    if pending != "":
+        yield parse_record(pending)
+
+
+def iter_log_records(repo: git.Repo, revisions: List[str]) -> Iterator[CommitRecord]:
+    """
+    Iterate on commits of revisions in topological order (children before parents), reading output of only one
+    git log subprocess
+
+    :param repo:
+    :param revisions: e.g. ["--all"] or [hexsha, "^hexsha"]
+    :return:
+    :raise git.exc.GitCommandError: if git log fails (e.g. unknown revision)
+    """
+
+    process = repo.git.log("-z", "--topo-order", f"--format={LOG_FORMAT}", *revisions, "--", as_process=True)
+
+    def chunks() -> Iterator[bytes]:
+        while True:
+            chunk = process.proc.stdout.read1(CHUNK_SIZE)
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    yield from parse_log(chunks())
+
+    process.wait()      # raise if git log failed
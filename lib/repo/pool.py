@@ -0,0 +1,117 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any, TypeVar
+from lib.repo.repo import RepoManager
+from lib.utils.logger import Logger
+
+
+T = TypeVar("T")
+
+
+class RepoManagerPool:
+    """
+    Opened repository managers of recently used projects (LRU), so switching back to a project finds its graph state
+    (context and cache) warm. Each manager has its own state, so managers of different repositories can be used
+    concurrently by different threads
+    """
+
+    def __init__(self, capacity: int = 3, verbose: bool = False, **manager_kwargs: Any):
+        """
+        :param capacity: max number of opened managers (at least 1), least recently used is closed
+        :param verbose:
+        :param manager_kwargs: arguments of each RepoManager (e.g. backend, workers, diff_stats)
+        """
+
+        self.capacity = max(1, capacity)
+        self.verbose = verbose
+        self.manager_kwargs = manager_kwargs
+
+        self.__managers: OrderedDict[str, RepoManager] = OrderedDict()     # path - manager, least recent first
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key_of(path: str) -> str:
+        return os.path.realpath(path)
+
+    def get(self, path: str) -> RepoManager:
+        """
+        Return manager of repository in path, it is opened if it is not in pool
+
+        :param path: project path
+        :return:
+        """
+
+        key = self.key_of(path)
+
+        with self.__lock:
+            manager: Optional[RepoManager] = self.__managers.get(key)
+
+            if manager is not None:
+                self.__managers.move_to_end(key)
+                return manager
+
+            manager = RepoManager(project_path=path, verbose=self.verbose, **self.manager_kwargs)
+            manager.open_repo(path)
+
+            self.__managers[key] = manager
+
+            evicted: List[RepoManager] = []
+            while len(self.__managers) > self.capacity:
+                _, oldest = self.__managers.popitem(last=False)
+                evicted.append(oldest)
+
+        for oldest in evicted:
+            Logger.log_info(msg="close repo manager of '%s'", args=(oldest.project_path,), is_verbose=self.verbose)
+            oldest.close()
+
+        return manager
+
+    def paths(self) -> List[str]:
+        """
+        Return paths of opened managers, least recently used first
+
+        :return:
+        """
+
+        with self.__lock:
+            return list(self.__managers.keys())
+
+    def map(self, paths: List[str], fn: Callable[[RepoManager], T], max_workers: Optional[int] = None) -> Dict[str, T]:
+        """
+        Apply fn to manager of each path concurrently (e.g. to analyse several projects)
+
+        :param paths: project paths
+        :param fn: analysis of a repository
+        :param max_workers: number of threads (default number of paths)
+        :return: path - result of fn
+        :raise ValueError: if paths are more than capacity (a manager would be closed while it is used)
+        """
+
+        if len(set(self.key_of(path) for path in paths)) > self.capacity:
+            raise ValueError(f"too many repositories ({len(paths)}), capacity is {self.capacity}")
+
+        managers: Dict[str, RepoManager] = {path: self.get(path) for path in paths}
+
+        if len(managers) == 0:
+            return dict()
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(managers)) as executor:
+            futures = {path: executor.submit(fn, manager) for path, manager in managers.items()}
+
+            return {path: future.result() for path, future in futures.items()}
+
+    def close(self) -> None:
+        """
+        Close all managers
+
+        :return:
+        """
+
+        with self.__lock:
+            managers: List[RepoManager] = list(self.__managers.values())
+            self.__managers.clear()
+
+        for manager in managers:
+            manager.close()
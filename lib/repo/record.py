@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import git
+
+
+@dataclass
+class CommitRecord:
+    """
+    Data of a commit read from repository
+
+    :ivar hexsha:
+    :ivar parents: parents hexsha
+    :ivar author_email:
+    :ivar author_name:
+    :ivar message:
+    :ivar committed_at: commit datetime as ISO string
+    :ivar committed_date: commit datetime as timestamp
+    :ivar additions: added lines (None if diff stats are not read, 0 for merges)
+    :ivar deletions: deleted lines (None if diff stats are not read, 0 for merges)
+    :ivar files_changed: changed files (None if diff stats are not read, 0 for merges)
+    """
+
+    hexsha: str
+    parents: List[str]
+    author_email: str
+    author_name: str
+    message: str
+    committed_at: str
+    committed_date: int
+    additions: Optional[int] = field(default=None)
+    deletions: Optional[int] = field(default=None)
+    files_changed: Optional[int] = field(default=None)
+
+    @classmethod
+    def from_commit(cls, commit: 'git.Commit') -> 'CommitRecord':
+        return cls(hexsha=commit.hexsha,
+                   parents=[parent.hexsha for parent in commit.parents],
+                   author_email=commit.author.email,
+                   author_name=commit.author.name,
+                   message=commit.message,
+                   committed_at=commit.committed_datetime.isoformat(),
+                   committed_date=commit.committed_date)
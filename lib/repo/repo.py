@@ -1,29 +1,134 @@
 import git
-from dataclasses import dataclass, field
+import threading
+from dataclasses import dataclass, field, replace, fields, asdict, is_dataclass
+from datetime import datetime
 from lib.utils.logger import Logger
 from lib.db.entity.user import UserModel
 from lib.db.entity.task import TaskModel
-from typing import List, Set, Optional, Dict
+from typing import List, Set, Optional, Dict, Any, Tuple, Iterator
 import copy
 from lib.utils.mixin.dcparser import DCToDictMixin
+from lib.repo.record import CommitRecord
+from lib.repo.cache import CommitGraphCache
+from lib.repo.fetcher import FetchScheduler
+from lib.repo.log_reader import iter_log_records
+from lib.repo.ingest import ParallelReader
+from lib.settings.settings import SettingsManager
+import os
 from lib.utils.utils import Utils
 from pprint import pprint
 from time import perf_counter
 
-# global variables to pass associations to RepoNode dataclass
-associations_commits_tags: Dict[str, str] = dict()  # hexsha - tag's name
-associations_commits_branches: Dict[str, str] = dict()     # hexsha - branch
-# DEPRECATED: associations_commits_users: Dict[str, int] = dict()         # email - user_id
-# DEPRECATED: associations_commits_tasks: Dict[str, List[int]] = dict()         # branch - [task_id]
-
-DEBUG_MODE: bool = False        # it will be changed by Repo init
+# links between commits and tasks/users are maintained by GitActivityIndex (lib/repo/activity.py)
 
 
 @dataclass
 class Author:
     email: str
     name: str
-    # DEPRECATED: associated_user_id: Optional[int] = field(default=None)
+
+
+class BranchMembership:
+    """
+    Refs (branches, tags...) which contain each commit, stored as bitsets: bit i of a commit is set if refs[i] reaches it.
+    It is computed with only one walk of commits in topological order (children before parents), propagating bits
+    from each commit to its parents. Owner of a commit is the containing ref with the highest bit,
+    so refs are passed from the lowest to the highest priority.
+    """
+
+    def __init__(self, refs: List[str], bits: Dict[str, int]):
+        self.refs = refs
+        self.bits = bits        # hexsha - bitset of refs
+
+    @classmethod
+    def compute(cls, records: List[CommitRecord], heads: List[Tuple[str, str]]) -> 'BranchMembership':
+        """
+        Compute membership
+
+        :param records: commits in topological order, children before parents
+        :param heads: (ref name, hexsha of its head) from the lowest to the highest priority
+        :return:
+        """
+
+        refs: List[str] = []
+        bits: Dict[str, int] = dict()
+
+        for i, (name, hexsha) in enumerate(heads):
+            refs.append(name)
+            bits[hexsha] = bits.get(hexsha, 0) | (1 << i)
+
+        for record in records:
+            commit_bits = bits.get(record.hexsha, 0)
+
+            if commit_bits == 0:
+                continue
+
+            for parent in record.parents:
+                bits[parent] = bits.get(parent, 0) | commit_bits
+
+        return cls(refs, bits)
+
+    def owner(self, hexsha: str) -> Optional[str]:
+        """
+        Return the ref with the highest priority which contains commit, None if no ref contains it
+
+        :param hexsha:
+        :return:
+        """
+
+        commit_bits = self.bits.get(hexsha, 0)
+
+        if commit_bits == 0:
+            return None
+
+        return self.refs[commit_bits.bit_length() - 1]
+
+    def refs_of(self, hexsha: str) -> List[str]:
+        """
+        Return all refs which contain commit
+
+        :param hexsha:
+        :return:
+        """
+
+        commit_bits = self.bits.get(hexsha, 0)
+
+        return [ref for i, ref in enumerate(self.refs) if commit_bits >> i & 1]
+
+    def contains(self, ref: str, hexsha: str) -> bool:
+        """
+        Return True if ref contains commit
+
+        :param ref:
+        :param hexsha:
+        :return:
+        """
+
+        if ref not in self.refs:
+            return False
+
+        return bool(self.bits.get(hexsha, 0) >> self.refs.index(ref) & 1)
+
+
+@dataclass(frozen=True)
+class RepoContext:
+    """
+    State of a repository computed by a reading of commits: it is never modified, a new reading creates a new context,
+    so concurrent readers (and background refreshes) of the same or other repositories don't interfere
+
+    :ivar tags: hexsha - tag's name
+    :ivar membership: refs which contain each commit
+    :ivar heads: ref - hexsha of its head
+    :ivar debug_mode:
+    """
+
+    tags: Dict[str, str]
+    membership: BranchMembership
+    heads: Dict[str, str]
+    debug_mode: bool = field(default=False)
+
+    def branch_of(self, hexsha: str) -> Optional[str]:
+        return self.membership.owner(hexsha)
 
 
 @dataclass
@@ -36,7 +141,49 @@ class RepoNode(DCToDictMixin):
     parents: Optional[List['RepoNode']] = field(default=None)     # if None => no information, but it is said that there are no fathers
     children: Optional[List['RepoNode']] = field(default=None)
     tag: Optional[str] = field(default=None)
-    # DEPRECATED: associated_task_id: Optional[List[int]] = field(default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return node as dict, with the same structure of asdict, but built iteratively (long histories don't overflow
+        recursion limit) and without duplicated subtrees: a node reached again through another parent (merge)
+        is emitted without its children, which are already emitted at its first occurrence (pre-order)
+
+        :return:
+        """
+
+        emitted: Set[int] = set()
+
+        root: Dict[str, Any] = dict()
+        stack: List[Tuple['RepoNode', Dict[str, Any], bool]] = [(self, root, True)]     # node, its dict, with dedup
+
+        while len(stack) > 0:
+            node, node_dict, dedup = stack.pop()
+
+            expand: bool = not dedup or id(node) not in emitted
+            if dedup:
+                emitted.add(id(node))
+
+            relatives: List[Tuple['RepoNode', Dict[str, Any], bool]] = []
+            for f in fields(node):
+                value = getattr(node, f.name)
+
+                if f.name in ("parents", "children") and value is not None:
+                    if f.name == "children" and not expand:
+                        value = None
+
+                    else:
+                        dicts = [dict() for _ in value]
+                        relatives.extend(zip(value, dicts, [f.name == "children"] * len(value)))
+                        value = dicts
+
+                elif is_dataclass(value):
+                    value = asdict(value)
+
+                node_dict[f.name] = value
+
+            stack.extend(reversed(relatives))       # reversed, so they are popped in order
+
+        return root
 
     def add_child(self, node: 'RepoNode') -> None:
         """
@@ -73,51 +220,96 @@ class RepoNode(DCToDictMixin):
         return True
 
     @classmethod
-    def from_commit(cls, commit: git.Commit, parents_depth: int = 1) -> 'RepoNode':
+    def from_commit(cls, commit: git.Commit, parents_depth: int = 1, context: Optional[RepoContext] = None) -> 'RepoNode':
         """
         Generate a node from a commit
 
         :param parents_depth: fathers research depth
         :param commit:
+        :param context: context of last reading of repository, it gives branch and tag of commit
         :return:
         """
 
-        global DEBUG_MODE
-        global associations_commits_tags
-        global associations_commits_branches
-        # DEPRECATED: global associations_commits_users
-        # DEPRECATED: global associations_commits_tasks
-
         parents: Optional[List['RepoNode']] = None
 
         if parents_depth > 0:
             parents = []
 
             for p in commit.parents:
-                parents.append(RepoNode.from_commit(p, parents_depth=parents_depth - 1))
+                parents.append(RepoNode.from_commit(p, parents_depth=parents_depth - 1, context=context))
 
-        branch = associations_commits_branches.get(commit.hexsha)
-        if associations_commits_branches.get(commit.hexsha) is None:
-            Logger.log_warning(msg=f"{commit} has not an explicit associated branch", is_verbose=DEBUG_MODE)
+        branch = context.branch_of(commit.hexsha) if context is not None else None
+        if branch is None:
+            Logger.log_warning(msg="%s has not an explicit associated branch", args=(commit,),
+                               is_verbose=context is not None and context.debug_mode)
 
             branch = commit.name_rev.split(" ")[1].split("~")[0]
 
         node = cls(hexsha=commit.hexsha,
                    author=Author(email=commit.author.email,
-                                 name=commit.author.name,
-                                 # DEPRECATED: associated_user_id=associations_commits_users.get(commit.author.email)
-                                 ),
+                                 name=commit.author.name),
                    message=commit.message,
                    committed_at=commit.committed_datetime.isoformat(),
                    parents=parents,
                    children=None,
                    of_branch=branch,
-                   tag=associations_commits_tags.get(commit.hexsha),
-                   # DEPRECATED: associated_task_id=associations_commits_tasks.get(branch)
-                   )
+                   tag=context.tags.get(commit.hexsha) if context is not None else None)
 
         return node
 
+    @classmethod
+    def from_record(cls, record: CommitRecord, of_branch: Optional[str], tag: Optional[str] = None) -> 'RepoNode':
+        """
+        Generate a node (without parents and children) from a commit record
+
+        :param record:
+        :param of_branch: branch which owns commit
+        :param tag:
+        :return:
+        """
+
+        return cls(hexsha=record.hexsha,
+                   author=Author(email=record.author_email, name=record.author_name),
+                   message=record.message,
+                   committed_at=record.committed_at,
+                   parents=None,
+                   children=None,
+                   of_branch=of_branch,
+                   tag=tag)
+
+    @staticmethod
+    def link_nodes(nodes: List['RepoNode'], parents_of: Dict[str, List[str]]) -> List['RepoNode']:
+        """
+        Link nodes (without parents and children) in linear time, using a parent -> children map built in a single pass.
+        Each returned node has parents (without their relatives) and children (with their parents but without children),
+        children are in the same order of nodes. Copies are shallow, so data of each node is shared.
+
+        :param nodes: nodes without relatives, they are used as parents
+        :param parents_of: hexsha - parents hexsha
+        :return: linked nodes in the same order of nodes
+        """
+
+        by_hexsha: Dict[str, 'RepoNode'] = {node.hexsha: node for node in nodes}
+
+        children_of: Dict[str, List[str]] = dict()      # hexsha - children hexsha
+        for node in nodes:
+            for parent_hexsha in parents_of[node.hexsha]:
+                children_of.setdefault(parent_hexsha, []).append(node.hexsha)
+
+        # node as child: it has its parents, but not its children
+        as_child: Dict[str, 'RepoNode'] = dict()
+        for node in nodes:
+            as_child[node.hexsha] = replace(node, parents=[by_hexsha[p] for p in parents_of[node.hexsha] if p in by_hexsha])
+
+        linked: List['RepoNode'] = []
+        for node in nodes:
+            children = children_of.get(node.hexsha)
+
+            linked.append(replace(as_child[node.hexsha],
+                                  children=[as_child[c] for c in children] if children is not None else None))
+
+        return linked
+
     @staticmethod
     def copy_of(node: 'RepoNode') -> 'RepoNode':
         """
@@ -132,7 +324,7 @@ class RepoNode(DCToDictMixin):
     @staticmethod
     def search_node_by_hexsha(node: 'RepoNode', hexsha: str, _partial_result: Optional[List] = None, _visited: Optional[Set] = None) -> List['RepoNode']:
         """
-        Search all occurrences of child node of a source node by its hexsha
+        Search all occurrences of child node of a source node by its hexsha (iterative DFS, each node is visited once)
 
         :param _visited:
         :param _partial_result:
@@ -147,50 +339,196 @@ class RepoNode(DCToDictMixin):
         if _visited is None:
             _visited = set()     # init empty
 
-        if node.hexsha == hexsha:       # found node
-            _partial_result.append(node)
+        stack: List['RepoNode'] = [node]
+        while len(stack) > 0:
+            current = stack.pop()
+
+            if id(current) in _visited:
+                continue
 
-        _visited.add(id(node))
+            _visited.add(id(current))
 
-        for child in node.children:
-            if id(child) not in _visited:
-                RepoNode.search_node_by_hexsha(node=child, hexsha=hexsha, _partial_result=_partial_result, _visited=_visited)
+            if current.hexsha == hexsha:       # found node
+                _partial_result.append(current)
+
+            if current.children is not None:
+                stack.extend(reversed(current.children))
 
         return _partial_result
 
 
+@dataclass
+class RepoGraph(DCToDictMixin):
+    """
+    Compact (flat) representation of a commits graph: a node table in columns, where row i is a commit,
+    edges as parent row indexes and authors and branches interned in lookup tables.
+    Unlike nested RepoNode, each commit is serialized only once, whatever the number of merges
+
+    :ivar hexsha: hexsha of each row
+    :ivar index: hexsha - row
+    :ivar message: message of each row
+    :ivar committed_at: commit datetime (ISO) of each row
+    :ivar author: author (index in authors) of each row
+    :ivar branch: branch (index in branches) of each row
+    :ivar tag: tag of each row (None if row has not tag)
+    :ivar parents: parent rows of each row
+    :ivar authors: interned authors
+    :ivar branches: interned branches
+    """
+
+    hexsha: List[str] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+    message: List[str] = field(default_factory=list)
+    committed_at: List[str] = field(default_factory=list)
+    author: List[int] = field(default_factory=list)
+    branch: List[int] = field(default_factory=list)
+    tag: List[Optional[str]] = field(default_factory=list)
+    parents: List[List[int]] = field(default_factory=list)
+    authors: List[Author] = field(default_factory=list)
+    branches: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_nodes(cls, nodes: List[RepoNode], parents_of: Dict[str, List[str]]) -> 'RepoGraph':
+        """
+        Generate graph from nodes (their relatives are not used), rows are in the same order of nodes
+
+        :param nodes:
+        :param parents_of: hexsha - parents hexsha
+        :return:
+        """
+
+        graph = cls()
+
+        authors_index: Dict[Tuple[str, str], int] = dict()
+        branches_index: Dict[str, int] = dict()
+
+        for node in nodes:
+            graph.index[node.hexsha] = len(graph.hexsha)
+            graph.hexsha.append(node.hexsha)
+            graph.message.append(node.message)
+            graph.committed_at.append(node.committed_at)
+            graph.tag.append(node.tag)
+
+            author_key = (node.author.email, node.author.name)
+            if author_key not in authors_index:
+                authors_index[author_key] = len(graph.authors)
+                graph.authors.append(node.author)
+
+            graph.author.append(authors_index[author_key])
+
+            if node.of_branch not in branches_index:
+                branches_index[node.of_branch] = len(graph.branches)
+                graph.branches.append(node.of_branch)
+
+            graph.branch.append(branches_index[node.of_branch])
+
+        # parents can be after their children, so edges are resolved when all rows are indexed
+        for node in nodes:
+            graph.parents.append([graph.index[p] for p in parents_of[node.hexsha] if p in graph.index])
+
+        return graph
+
+    def to_dict(self) -> Dict[str, Any]:
+        graph_as_dict = dict(self.__dict__)
+        graph_as_dict["authors"] = [asdict(author) for author in self.authors]
+
+        return graph_as_dict
+
+
+@dataclass
+class CommitsPage(DCToDictMixin):
+    """
+    Window of commits history, from the newest to the oldest.
+    Each commit has its parents (without their relatives, also if they are in next pages) and no children,
+    so pages can be stitched together by hexsha
+
+    :ivar commits: commits of page
+    :ivar next_cursor: cursor to take next page, None if there are no more commits
+    :ivar has_more: True if there are more commits after this page
+    """
+
+    commits: List[RepoNode] = field(default_factory=list)
+    next_cursor: Optional[str] = field(default=None)
+    has_more: bool = field(default=False)
+
+    CURSOR_SEPARATOR = ":"
+
+    @staticmethod
+    def cursor_of(record: CommitRecord) -> str:
+        """
+        Return cursor which points after commit: its timestamp and hexsha, so it is stable also when new commits arrive
+
+        :param record:
+        :return:
+        """
+
+        return f"{record.committed_date}{CommitsPage.CURSOR_SEPARATOR}{record.hexsha}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> Tuple[int, str]:
+        """
+        Return timestamp and hexsha of a cursor
+
+        :param cursor:
+        :return:
+        :raise ValueError: if cursor is malformed
+        """
+
+        committed_date, hexsha = cursor.split(CommitsPage.CURSOR_SEPARATOR, 1)
+
+        return int(committed_date), hexsha
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "commits": [node.to_dict() for node in self.commits],
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+        }
+
+
 class RepoManager:
     RATE_OF_LOG: int = 50
+    FETCH_TIMEOUT: int = 120        # seconds, a hanging fetch is killed
+
+    # backends to read commits
+    BACKEND_GIT_LOG: str = "git_log"        # parse output of only one git log subprocess
+    BACKEND_GITPYTHON: str = "gitpython"    # GitPython Commit objects (each attribute is loaded lazily)
+    BACKEND_PARALLEL: str = "parallel"      # chunks of commits read by a pool of worker processes
+    BACKENDS: Tuple[str, ...] = (BACKEND_GIT_LOG, BACKEND_GITPYTHON, BACKEND_PARALLEL)
 
-    def __init__(self, project_path: Optional[str] = None, verbose: bool = False, debug_mode: bool = False):
-        # DEPRECATED:
-        # global associations_commits_tasks
-        # global associations_commits_users
-        #
-        # if isinstance(users_models, list):
-        #     associations_commits_users = dict()
-        #     for user in users_models:
-        #         associations_commits_users[user.email] = user.id
-        #
-        # if isinstance(tasks_models, list):
-        #     associations_commits_tasks = dict()
-        #     for task in tasks_models:
-        #         if associations_commits_tasks.get(task.git_branch) is None:
-        #             associations_commits_tasks[task.git_branch] = [task.id]
-        #
-        #         else:
-        #             associations_commits_tasks[task.git_branch].append(task.id)
-
-        global DEBUG_MODE
-
-        DEBUG_MODE = debug_mode
+    def __init__(self, project_path: Optional[str] = None, verbose: bool = False, debug_mode: bool = False,
+                 backend: str = BACKEND_GIT_LOG, workers: Optional[int] = None, diff_stats: bool = False):
         self.debug_mode = debug_mode
 
+        if backend not in self.BACKENDS:
+            raise ValueError(f"invalid repo backend: {backend}")
+
+        self.backend = backend
+
+        # parallel backend: number of worker processes (None means number of CPUs) and if diff stats are read
+        self.workers = workers
+        self.diff_stats = diff_stats and backend == self.BACKEND_PARALLEL
+
         self.verbose = verbose
         self.project_path = project_path
 
         self.repo: Optional[git.Repo] = None
 
+        # context of last commits reading (refs which contain each commit, heads, tags)
+        self.context: Optional[RepoContext] = None
+
+        # incremented by invalidate(), so who caches data of repository knows that refs could be changed
+        self.generation: int = 0
+
+        # commits reading is serialized: repository and cache are shared by threads which use this manager
+        self.__lock = threading.RLock()
+
+        # persistent commits graph, available if project is initialized
+        self.cache: Optional[CommitGraphCache] = None
+
+        # background fetch of remotes, started by start_fetching()
+        self.fetcher: Optional[FetchScheduler] = None
+
     def open_repo(self, project_path: Optional[str]) -> None:
         """
         Open repo
@@ -210,6 +548,13 @@ class RepoManager:
 
             Logger.log_info(msg=f"open repo in project '{self.project_path}'", is_verbose=self.verbose)
 
+            work_dir = SettingsManager.assemble_work_directory_path(self.project_path)
+
+            self.cache = None
+            if os.path.isdir(work_dir):
+                self.cache = CommitGraphCache(os.path.join(work_dir, CommitGraphCache.FILE_NAME), verbose=self.verbose,
+                                              with_stats=self.diff_stats)
+
         except git.exc.InvalidGitRepositoryError:
             Logger.log_warning(msg=f"invalid repository in '{self.project_path}'", is_verbose=self.verbose)
             self.repo = None
@@ -227,10 +572,26 @@ class RepoManager:
 
         return self.repo is not None
 
-    def get_tree(self) -> Optional[RepoNode]:
+    def close(self) -> None:
+        """
+        Stop background fetch and release repository (git processes and file handles)
+
+        :return:
+        """
+
+        self.stop_fetching()
+
+        with self.__lock:
+            self.context = None
+
+            if self.repo is not None:
+                self.repo.close()
+
+    def get_tree(self, flat: bool = False) -> Optional[RepoNode] | Optional[RepoGraph]:
         """
         Generate repo tree
 
+        :param flat: return tree as RepoGraph (rows in topological order)
         :return:
         """
 
@@ -239,29 +600,40 @@ class RepoManager:
 
         Logger.log_info(msg=f"Generate repo tree...", is_verbose=self.verbose)
 
-        all_repo_commits = list(self.repo.iter_commits('--all', reverse=True))
+        records, context = self.read_commits()
 
-        if len(all_repo_commits) == 0:
+        if len(records) == 0:
             Logger.log_warning(msg="repo is empty", is_verbose=self.verbose)
             return None
 
-        # take root commit: always the first of the list
-        root_node = RepoNode.from_commit(all_repo_commits.pop(0))       # root is removed
+        # topological order: parents are always before their children
+        records.reverse()
+
+        base_nodes: Dict[str, RepoNode] = {record.hexsha: RepoNode.from_record(record, context.branch_of(record.hexsha),
+                                                                               context.tags.get(record.hexsha))
+                                           for record in records}
+
+        if flat:
+            return RepoGraph.from_nodes(list(base_nodes.values()), {record.hexsha: record.parents for record in records})
 
-        for commit in all_repo_commits:
+        # each commit has only one node, so merge commits are shared by their parents (DAG)
+        nodes_by_hexsha: Dict[str, RepoNode] = dict()
 
-            commit_node = RepoNode.from_commit(commit)
+        for record in records:
+            commit_node = replace(base_nodes[record.hexsha], parents=[base_nodes[p] for p in record.parents if p in base_nodes])
+            nodes_by_hexsha[record.hexsha] = commit_node
 
             # append a repo node in each parent
-            for parent in commit.parents:
-                parent_nodes = RepoNode.search_node_by_hexsha(root_node, parent.hexsha)
+            for parent in record.parents:
+                parent_node = nodes_by_hexsha.get(parent)
 
-                for pn in parent_nodes:
-                    pn.add_child(commit_node)
+                if parent_node is not None:
+                    parent_node.add_child(commit_node)
 
         Logger.log_success(msg=f"tree generated successfully", is_verbose=self.verbose)
 
-        return root_node
+        # take root commit: always the first of the list
+        return nodes_by_hexsha[records[0].hexsha]
 
     def get_branches(self) -> List:
         """
@@ -270,11 +642,6 @@ class RepoManager:
         :return:
         """
 
-        try:
-            self.repo.git.fetch()  # try to sync local repo with remote branches
-        except Exception as e:
-            Logger.log_warning(msg=f"unable to fetch commits from remote branches", is_verbose=self.verbose)
-
         branches: List = []
 
         # get references of local and remote branches
@@ -291,10 +658,383 @@ class RepoManager:
 
         return branches
 
-    def get_commits(self) -> List[RepoNode] | None:
+    def refs_snapshot(self) -> Dict[str, str]:
+        """
+        Return all refs of repository (only one git command)
+
+        :return: ref path - hexsha
+        """
+
+        output: str = self.repo.git.for_each_ref("--format=%(refname) %(objectname)")
+
+        return dict(line.split(" ", 1) for line in output.splitlines() if " " in line)
+
+    def invalidate(self) -> None:
+        """
+        Forget data computed by last commits reading (e.g. because refs are changed), it waits a reading in progress
+
+        :return:
+        """
+
+        with self.__lock:
+            self.context = None
+            self.generation += 1
+
+            if self.cache is not None:
+                self.cache.invalidate()
+
+    def fetch(self) -> bool:
         """
-        Return list of project's repository commits
+        Fetch all remotes; if refs are changed, cached data is invalidated.
+        It runs in fetcher thread: snapshots and invalidation take the lock of commits reading (a reading in progress
+        keeps its context), network is not waited holding it
+
+        :return: True if refs are changed
+        :raise: exception if fetch fails
+        """
+
+        if not self.valid_opened_repo() or len(self.repo.remotes) == 0:
+            return False
+
+        with self.__lock:
+            before: Dict[str, str] = self.refs_snapshot()
+
+        self.repo.git.fetch("--all", kill_after_timeout=self.FETCH_TIMEOUT)
+
+        with self.__lock:
+            changed: bool = before != self.refs_snapshot()
 
+            if changed:
+                Logger.log_info(msg="refs are changed by fetch", is_verbose=self.verbose)
+                self.invalidate()
+
+        return changed
+
+    def start_fetching(self, interval: float, max_interval: Optional[float] = None) -> None:
+        """
+        Fetch remotes in background every interval seconds (with back-off up to max_interval seconds after failures)
+
+        :param interval: seconds, fetching is disabled if it is not positive
+        :param max_interval: seconds
+        :return:
+        """
+
+        self.stop_fetching()
+
+        if interval <= 0:
+            Logger.log_info(msg="background fetch disabled", is_verbose=self.verbose)
+            return
+
+        self.fetcher = FetchScheduler(self.fetch, interval=interval, max_interval=max_interval, verbose=self.verbose)
+        self.fetcher.start()
+
+    def stop_fetching(self) -> None:
+        """
+        Stop background fetch
+
+        :return:
+        """
+
+        if self.fetcher is not None:
+            self.fetcher.stop()
+
+    def fetch_now(self) -> bool:
+        """
+        Anticipate background fetch, without waiting for it
+
+        :return: False if background fetch is not running
+        """
+
+        if self.fetcher is None or not self.fetcher.running:
+            return False
+
+        self.fetcher.wake()
+
+        return True
+
+    def get_fetch_status(self) -> Dict[str, Any]:
+        """
+        Return status of background fetch (state, last fetch time, failures...)
+
+        :return:
+        """
+
+        if self.fetcher is None:
+            return {"state": FetchScheduler.STOPPED}
+
+        return self.fetcher.status()
+
+    def get_heads(self, branches: List) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+        """
+        Return heads of refs from the lowest to the highest priority to own commits:
+        other refs (e.g. stash), tags (as 'tags/<name>') and branches (last branches win, as before)
+
+        :param branches: branches as returned by get_branches()
+        :return: heads as (ref name, hexsha) and tags (hexsha - tag's name)
+        """
+
+        heads: List[Tuple[str, str]] = []
+        tags: Dict[str, str] = dict()       # hexsha - tag's name
+
+        for ref in self.repo.refs:
+            if isinstance(ref, (git.Head, git.RemoteReference, git.TagReference)):
+                continue
+
+            try:
+                heads.append((ref.path.removeprefix("refs/"), ref.commit.hexsha))
+            except Exception:
+                pass
+
+        for tag in self.repo.tags:
+            try:
+                tags[tag.commit.hexsha] = tag.name
+                heads.append((f"tags/{tag.name}", tag.commit.hexsha))
+            except Exception:
+                pass
+
+        for branch in branches:
+            try:
+                heads.append((str(branch), branch.commit.hexsha))
+            except Exception:
+                pass
+
+        try:
+            if self.repo.head.is_detached:     # commits of detached HEAD are not in any branch
+                heads.insert(0, ("HEAD", self.repo.head.commit.hexsha))
+        except Exception:
+            pass
+
+        return heads, tags
+
+    def iter_records(self, include: List[str], exclude: List[str]) -> Iterator[CommitRecord]:
+        """
+        Iterate on commits reachable from include but not from exclude, children before parents
+
+        :param include: revisions (hexsha or options, e.g. --all) to include
+        :param exclude: revisions (hexsha) to exclude
+        :return:
+        """
+
+        revisions: List[str] = include + [f"^{hexsha}" for hexsha in exclude]
+
+        if self.backend == self.BACKEND_GIT_LOG:
+            yield from iter_log_records(self.repo, revisions)
+            return
+
+        if self.backend == self.BACKEND_PARALLEL:
+            reader = ParallelReader(workers=self.workers, with_stats=self.diff_stats)
+
+            yield from reader.read(self.repo.working_dir, revisions)
+            return
+
+        for commit in self.repo.iter_commits(revisions, topo_order=True):
+            yield CommitRecord.from_commit(commit)
+
+    @property
+    def membership(self) -> Optional[BranchMembership]:
+        return self.context.membership if self.context is not None else None
+
+    @property
+    def heads(self) -> Optional[Dict[str, str]]:
+        return self.context.heads if self.context is not None else None
+
+    def read_commits(self) -> Tuple[List[CommitRecord], RepoContext]:
+        """
+        Read all commits of repository (each commit is read only once) and compute which refs contain them
+        in the same walk. Returned context is stored in self.context too, callers should use the returned one,
+        because another thread can replace self.context
+
+        :return: commits in topological order (children before parents) and context of this reading
+        """
+
+        with self.__lock:
+            branches: List = self.get_branches()
+
+            Logger.log_info(msg="fetched %s branch(es)", args=(len(branches),), is_verbose=self.verbose)
+
+            heads, tags = self.get_heads(branches)
+
+            Logger.log_info(msg="fetched %s tags", args=(len(tags),), is_verbose=self.verbose)
+
+            if self.cache is not None:      # only new commits are read
+                records: List[CommitRecord] = self.cache.refresh(heads, self.iter_records)
+
+            else:
+                records: List[CommitRecord] = list(self.iter_records(["--all"], []))
+
+            context: Optional[RepoContext] = self.context
+
+            # membership is computed again only if refs or commits are changed
+            if context is None or list(context.heads.items()) != heads or context.tags != tags or self.cache is None:
+                context = RepoContext(tags=tags, membership=BranchMembership.compute(records, heads), heads=dict(heads),
+                                      debug_mode=self.debug_mode)
+
+                self.context = context
+
+            Logger.log_info(msg="fetched data of %s commit(s)", args=(len(records),), is_verbose=self.verbose)
+
+            return records, context
+
+    def get_default_branch(self, context: Optional[RepoContext] = None) -> Optional[str]:
+        """
+        Return default branch: branch of origin HEAD (local branch if it exists), else 'main' or 'master',
+        else current branch
+
+        :param context: context of a reading (default last one)
+        :return: None if there is not
+        """
+
+        context = context if context is not None else self.context
+
+        if context is None:
+            return None
+
+        refs: List[str] = context.membership.refs
+
+        try:
+            origin_head: str = self.repo.git.symbolic_ref("--short", "refs/remotes/origin/HEAD")      # e.g. origin/main
+            name: str = origin_head.split("/", 1)[1]
+
+            if name in refs:
+                return name
+
+            if origin_head in refs:
+                return origin_head
+
+        except Exception:
+            pass
+
+        for name in ("main", "master"):
+            if name in refs:
+                return name
+
+        try:
+            return self.repo.active_branch.name
+
+        except Exception:
+            return None
+
+    def get_branches_of(self, hexsha: str) -> List[str] | None:
+        """
+        Return refs (branches and tags) which contain commit, based on last reading of commits
+
+        :param hexsha:
+        :return: refs, None if commits have not been read
+        """
+
+        context = self.context
+
+        if context is None:
+            return None
+
+        return context.membership.refs_of(hexsha)
+
+    @staticmethod
+    def to_timestamp(value: str | int | float | None) -> Optional[float]:
+        """
+        Return timestamp of a datetime as ISO string (naive datetime is local) or timestamp
+
+        :param value:
+        :return: None if value is None
+        """
+
+        if value is None:
+            return None
+
+        if isinstance(value, (int, float)):
+            return float(value)
+
+        return datetime.fromisoformat(value).timestamp()
+
+    def get_commits_page(self, records: List[CommitRecord], context: RepoContext, limit: Optional[int] = None,
+                         before: Optional[str] = None, branch: Optional[str] = None, author: Optional[str] = None,
+                         since: str | int | float | None = None, until: str | int | float | None = None) -> CommitsPage:
+        """
+        Return a page of commits history, from the newest to the oldest
+
+        :param records: commits in topological order, children before parents
+        :param context: context of reading of records
+        :param limit: max number of commits in page (None means all)
+        :param before: cursor returned by previous page, page starts after its commit
+                       (if commit doesn't exist anymore, page starts from commits not newer than it)
+        :param branch: only commits contained in this ref (e.g. 'main', 'origin/main', 'tags/v1')
+        :param author: only commits of this author (email or name)
+        :param since: only commits committed from this datetime (ISO string or timestamp)
+        :param until: only commits committed until this datetime (ISO string or timestamp)
+        :return:
+        """
+
+        # newest first, commits with the same datetime are in topological order (children first)
+        records.reverse()
+        records.sort(key=lambda record: record.committed_date)
+        records.reverse()
+
+        position: Dict[str, int] = {record.hexsha: i for i, record in enumerate(records)}       # hexsha - index
+
+        start: int = 0
+        if before is not None:
+            cursor_date, cursor_hexsha = CommitsPage.parse_cursor(before)
+
+            if cursor_hexsha in position:
+                start = position[cursor_hexsha] + 1
+            else:
+                start = next((i for i, record in enumerate(records) if record.committed_date <= cursor_date), len(records))
+
+        since_timestamp = self.to_timestamp(since)
+        until_timestamp = self.to_timestamp(until)
+        author = author.lower() if author is not None else None
+
+        selected: List[CommitRecord] = []
+        has_more: bool = False
+
+        for record in records[start:]:
+            if since_timestamp is not None and record.committed_date < since_timestamp:
+                break       # older commits are not in range
+
+            if until_timestamp is not None and record.committed_date > until_timestamp:
+                continue
+
+            if author is not None and author not in (record.author_email.lower(), record.author_name.lower()):
+                continue
+
+            if branch is not None and not context.membership.contains(branch, record.hexsha):
+                continue
+
+            if limit is not None and len(selected) == limit:
+                has_more = True
+                break
+
+            selected.append(record)
+
+        def node_of(record: CommitRecord) -> RepoNode:
+            return RepoNode.from_record(record, context.branch_of(record.hexsha), context.tags.get(record.hexsha))
+
+        commits: List[RepoNode] = []
+        for record in selected:
+            node = node_of(record)
+            node.parents = [node_of(records[position[p]]) for p in record.parents if p in position]
+
+            commits.append(node)
+
+        return CommitsPage(commits=commits,
+                           next_cursor=CommitsPage.cursor_of(selected[-1]) if has_more else None,
+                           has_more=has_more)
+
+    def get_commits(self, flat: bool = False, limit: Optional[int] = None, before: Optional[str] = None,
+                    branch: Optional[str] = None, author: Optional[str] = None, since: str | int | float | None = None,
+                    until: str | int | float | None = None) -> List[RepoNode] | RepoGraph | CommitsPage | None:
+        """
+        Return list of project's repository commits.
+        If a page parameter (limit, before, branch, author, since, until) is passed, a page of history
+        (from the newest commit) is returned instead, see get_commits_page
+
+        :param flat: return commits as RepoGraph (rows sorted by commit datetime), ignored for pages
+        :param limit: max number of commits in page
+        :param before: cursor returned by previous page
+        :param branch: only commits contained in this ref
+        :param author: only commits of this author (email or name)
+        :param since: only commits committed from this datetime (ISO string or timestamp)
+        :param until: only commits committed until this datetime (ISO string or timestamp)
         :return:
         """
 
@@ -307,60 +1047,51 @@ class RepoManager:
                 Logger.log_error(msg="impossible to elaborate commits: repo not found", is_verbose=self.verbose)
                 return None
 
-            Logger.log_info(msg=f"start to fetch commits from project repo '{self.project_path}'...",
+            Logger.log_info(msg="start to fetch commits from project repo '%s'...", args=(self.project_path,),
                             is_verbose=self.verbose)
 
-            # take tags of repo
-            global associations_commits_tags
-            associations_commits_tags = dict()  # hexsha - tag's name
-            for tag in list(self.repo.tags):
-                associations_commits_tags[tag.commit.hexsha] = tag.name
-
-            Logger.log_info(msg=f"fetched {len(associations_commits_tags.keys())} tags", is_verbose=self.verbose)
+            start = perf_counter()
 
-            branches: List = self.get_branches()
+            records, context = self.read_commits()
 
-            Logger.log_info(msg=f"fetched {len(branches)} branch(es)", is_verbose=self.verbose)
+            if any(p is not None for p in (limit, before, branch, author, since, until)):
+                page: CommitsPage = self.get_commits_page(records, context, limit=limit, before=before, branch=branch,
+                                                          author=author, since=since, until=until)
 
-            # take association between commits hexsha and its branch
-            global associations_commits_branches
-            associations_commits_branches = dict()  # hexsha - branch
-            for branch in branches:
-                hexsha_of_commits = set(commit.hexsha for commit in list(self.repo.iter_commits(branch, reverse=True)))
+                Logger.log_success(msg="page of %s commit(s) fetched successfully in %.4fs",
+                                   args=(len(page.commits), perf_counter() - start), is_verbose=self.verbose)
+                return page
 
-                for hexsha in hexsha_of_commits:
-                    associations_commits_branches[hexsha] = str(branch)
+            # sort by commit datetime, commits with the same datetime are in topological order (parents first)
+            records.reverse()
+            records.sort(key=lambda record: record.committed_date)
 
-            Logger.log_info(msg=f"fetched data of {len(associations_commits_branches.keys())} commit(s)",
-                            is_verbose=self.verbose)
+            n_of_commits = len(records)
 
-            # generate list of nodes
-            all_repo_commits = list(self.repo.iter_commits('--all', reverse=True))
-            all_repo_commits = sorted(all_repo_commits, key=lambda commit: commit.committed_datetime)
-
-            nodes = list()  # use a managed list to share data between processes
-            n_of_commits = len(all_repo_commits)
-            start = perf_counter()
+            # each commit is read only once: its node has no relatives, then nodes are linked by hexsha
+            base_nodes: List[RepoNode] = []
+            parents_of: Dict[str, List[str]] = dict()       # hexsha - parents hexsha
             for i in range(n_of_commits):
-                commit = all_repo_commits[i]
-                repo_node: RepoNode = RepoNode.from_commit(commit)
+                record = records[i]
 
-                # search children of commit
-                for j in range(i, n_of_commits):
-                    candidate_child_commit = all_repo_commits[j]
-
-                    if repo_node.hexsha in (parent.hexsha for parent in candidate_child_commit.parents):
-                        candidate_child_node: RepoNode = RepoNode.from_commit(candidate_child_commit)
-                        repo_node.add_child(candidate_child_node)
-
-                nodes.append(repo_node)
+                base_nodes.append(RepoNode.from_record(record, context.branch_of(record.hexsha), context.tags.get(record.hexsha)))
+                parents_of[record.hexsha] = record.parents
 
                 if self.debug_mode or (not self.debug_mode and (i + 1) % self.RATE_OF_LOG == 0) or (i + 1) == n_of_commits:
                     Logger.log_info(
-                        msg=f"elaborating commit {i + 1}/{n_of_commits} ({round((i + 1) * 100 / n_of_commits, 2)}%)",
+                        msg="elaborating commit %s/%s (%s%%)", args=(i + 1, n_of_commits, round((i + 1) * 100 / n_of_commits, 2)),
                         is_verbose=self.verbose)
 
-            Logger.log_success(msg=f"commits fetched successfully in {round(perf_counter() - start, 4)}s",
+            if flat:
+                graph: RepoGraph = RepoGraph.from_nodes(base_nodes, parents_of)
+
+                Logger.log_success(msg="commits graph generated successfully in %.4fs", args=(perf_counter() - start,),
+                                   is_verbose=self.verbose)
+                return graph
+
+            nodes: List[RepoNode] = RepoNode.link_nodes(base_nodes, parents_of)
+
+            Logger.log_success(msg="commits fetched successfully in %.4fs", args=(perf_counter() - start,),
                                is_verbose=self.verbose)
             return list(nodes)
 
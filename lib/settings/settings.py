@@ -1,5 +1,9 @@
 from lib.utils.logger import Logger
 import json
+import copy
+import atexit
+import threading
+import weakref
 from lib.file.file_manager import FileManger
 import os
 from typing import Any, List, Optional, Dict
@@ -12,6 +16,10 @@ class SettingsBase:
     SETTINGS_FILE_NAME = "settings.json"
     VAULT_FILE_NAME = "vault.json"
     DB_NAME = "database.db"
+    LOG_FILE_NAME = "taskup.log"
+    METRICS_FILE_NAME = "metrics.json"
+    SQL_PROFILE_FILE_NAME = "sql_profile.json"
+    BACKUP_DIRECTORY_NAME = "backups"
 
     KEY_VERBOSE = "verbose"
     VALUE_BASE_VERBOSE = True
@@ -46,9 +54,63 @@ class SettingsBase:
     KEY_BACKUP = "backup"
     VALUE_BASE_BACKUP = True
 
+    KEY_BACKUP_INTERVAL = "backup_interval"
+    VALUE_BASE_BACKUP_INTERVAL = 3600       # seconds
+
+    KEY_BACKUP_GENERATIONS = "backup_generations"
+    VALUE_BASE_BACKUP_GENERATIONS = 5
+
+    KEY_BACKUP_ON_CLOSE = "backup_on_close"
+    VALUE_BASE_BACKUP_ON_CLOSE = False
+
     KEY_APP_MODE = "app_mode"
     VALUE_BASE_APP_MODE = "chrome"
 
+    KEY_LOG_LEVEL = "log_level"
+    VALUE_BASE_LOG_LEVEL = "debug"
+
+    KEY_LOG_MODULES = "log_modules"
+    VALUE_BASE_LOG_MODULES = {}
+
+    KEY_LOG_FILE = "log_file"
+    VALUE_BASE_LOG_FILE = False
+
+    KEY_LOG_JSON = "log_json"
+    VALUE_BASE_LOG_JSON = False
+
+    KEY_LOG_QUEUE_SIZE = "log_queue_size"
+    VALUE_BASE_LOG_QUEUE_SIZE = 10000
+
+    KEY_LOG_DROP_POLICY = "log_drop_policy"
+    VALUE_BASE_LOG_DROP_POLICY = "drop_newest"
+
+    KEY_METRICS = "metrics"
+    VALUE_BASE_METRICS = True
+
+    KEY_METRICS_DUMP_INTERVAL = "metrics_dump_interval"
+    VALUE_BASE_METRICS_DUMP_INTERVAL = 60       # seconds
+
+    KEY_SQL_PROFILER = "sql_profiler"
+    VALUE_BASE_SQL_PROFILER = False
+
+    KEY_REPO_BACKEND = "repo_backend"
+    VALUE_BASE_REPO_BACKEND = "git_log"
+
+    KEY_REPO_WORKERS = "repo_workers"
+    VALUE_BASE_REPO_WORKERS = 0         # number of CPUs
+
+    KEY_REPO_DIFF_STATS = "repo_diff_stats"
+    VALUE_BASE_REPO_DIFF_STATS = False
+
+    KEY_REPO_FETCH_INTERVAL = "repo_fetch_interval"
+    VALUE_BASE_REPO_FETCH_INTERVAL = 300        # seconds
+
+    KEY_REPO_FETCH_MAX_INTERVAL = "repo_fetch_max_interval"
+    VALUE_BASE_REPO_FETCH_MAX_INTERVAL = 3600       # seconds
+
+    KEY_REPO_WARM_PROJECTS = "repo_warm_projects"
+    VALUE_BASE_REPO_WARM_PROJECTS = 3
+
     BASE_SETTINGS = {
         KEY_VERBOSE: VALUE_BASE_VERBOSE,
         KEY_PROJECT_PATH: VALUE_BASE_PROJECT_PATH,
@@ -61,7 +123,25 @@ class SettingsBase:
         KEY_FRONTEND_DEBUG_PORT: VALUE_BASE_FRONTEND_DEBUG_PORT,
         KEY_PROJECT_PATHS_STORED: VALUE_BASE_PROJECT_PATHS_STORED,
         KEY_BACKUP: VALUE_BASE_BACKUP,
-        KEY_APP_MODE: VALUE_BASE_APP_MODE
+        KEY_BACKUP_INTERVAL: VALUE_BASE_BACKUP_INTERVAL,
+        KEY_BACKUP_GENERATIONS: VALUE_BASE_BACKUP_GENERATIONS,
+        KEY_BACKUP_ON_CLOSE: VALUE_BASE_BACKUP_ON_CLOSE,
+        KEY_APP_MODE: VALUE_BASE_APP_MODE,
+        KEY_LOG_LEVEL: VALUE_BASE_LOG_LEVEL,
+        KEY_LOG_MODULES: VALUE_BASE_LOG_MODULES,
+        KEY_LOG_FILE: VALUE_BASE_LOG_FILE,
+        KEY_LOG_JSON: VALUE_BASE_LOG_JSON,
+        KEY_LOG_QUEUE_SIZE: VALUE_BASE_LOG_QUEUE_SIZE,
+        KEY_LOG_DROP_POLICY: VALUE_BASE_LOG_DROP_POLICY,
+        KEY_METRICS: VALUE_BASE_METRICS,
+        KEY_METRICS_DUMP_INTERVAL: VALUE_BASE_METRICS_DUMP_INTERVAL,
+        KEY_SQL_PROFILER: VALUE_BASE_SQL_PROFILER,
+        KEY_REPO_BACKEND: VALUE_BASE_REPO_BACKEND,
+        KEY_REPO_WORKERS: VALUE_BASE_REPO_WORKERS,
+        KEY_REPO_DIFF_STATS: VALUE_BASE_REPO_DIFF_STATS,
+        KEY_REPO_FETCH_INTERVAL: VALUE_BASE_REPO_FETCH_INTERVAL,
+        KEY_REPO_FETCH_MAX_INTERVAL: VALUE_BASE_REPO_FETCH_MAX_INTERVAL,
+        KEY_REPO_WARM_PROJECTS: VALUE_BASE_REPO_WARM_PROJECTS,
     }
 
     @staticmethod
@@ -79,9 +159,19 @@ class SettingsManager(SettingsBase):
     CREATE_SETTINGS_FILE_IF_NOT_EXIST = True
     ICON_FILE_NAME = "icon.ico"
 
+    SAVE_DELAY: float = 0.5     # seconds, changes in this window are written together
+
+    # instances flushed on exit by flush_all() (weak references, so instances are not kept alive)
+    __instances: 'weakref.WeakSet[SettingsManager]' = weakref.WeakSet()
+
     def __init__(self):
 
-        self.settings: dict = self.BASE_SETTINGS  # set base settings
+        self.settings: dict = copy.deepcopy(self.BASE_SETTINGS)  # set base settings
+
+        # settings are kept in memory, changes are written in file by flush() (scheduled by dumps_settings())
+        self.__dirty: bool = False
+        self.__lock = threading.RLock()
+        self.__save_timer: Optional[threading.Timer] = None
 
         try:
             self.override_settings()
@@ -92,7 +182,6 @@ class SettingsManager(SettingsBase):
 
             if SettingsManager.CREATE_SETTINGS_FILE_IF_NOT_EXIST:
                 self.create_settings_file()
-                self.override_settings()
 
         except json.JSONDecodeError as json_decode_error:
             Logger.log_error(msg=f"configuration file {self.SETTINGS_FILE_NAME} JSON syntax error",
@@ -103,8 +192,7 @@ class SettingsManager(SettingsBase):
         finally:
             self.verify_mandatory_settings()
 
-            # write settings in file
-            self.dumps_settings()
+        SettingsManager.__instances.add(self)       # pending changes are not lost on exit
 
     def verify_mandatory_settings(self) -> None:
         """
@@ -121,22 +209,30 @@ class SettingsManager(SettingsBase):
 
     def override_settings(self) -> None:
         """
-        Override app settings with settings configuration file
+        Override app settings with settings configuration file (file is read only here),
+        file is written again only if it lacks some settings
         """
 
-        self.settings.update(FileManger.read_json(self.settings_path()))
-        self.dumps_settings()
+        stored: dict = FileManger.read_json(self.settings_path())
+
+        self.settings.update(stored)
+
+        if stored.keys() != self.settings.keys():
+            self.dumps_settings()
 
     def create_settings_file(self) -> None:
         """
         Create settings file if it does not exist with base settings
         """
 
-        FileManger.write_json(self.settings_path(), self.BASE_SETTINGS)
+        with self.__lock:
+            FileManger.write_json(self.settings_path(), self.settings)
+            self.__dirty = False
 
     def set(self, key: str, value: Any) -> None:
         """
-        Modify settings
+        Modify settings, file is written after SAVE_DELAY seconds.
+        Lists and dictionaries are always written, because they can be the stored ones modified in place
 
         :param key: settings' key
         :param value: key's value
@@ -144,17 +240,69 @@ class SettingsManager(SettingsBase):
         :rtype: None
         """
 
-        self.settings[key] = value
-        self.dumps_settings()
+        with self.__lock:
+            if key in self.settings and not isinstance(value, (list, dict)) and self.settings[key] == value:
+                return
+
+            self.settings[key] = value
+            self.dumps_settings()
 
     def dumps_settings(self) -> None:
         """
-        Dumps settings in file
+        Mark settings as changed: they are written in file after SAVE_DELAY seconds,
+        so many changes (e.g. update_settings) produce only one write
+
+        :return:
+        """
+
+        with self.__lock:
+            self.__dirty = True
+
+            if self.__save_timer is None:
+                self.__save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+                self.__save_timer.daemon = True
+                self.__save_timer.start()
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Return True if settings have changes not written in file
+        """
+
+        return self.__dirty
+
+    def flush(self) -> None:
+        """
+        Write settings in file now if they are changed (atomically: temporary file renamed)
 
         :return:
         """
 
-        FileManger.write_json(self.settings_path(), self.settings)
+        with self.__lock:
+            if self.__save_timer is not None:
+                self.__save_timer.cancel()
+                self.__save_timer = None
+
+            if not self.__dirty:
+                return
+
+            try:
+                FileManger.write_json(self.settings_path(), self.settings)
+                self.__dirty = False
+
+            except Exception as e:
+                Logger.log_error(msg=f"unable to write settings: {e}", is_verbose=self.verbose)
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """
+        Write settings of all alive instances which have pending changes (it is called on exit)
+
+        :return:
+        """
+
+        for settings_manager in list(cls.__instances):
+            settings_manager.flush()
 
     def get_setting_by_key(self, key: str) -> Any:
         """
@@ -266,6 +414,46 @@ class SettingsManager(SettingsBase):
 
         raise ValueError()
 
+    @property
+    def backup_directory_path(self) -> str:
+        """
+        Return the directory of database backups, it is inside work directory
+
+        :return:
+        """
+
+        return os.path.join(self.work_directory_path, SettingsBase.BACKUP_DIRECTORY_NAME)
+
+    @property
+    def log_file_path(self) -> str:
+        """
+        Return the log file path, it is inside work directory
+
+        :rtype: str
+        """
+
+        return os.path.join(self.work_directory_path, SettingsBase.LOG_FILE_NAME)
+
+    @property
+    def metrics_file_path(self) -> str:
+        """
+        Return the path of file in which metrics are dumped, it is inside work directory
+
+        :rtype: str
+        """
+
+        return os.path.join(self.work_directory_path, SettingsBase.METRICS_FILE_NAME)
+
+    @property
+    def sql_profile_path(self) -> str:
+        """
+        Return the path of file in which SQL profiler report is saved, it is inside work directory
+
+        :rtype: str
+        """
+
+        return os.path.join(self.work_directory_path, SettingsBase.SQL_PROFILE_FILE_NAME)
+
     @property
     def vault_path(self) -> str:
         """
@@ -348,11 +536,12 @@ class SettingsManager(SettingsBase):
         :return:
         """
 
-        if path not in self.projects_paths_stored:
-            paths_stored = self.get_setting_by_key(self.KEY_PROJECT_PATHS_STORED)
+        with self.__lock:
+            if path not in self.projects_paths_stored:
+                paths_stored = self.get_setting_by_key(self.KEY_PROJECT_PATHS_STORED)
 
-            paths_stored.append(path)
-            self.dumps_settings()
+                paths_stored.append(path)
+                self.dumps_settings()
 
     def set_project_path(self, path) -> bool:
         """
@@ -433,3 +622,5 @@ class SettingsManager(SettingsBase):
 
             return False
 
+
+atexit.register(SettingsManager.flush_all)
@@ -1,3 +1,4 @@
+VERSION = "1.2.1"
 
 PM_EMAIL = "pm@email.com"
 PM_USERNAME = "project.manager"
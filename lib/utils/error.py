@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Any
 from lib.utils.mixin.dcparser import DCToDictMixin
 
 
@@ -7,6 +8,17 @@ class Error(DCToDictMixin):
     code: str
     message: str
 
+    @staticmethod
+    def is_error(value: Any) -> bool:
+        """
+        Return True if value is an error returned to frontend as result (i.e. Error.to_dict())
+
+        :param value:
+        :return:
+        """
+
+        return isinstance(value, dict) and len(value) == 2 and "code" in value and "message" in value
+
 
 class Errors:
     LOGIN_REQUIRE = Error(
@@ -18,3 +30,18 @@ class Errors:
         code="A2",
         message="permission denied"
     )
+
+    METHOD_NOT_FOUND = Error(
+        code="B1",
+        message="method not found"
+    )
+
+    INVALID_CALL = Error(
+        code="B2",
+        message="invalid call"
+    )
+
+    CALL_FAILED = Error(
+        code="B3",
+        message="call failed"
+    )
@@ -0,0 +1,338 @@
+import os
+import re
+import sys
+import json
+import queue
+import atexit
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Any
+
+
+ANSI_ESCAPE_REGEX = re.compile(r"\x1b\[[0-9;]*m")
+
+
+@dataclass
+class LogRecord:
+    """
+    Record of a log line
+
+    :ivar created: timestamp of creation
+    :ivar level: level of message
+    :ivar module: module which logged message
+    :ivar line: colored line
+    :ivar end: end of line
+    """
+
+    created: float
+    level: int
+    module: str
+    line: str
+    end: str = field(default="\n")
+
+    @property
+    def plain_line(self) -> str:
+        """
+        Return line without color codes
+
+        :return:
+        """
+
+        return ANSI_ESCAPE_REGEX.sub("", self.line)
+
+
+class LogSink(ABC):
+    """
+    Destination of log records
+    """
+
+    @abstractmethod
+    def write(self, record: LogRecord) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class StdoutSink(LogSink):
+    """
+    Sink which prints colored lines on stdout
+    """
+
+    def write(self, record: LogRecord) -> None:
+        print(record.line, end=record.end)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+class RotatingFileSink(LogSink):
+    """
+    Sink which writes plain lines (or JSON lines) in a file, rotating it when it is too big.
+    Rotated files are named <path>.1, <path>.2, ... (<path>.1 is the most recent)
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024, backup_count: int = 3, json_lines: bool = False,
+                 level_names: Optional[Dict[int, str]] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.json_lines = json_lines
+        self.level_names = level_names if level_names is not None else dict()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.__file = open(self.path, "a", encoding="utf-8")
+
+    def format(self, record: LogRecord) -> str:
+        """
+        Return the text to write in file
+
+        :param record:
+        :return:
+        """
+
+        if self.json_lines:
+            return json.dumps({
+                "time": datetime.fromtimestamp(record.created).isoformat(),
+                "level": self.level_names.get(record.level, str(record.level)),
+                "module": record.module,
+                "message": record.plain_line,
+            }) + "\n"
+
+        time: str = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+
+        return f"{time} [{self.level_names.get(record.level, record.level)}] {record.module}: {record.plain_line}\n"
+
+    def write(self, record: LogRecord) -> None:
+        text: str = self.format(record)
+
+        if self.__file.tell() + len(text) > self.max_bytes:
+            self.rotate()
+
+        self.__file.write(text)
+
+    def rotate(self) -> None:
+        """
+        Rotate log files
+
+        :return:
+        """
+
+        self.__file.close()
+
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+
+            if os.path.isfile(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+        self.__file = open(self.path, "a", encoding="utf-8")
+
+    def flush(self) -> None:
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+class LogWriter:
+    """
+    Queue-backed log writer: records are put in a bounded queue by callers and written on sinks by a background thread,
+    so callers never wait for I/O. When queue is full, a record is dropped based on drop policy and counted.
+    """
+
+    DROP_NEWEST: str = "drop_newest"      # discard the record which is being logged
+    DROP_OLDEST: str = "drop_oldest"      # discard the oldest record in queue to make room
+
+    FLUSH_TIMEOUT: float = 5        # seconds
+
+    def __init__(self, sinks: Optional[List[LogSink]] = None, max_queue_size: int = 10000, drop_policy: str = DROP_NEWEST):
+        if drop_policy not in (self.DROP_NEWEST, self.DROP_OLDEST):
+            raise ValueError(f"invalid drop policy: {drop_policy}")
+
+        self.drop_policy = drop_policy
+        self.sinks: List[LogSink] = sinks if sinks is not None else [StdoutSink()]
+
+        self.dropped: int = 0
+        self.written: int = 0
+        self.sink_errors: int = 0
+
+        self.__queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.__drop_lock = threading.Lock()
+        self.__sinks_lock = threading.Lock()
+        self.__closed: bool = False
+
+        self.__thread = threading.Thread(target=self.__run, name="log-writer", daemon=True)
+        self.__thread.start()
+
+        atexit.register(self.close)
+
+    def put(self, record: LogRecord) -> bool:
+        """
+        Put a record in queue without waiting
+
+        :param record:
+        :return: False if a record has been dropped
+        """
+
+        try:
+            self.__queue.put_nowait(record)
+            return True
+
+        except queue.Full:
+            with self.__drop_lock:
+                self.dropped += 1
+
+                if self.drop_policy == self.DROP_OLDEST:
+                    # oldest record is replaced in place: flush and closing requests are never dropped or moved,
+                    # queue size doesn't change, so nobody waiting on queue has to be notified
+                    with self.__queue.mutex:
+                        items = self.__queue.queue
+
+                        for index, item in enumerate(items):
+                            if isinstance(item, LogRecord):
+                                del items[index]
+                                items.append(record)
+                                break
+
+            return False
+
+    def __run(self) -> None:
+        """
+        Write records of queue on sinks until writer is closed
+
+        :return:
+        """
+
+        while True:
+            item = self.__queue.get()
+
+            if item is None:        # closing
+                break
+
+            if isinstance(item, threading.Event):       # flush request
+                self.__flush_sinks()
+                item.set()
+                continue
+
+            with self.__sinks_lock:
+                for sink in self.sinks:
+                    try:
+                        sink.write(item)
+
+                    except Exception:
+                        self.sink_errors += 1
+
+            self.written += 1
+
+            if self.__queue.empty():
+                self.__flush_sinks()
+
+        # sinks are closed here, after last write, not by close() which waits for this thread at most FLUSH_TIMEOUT
+        self.__flush_sinks()
+
+        with self.__sinks_lock:
+            for sink in self.sinks:
+                try:
+                    sink.close()
+
+                except Exception:
+                    self.sink_errors += 1
+
+    def __flush_sinks(self) -> None:
+        with self.__sinks_lock:
+            for sink in self.sinks:
+                try:
+                    sink.flush()
+
+                except Exception:
+                    self.sink_errors += 1
+
+    def set_sinks(self, sinks: List[LogSink]) -> None:
+        """
+        Replace sinks, old sinks are closed
+
+        :param sinks:
+        :return:
+        """
+
+        with self.__sinks_lock:
+            old_sinks = self.sinks
+            self.sinks = sinks
+
+        for sink in old_sinks:
+            if sink not in sinks:
+                sink.close()
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """
+        Wait until all records in queue before this call are written
+
+        :param timeout: max seconds to wait
+        :return: True if flushed
+        """
+
+        if self.__closed or not self.__thread.is_alive():
+            return False
+
+        event = threading.Event()
+
+        try:
+            self.__queue.put(event, timeout=timeout)
+
+        except queue.Full:
+            return False
+
+        return event.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Write pending records and stop writer, sinks are closed by writer thread after pending records.
+        It waits at most FLUSH_TIMEOUT seconds (if queue is full or a sink is slow, sinks are closed later)
+
+        :return:
+        """
+
+        if self.__closed:
+            return
+
+        self.__closed = True
+
+        try:
+            self.__queue.put(None, timeout=self.FLUSH_TIMEOUT)
+            self.__thread.join(self.FLUSH_TIMEOUT)
+
+        except queue.Full:      # closing request is queued as soon as there is room
+            threading.Thread(target=self.__queue.put, args=(None,), name="log-writer-close", daemon=True).start()
+
+        atexit.unregister(self.close)
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return writer counters
+
+        :return:
+        """
+
+        return {
+            "queued": self.__queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sink_errors": self.sink_errors,
+            "drop_policy": self.drop_policy,
+        }
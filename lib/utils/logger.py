@@ -1,8 +1,10 @@
 import sys
+import time
 import colorama
 from colorama import Fore, Back, Style
 import traceback
-from typing import Any, TypeVar
+from typing import Any, TypeVar, Tuple, Optional, Dict
+from lib.utils.log_writer import LogWriter, LogRecord, LogSink, StdoutSink, RotatingFileSink
 
 # Initialising Colorama (Important)
 colorama.init(autoreset=True)
@@ -12,18 +14,200 @@ class Logger:
     """
     Logger
 
+    Messages can be deferred: msg can be a callable (called only if the message is logged) or a format string
+    with its args (formatted with % only if the message is logged), so hot paths don't pay message rendering
+    when logs are discarded.
+
+    If a writer is started, lines are written by a background thread (see LogWriter), otherwise they are printed.
     """
 
+    # levels
+    DEBUG: int = 10
+    INFO: int = 20
+    WARNING: int = 30
+    ERROR: int = 40
+
+    LEVEL_NAMES: Dict[int, str] = {
+        DEBUG: "DEBUG",
+        INFO: "INFO",
+        WARNING: "WARNING",
+        ERROR: "ERROR",
+    }
+
     capitalize: bool = True
+    level: int = DEBUG          # messages with a lower level are discarded
+    module_levels: Dict[str, int] = dict()       # module (prefix) - level, it overrides level for modules
+    writer: Optional[LogWriter] = None
+
+    @staticmethod
+    def level_by_name(name: str) -> int:
+        """
+        Return level from its name (case-insensitive)
+
+        :param name: level name
+        :type name: str
+
+        :return: level
+        :rtype int:
+        """
+
+        for level, level_name in Logger.LEVEL_NAMES.items():
+            if level_name == name.upper():
+                return level
+
+        raise ValueError(f"invalid log level: {name}")
+
+    @staticmethod
+    def caller_module() -> str:
+        """
+        Return the name of the first module outside logger in call stack
+
+        :return: module name
+        :rtype str:
+        """
+
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_globals.get("__name__") == __name__:
+            frame = frame.f_back
+
+        if frame is None:
+            return ""
+
+        return frame.f_globals.get("__name__", "")
+
+    @staticmethod
+    def is_enabled_for(level: int, is_verbose: bool = True) -> bool:
+        """
+        Return True if a message with level passed would be logged
+
+        :param level: message level
+        :type level: int
+        :param is_verbose: it used to check if it is verbose
+        :type is_verbose: bool
+
+        :return: result of check
+        :rtype bool:
+        """
+
+        if not is_verbose:
+            return False
+
+        # per-module filters, the longest matched prefix wins
+        if len(Logger.module_levels) > 0:
+            module: str = Logger.caller_module()
+
+            matched: str = ""
+            for prefix in Logger.module_levels.keys():
+                if module.startswith(prefix) and len(prefix) > len(matched):
+                    matched = prefix
+
+            if matched != "":
+                return level >= Logger.module_levels[matched]
+
+        return level >= Logger.level
+
+    @staticmethod
+    def emit(level: int, line: str, end: str = "\n") -> None:
+        """
+        Emit a pre-formatted line: put it in writer queue if writer is started, otherwise print it
+
+        :param level: level of line
+        :type level: int
+        :param line: line to log
+        :type line: str
+        :param end: end of line
+        :type end: str
+
+        :return: None
+        """
+
+        writer = Logger.writer
+
+        if writer is None or writer.closed:
+            print(line, end=end)
+            return
+
+        writer.put(LogRecord(created=time.time(), level=level, module=Logger.caller_module(), line=line, end=end))
+
+    @staticmethod
+    def start_writer(level: int = DEBUG, module_levels: Optional[Dict[str, int]] = None, log_file_path: Optional[str] = None,
+                     json_lines: bool = False, max_queue_size: int = 10000, drop_policy: str = LogWriter.DROP_NEWEST,
+                     max_file_bytes: int = 1024 * 1024, backup_count: int = 3) -> LogWriter:
+        """
+        Start (or re-configure) the background log writer
+
+        :param level: minimum level
+        :param module_levels: module (prefix) - level filters
+        :param log_file_path: path of rotating log file, None to not use a file
+        :param json_lines: if True file is written as JSON lines
+        :param max_queue_size: max records in queue
+        :param drop_policy: policy used when queue is full
+        :param max_file_bytes: max size of log file before rotation
+        :param backup_count: number of rotated files to keep
+        :return: writer
+        """
+
+        Logger.level = level
+        Logger.module_levels = dict(module_levels) if module_levels is not None else dict()
+
+        sinks: list[LogSink] = [StdoutSink()]
+        if log_file_path is not None:
+            sinks.append(RotatingFileSink(log_file_path, max_bytes=max_file_bytes, backup_count=backup_count,
+                                          json_lines=json_lines, level_names=Logger.LEVEL_NAMES))
+
+        if Logger.writer is not None and not Logger.writer.closed and Logger.writer.drop_policy == drop_policy:
+            Logger.writer.set_sinks(sinks)
+
+        else:
+            Logger.stop_writer()
+            Logger.writer = LogWriter(sinks=sinks, max_queue_size=max_queue_size, drop_policy=drop_policy)
+
+        return Logger.writer
+
+    @staticmethod
+    def stop_writer() -> None:
+        """
+        Write pending lines and stop writer, then lines will be printed synchronously
+
+        :return: None
+        """
+
+        if Logger.writer is not None:
+            Logger.writer.close()
+
+        Logger.writer = None
+
+    @staticmethod
+    def render(msg: Any, args: Optional[Tuple] = None) -> Any:
+        """
+        Render deferred message: call msg if it is a callable, format it with args if they are passed
+
+        :param msg: message, callable which returns message or format string
+        :type msg: Any
+        :param args: args of format string
+        :type args: Optional[Tuple]
+
+        :return: rendered message
+        :rtype Any:
+        """
+
+        if callable(msg):
+            msg = msg()
+
+        if args:
+            msg = str(msg) % args
+
+        return msg
 
     @staticmethod
-    def log_error(msg: Any, full: bool = False, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False) -> None:
+    def log_error(msg: Any, full: bool = False, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False,
+                  args: Optional[Tuple] = None) -> None:
         """
         Log pre-formatted error
 
         :param msg_row: prevent manipulation on msg
         :type msg_row: bool
-        :param msg: message to print
+        :param msg: message to print (or callable which returns it, or format string)
         :type msg: Any
         :param full: include trace bock
         :type full: bool
@@ -31,66 +215,76 @@ class Logger:
         :type is_verbose: bool
         :param prefix: if be must be the prefix
         :type prefix: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
 
         :return: None
         """
 
-        if not is_verbose:
+        if not Logger.is_enabled_for(Logger.ERROR, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if msg_row is False and Logger.capitalize:
             msg = str(msg).capitalize()
 
         msg = f"{Fore.RED}{'ERROR: ' if prefix else ''}{str(msg)}"
-        print(msg)
+        Logger.emit(Logger.ERROR, msg)
 
         try:
             exc_type, exc_value, exc_traceback = sys.exc_info()
             line_num = exc_traceback.tb_lineno
             file_name = traceback.extract_tb(exc_traceback)[-1][0]
 
-            print(f"{Fore.RED}-> line {line_num} in {file_name}")
+            Logger.emit(Logger.ERROR, f"{Fore.RED}-> line {line_num} in {file_name}")
 
             if full:
                 tb_str = traceback.format_exc()
-                print(f"{Fore.RED}\nFull traceback: {tb_str}")
+                Logger.emit(Logger.ERROR, f"{Fore.RED}\nFull traceback: {tb_str}")
 
         except Exception as exception:
             pass
 
     @staticmethod
-    def log_success(msg: Any, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False) -> None:
+    def log_success(msg: Any, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False,
+                    args: Optional[Tuple] = None) -> None:
         """
         Log pre-formatted success
 
         :param msg_row: prevent manipulation on msg
         :type msg_row: bool
-        :param msg: message to print
+        :param msg: message to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
         :param prefix: if must be the prefix
         :type prefix: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
 
         :return: None
         """
 
-        if not is_verbose:
+        if not Logger.is_enabled_for(Logger.INFO, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if msg_row is False and Logger.capitalize:
             msg = str(msg).capitalize()
 
-        print(f"{Fore.GREEN}{'SUCCESS: ' + Fore.RESET if prefix else ''}{str(msg)}")
+        Logger.emit(Logger.INFO, f"{Fore.GREEN}{'SUCCESS: ' + Fore.RESET if prefix else ''}{str(msg)}")
 
     @staticmethod
-    def log_info(msg: Any, is_verbose: bool = True, end: str = "\n", prefix: bool = True, msg_row: bool = False) -> None:
+    def log_info(msg: Any, is_verbose: bool = True, end: str = "\n", prefix: bool = True, msg_row: bool = False,
+                 args: Optional[Tuple] = None) -> None:
         """
         Log pre-formatted info
 
         :param msg_row: prevent manipulation on msg
         :type msg_row: bool
-        :param msg: info to print
+        :param msg: info to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
@@ -98,43 +292,53 @@ class Logger:
         :type end: str
         :param prefix: if must be the prefix
         :type prefix: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
 
         :return: None
         """
-        if not is_verbose:
+        if not Logger.is_enabled_for(Logger.INFO, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if msg_row is False and Logger.capitalize:
             msg = str(msg).capitalize()
 
-        print(f"{Fore.CYAN}{'INFO: ' + Fore.RESET if prefix else ''}{str(msg)}", end=end)
+        Logger.emit(Logger.INFO, f"{Fore.CYAN}{'INFO: ' + Fore.RESET if prefix else ''}{str(msg)}", end=end)
 
     @staticmethod
-    def log_warning(msg: Any, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False) -> None:
+    def log_warning(msg: Any, is_verbose: bool = True, prefix: bool = True, msg_row: bool = False,
+                    args: Optional[Tuple] = None) -> None:
         """
         Log pre-formatted warning
 
         :param msg_row: prevent manipulation on msg
         :type msg_row: bool
-        :param msg: info to print
+        :param msg: info to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
         :param prefix: if must be the prefix
         :type prefix: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
 
         :return: None
         """
-        if not is_verbose:
+        if not Logger.is_enabled_for(Logger.WARNING, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if msg_row is False and Logger.capitalize:
             msg = str(msg).capitalize()
 
-        print(f"{Fore.YELLOW}{'WARNING: ' + Fore.RESET if prefix else ''}{str(msg)}")
+        Logger.emit(Logger.WARNING, f"{Fore.YELLOW}{'WARNING: ' + Fore.RESET if prefix else ''}{str(msg)}")
 
     @staticmethod
-    def log(msg: Any, is_verbose: bool = True, msg_row: bool = False, truncate: int | None = None) -> None:
+    def log(msg: Any, is_verbose: bool = True, msg_row: bool = False, truncate: int | None = None,
+            args: Optional[Tuple] = None, level: int = DEBUG) -> None:
         """
         Log pre-formatted text
 
@@ -142,16 +346,22 @@ class Logger:
         :type truncate: int
         :param msg_row: prevent manipulation on msg
         :type msg_row: bool
-        :param msg: message to print
+        :param msg: message to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
+        :param level: level of message
+        :type level: int
 
         :return: None
         """
-        if not is_verbose:
+        if not Logger.is_enabled_for(level, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if msg_row is False and Logger.capitalize:
             msg = str(msg).capitalize()
 
@@ -167,45 +377,54 @@ class Logger:
             if append_warning:
                 msg += "... [message truncates]"
 
-        print(f"{msg}")
+        Logger.emit(level, f"{msg}")
 
     @staticmethod
-    def log_custom(msg: Any, is_verbose: bool = True, prefix: str = None, color: colorama = Fore.MAGENTA, capitalize: bool = True) -> None:
+    def log_custom(msg: Any, is_verbose: bool = True, prefix: str = None, color: colorama = Fore.MAGENTA, capitalize: bool = True,
+                   args: Optional[Tuple] = None, level: int = INFO) -> None:
         """
         Pre-formatted custom log
 
         :param capitalize: if true capitalize msg
         :type capitalize: bool
-        :param msg: message to print
+        :param msg: message to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
         :param prefix: if there has to be the prefix
         :type prefix: bool
         :param color: color
+        :param args: args of format string
+        :type args: Optional[Tuple]
+        :param level: level of message
+        :type level: int
 
         :return: None
         """
 
-        if not is_verbose:
+        if not Logger.is_enabled_for(level, is_verbose):
             return
 
+        msg = Logger.render(msg, args)
+
         if capitalize:
             msg = str(msg).capitalize()
 
-        print(f"{color}{prefix + ': ' + Fore.RESET if not prefix is None else ''}{str(msg)}")
+        Logger.emit(level, f"{color}{prefix + ': ' + Fore.RESET if not prefix is None else ''}{str(msg)}")
 
     @staticmethod
-    def log_eel(msg: Any, is_verbose: bool = True) -> None:
+    def log_eel(msg: Any, is_verbose: bool = True, args: Optional[Tuple] = None) -> None:
         """
         Log pre-formatted eel
 
-        :param msg: info to print
+        :param msg: info to print (or callable which returns it, or format string)
         :type msg: Any
         :param is_verbose: it used to check if it is verbose
         :type is_verbose: bool
+        :param args: args of format string
+        :type args: Optional[Tuple]
 
         :return: None
         """
 
-        Logger.log_custom(msg=msg, is_verbose=is_verbose, prefix="EXPOSED", color=Fore.MAGENTA)
+        Logger.log_custom(msg=msg, is_verbose=is_verbose, prefix="EXPOSED", color=Fore.MAGENTA, args=args, level=Logger.DEBUG)
@@ -32,7 +32,8 @@ def to_dict(method: Callable, verbose: bool = False):
         else:
             data_to_dict = apply(res)
 
-        Logger.log(msg=f"convert data to_dict: {data_to_dict}", is_verbose=verbose, truncate=None)
+        # deferred: entire payload is rendered only if it is logged
+        Logger.log(msg="convert data to_dict: %s", args=(data_to_dict,), is_verbose=verbose, truncate=None)
 
         return data_to_dict
 
@@ -1,7 +1,7 @@
 import sys
 import os
 from random import randint
-from typing import Dict
+from typing import Dict, Iterable
 import shutil
 import hashlib
 import webbrowser
@@ -94,11 +94,12 @@ class Utils:
             os.rmdir(path)
 
     @staticmethod
-    def backup_dir_content(dir_path: str) -> bool:
+    def backup_dir_content(dir_path: str, exclude: Iterable[str] = ()) -> bool:
         """
         Make a backup of all files in the directory
 
         :param dir_path: path of dir
+        :param exclude: names of files which are not copied
         :return:
         """
 
@@ -107,7 +108,7 @@ class Utils:
 
                 path = os.path.join(dir_path, file_name)
 
-                if not file_name.endswith("." + Utils.BACKUP_EXT):
+                if not file_name.endswith("." + Utils.BACKUP_EXT) and file_name not in exclude and os.path.isfile(path):
                     Utils.backup(path)
 
             return True
@@ -1,15 +1,23 @@
 #!/bin/python3
 
-from lib.app.app import AppManager
 import sys
-import colorama
-from colorama import Fore
-from lib.utils.logger import Logger
-from lib.utils.utils import Utils
 from typing import Dict, List
+from lib.utils.constants import VERSION
 
-# Initializing Colorama (Important)
-colorama.init(autoreset=True)
+# heavy modules (Eel, GitPython, entities...) are imported only by commands which need them,
+# so 'version' and 'help' are fast (see benchmark/startup_benchmark.py)
+
+
+def app_manager_class():
+    """
+    Import and return AppManager (it imports the whole app)
+
+    :return: AppManager class
+    """
+
+    from lib.app.app import AppManager
+
+    return AppManager
 
 
 def flags_management(min_params: int, flags: Dict, args: List):
@@ -22,6 +30,9 @@ def flags_management(min_params: int, flags: Dict, args: List):
     :return:
     """
 
+    from lib.utils.logger import Logger
+    from lib.utils.utils import Utils
+
     for key in flags.keys():
         if flags.get(key, False):
             min_params += 1
@@ -31,6 +42,32 @@ def flags_management(min_params: int, flags: Dict, args: List):
         Utils.exit(verbose=False)
 
 
+def flag_value(flag: str, args: List, numeric: bool = True, path_last: bool = True) -> str | None:
+    """
+    Return value of a flag with a value (e.g. '--scale 1000'), None if flag is not passed
+
+    :param flag:
+    :param args:
+    :param numeric: value must be a non-negative integer
+    :param path_last: last parameter is a path, so it cannot be the value
+    :return:
+    """
+
+    from lib.utils.logger import Logger
+    from lib.utils.utils import Utils
+
+    if flag not in args:
+        return None
+
+    index = args.index(flag) + 1
+
+    if index >= len(args) - int(path_last) or (numeric and not args[index].isdigit()):
+        Logger.log_error(msg=f"invalid value of '{flag}'", is_verbose=True)
+        Utils.exit(verbose=False)
+
+    return args[index]
+
+
 def print_help() -> None:
     """
     Print the help for user
@@ -38,6 +75,12 @@ def print_help() -> None:
     :return:
     """
 
+    import colorama
+    from colorama import Fore
+
+    # Initializing Colorama (Important)
+    colorama.init(autoreset=True)
+
     app_name = f"""\n{Fore.BLUE}
  ███████████                   █████                          
 ░█░░░███░░░█                  ░░███                           
@@ -60,9 +103,19 @@ def print_help() -> None:
   {Fore.MAGENTA}-f{Fore.RESET}: force erase if there is already a database
   {Fore.MAGENTA}-o{Fore.RESET}: open app at end
   {Fore.MAGENTA}-v{Fore.RESET}: verbose
+  {Fore.MAGENTA}--scale N{Fore.RESET}: generate N tasks (users, assignments, labels and to-do items in proportion) in only one transaction
+  {Fore.MAGENTA}--seed S{Fore.RESET}: seed of generated data, the same seed gives the same data (default 42)
+  {Fore.MAGENTA}--until YYYY-MM-DD{Fore.RESET}: end of generated history (default 2025-01-01, fixed so that the seed is enough to reproduce data)
+{Fore.LIGHTGREEN_EX}serve{Fore.RESET}, {Fore.LIGHTGREEN_EX}s{Fore.RESET} {Fore.GREEN}[--host H] [--port P] [--socket PATH]{Fore.RESET}: launch the application without GUI, exposed methods are served over local HTTP/JSON (POST /rpc/<method>)
+  {Fore.MAGENTA}--host H{Fore.RESET}: host (default 127.0.0.1)
+  {Fore.MAGENTA}--port P{Fore.RESET}: port (default port of settings)
+  {Fore.MAGENTA}--socket PATH{Fore.RESET}: serve on a Unix socket instead of host and port
 {Fore.LIGHTGREEN_EX}init{Fore.RESET}, {Fore.LIGHTGREEN_EX}i{Fore.RESET} {Fore.GREEN}[-flag1 -flag2 ...] <path>{Fore.RESET}: initialize this app in users projects
   {Fore.MAGENTA}-f{Fore.RESET}: force reinitialization
   {Fore.MAGENTA}-o{Fore.RESET}: open app at end
+{Fore.LIGHTGREEN_EX}profile{Fore.RESET}, {Fore.LIGHTGREEN_EX}p{Fore.RESET} {Fore.GREEN}[-flag1 -flag2 ...] <path>{Fore.RESET}: print SQL profiler report of project in path
+  {Fore.MAGENTA}-l{Fore.RESET}: print last report saved by app (with 'sql_profiler' setting) instead of profile main reads
+  {Fore.MAGENTA}-v{Fore.RESET}: verbose
 {Fore.LIGHTGREEN_EX}help{Fore.RESET}, {Fore.LIGHTGREEN_EX}h{Fore.RESET}: print help 
 {Fore.LIGHTGREEN_EX}version{Fore.RESET}, {Fore.LIGHTGREEN_EX}v{Fore.RESET}: print version
 """
@@ -71,7 +124,7 @@ def print_help() -> None:
 
 
 def print_version() -> None:
-    print(AppManager.VERSION)
+    print(VERSION)
 
 
 def main(args: list) -> None:
@@ -84,32 +137,70 @@ def main(args: list) -> None:
     if "help" in args or "h" in args:
         print_help()
 
-        Utils.exit(verbose=False)
+        sys.exit()
 
     elif "version" in args or "v" in args:
         print_version()
 
-        Utils.exit(verbose=False)
+        sys.exit()
 
     elif "demo" in args or "d" in args:
         flags: Dict = {
                 "forced": "-f" in args,
                 "open_app_at_end": "-o" in args,
                 "verbose": "-v" in args,
+                "scale": "--scale" in args,
+                "seed": "--seed" in args,
+                "until": "--until" in args,
             }
 
-        flags_management(min_params=3, flags=flags, args=args)
+        scale: str | None = flag_value("--scale", args)
+        seed: str | None = flag_value("--seed", args)
+        until: str | None = flag_value("--until", args, numeric=False)
+
+        # flags with a value take two parameters
+        flags_management(min_params=3 + int(scale is not None) + int(seed is not None) + int(until is not None),
+                         flags=flags, args=args)
 
         project_path: str = args[-1]
 
-        AppManager.demo(project_path=project_path, force_demo=flags["forced"], open_app_at_end=flags["open_app_at_end"],
-                        verbose=flags["verbose"])
+        generator: Dict = dict()        # generator mode, else the small demo is created
+        if scale is not None:
+            generator["scale"] = int(scale)
+        if seed is not None:
+            generator["seed"] = int(seed)
+        if until is not None:
+            import datetime
 
-        Utils.exit(verbose=False)
+            try:
+                generator["until"] = datetime.datetime.fromisoformat(until)
+
+            except ValueError:
+                from lib.utils.logger import Logger
+                from lib.utils.utils import Utils
+
+                Logger.log_error(msg=f"invalid value of '--until'", is_verbose=True)
+                Utils.exit(verbose=False)
+
+        app_manager_class().demo(project_path=project_path, force_demo=flags["forced"], open_app_at_end=flags["open_app_at_end"],
+                        verbose=flags["verbose"], **generator)
+
+        sys.exit()
 
     elif "run" in args or "r" in args:
 
-        AppManager.starter()
+        app_manager_class().starter()
+
+    elif "serve" in args or "s" in args:
+        options: Dict = dict()
+
+        for flag, key in (("--host", "host"), ("--socket", "unix_socket"), ("--port", "port")):
+            value: str | None = flag_value(flag, args, numeric=flag == "--port", path_last=False)
+
+            if value is not None:
+                options[key] = int(value) if key == "port" else value
+
+        app_manager_class().serve(**options)
 
     elif "init" in args or "i" in args:
         flags: Dict = {
@@ -121,9 +212,23 @@ def main(args: list) -> None:
 
         project_path: str = args[-1]
 
-        AppManager.initializer(project_path=project_path, open_on_init=flags["open_app_at_end"], force_init=flags["forced"])
+        app_manager_class().initializer(project_path=project_path, open_on_init=flags["open_app_at_end"], force_init=flags["forced"])
+
+    elif "profile" in args or "p" in args:
+        flags: Dict = {
+            "last": "-l" in args,
+            "verbose": "-v" in args,
+        }
+
+        flags_management(min_params=3, flags=flags, args=args)
+
+        project_path: str = args[-1]
+
+        app_manager_class().profile(project_path=project_path, last=flags["last"], verbose=flags["verbose"])
 
     else:
+        from lib.utils.logger import Logger
+
         Logger.log_warning(msg="command not found, use 'help' to see the commands list", is_verbose=True)
 
 
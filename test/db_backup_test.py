@@ -0,0 +1,110 @@
+import os
+import gzip
+import sqlite3
+import tempfile
+import threading
+import unittest
+from lib.db.backup import BackupManager
+
+
+class BackupManagerTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "database.db")
+        self.backup_dir = os.path.join(self.tmp_dir.name, "backups")
+
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, value TEXT)")
+            connection.executemany("INSERT INTO item (value) VALUES (?)", [("x" * 200,) for _ in range(5000)])
+
+        connection.close()
+
+        self.backup_manager = BackupManager(self.db_path, self.backup_dir, generations=2, pages_per_step=16)
+
+    def tearDown(self):  # run after each test case
+        self.backup_manager.stop()
+        self.tmp_dir.cleanup()
+
+    def insert(self, n: int = 1) -> None:
+        connection = sqlite3.connect(self.db_path)
+        connection.executemany("INSERT INTO item (value) VALUES (?)", [("y",) for _ in range(n)])
+        connection.commit()
+        connection.close()
+
+    @staticmethod
+    def rows_of(path: str) -> int:
+        with gzip.open(path, "rb") as source:
+            content = source.read()
+
+        tmp_path = path + ".check"
+        with open(tmp_path, "wb") as target:
+            target.write(content)
+
+        connection = sqlite3.connect(tmp_path)
+        rows = connection.execute("SELECT COUNT(*) FROM item").fetchone()[0]
+        connection.close()
+        os.remove(tmp_path)
+
+        return rows
+
+    def test_generations(self):
+        first = self.backup_manager.backup()
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(BackupManager.verify(first))
+        self.assertEqual(5000, self.rows_of(first))
+
+        self.assertIsNone(self.backup_manager.backup())     # not changed
+
+        self.insert()
+        second = self.backup_manager.backup()
+        self.insert()
+        third = self.backup_manager.backup()
+
+        self.assertEqual([third, second], self.backup_manager.generation_paths())     # rotated
+        self.assertEqual(5002, self.rows_of(third))
+        self.assertEqual({third: None, second: None}, self.backup_manager.verify_all())
+        self.assertEqual([], [name for name in os.listdir(self.backup_dir) if name.endswith(BackupManager.TMP_EXTENSION)])
+
+    def test_corrupted_generation(self):
+        path = self.backup_manager.backup()
+
+        with open(path, "r+b") as file:
+            file.seek(os.path.getsize(path) // 2)
+            file.write(b"\x00" * 64)
+
+        self.assertIsNotNone(BackupManager.verify(path))
+
+    def test_concurrent_writes(self):
+        stop = threading.Event()
+
+        def write():
+            while not stop.is_set():
+                self.insert(10)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+
+        try:
+            path = self.backup_manager.backup(force=True)
+
+        finally:
+            stop.set()
+            writer.join()
+
+        self.assertIsNone(BackupManager.verify(path))
+        self.assertEqual(0, (self.rows_of(path) - 5000) % 10)     # snapshot of committed transactions
+
+    def test_final_backup_on_stop(self):
+        self.backup_manager.start(interval=0)       # only on stop
+        self.insert()
+
+        self.backup_manager.stop(final_backup=True)
+
+        self.assertFalse(self.backup_manager.running)
+        self.assertEqual(1, len(self.backup_manager.generation_paths()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+from typing import Dict, List
+from lib.db.db import DBManager
+from lib.app.service.demo import Demo
+
+
+class DemoPopulateTest(unittest.TestCase):
+
+    UNTIL = datetime.datetime(2024, 6, 1, 12, 0, 0)
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        patcher = mock.patch.object(Demo, "CHUNK_SIZE", 100)      # more chunks
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):  # run after each test case
+        self.tmp_dir.cleanup()
+
+    def new_db(self, name: str) -> DBManager:
+        db_manager = DBManager.creating_database(os.path.join(self.tmp_dir.name, name))
+        db_manager.generate_base_db_structure(strict=True)
+        db_manager.insert_from_dict(db_manager.user_table_name, {"username": "pm", "email": "pm@email.com",
+                                                                 "password": "psw", "role_id": 1})
+
+        self.addCleanup(db_manager.close_connection)
+
+        return db_manager
+
+    @staticmethod
+    def dump(db_manager: DBManager, tables: List[str]) -> Dict[str, List[Dict]]:
+        return {table: db_manager.cursor.execute(f"Select * From {table} Order By id").fetchall() for table in tables}
+
+    @staticmethod
+    def triggers(db_manager: DBManager) -> List[Dict]:
+        return db_manager.cursor.execute("Select name, sql From sqlite_master Where type = 'trigger' Order By name").fetchall()
+
+    def test_reproducible(self):
+        first = self.new_db("first.db")
+        second = self.new_db("second.db")
+
+        counts = Demo.populate(first, 350, seed=7)      # default end of history is fixed too
+        Demo.populate(second, 350, seed=7)
+
+        self.assertEqual(350, counts[first.task_table_name])
+        self.assertEqual(Demo.N_USERS, counts[first.user_table_name])
+        self.assertEqual(self.dump(first, list(counts.keys())), self.dump(second, list(counts.keys())))
+
+        for table, n in counts.items():
+            self.assertEqual(n + int(table == first.user_table_name),      # project manager
+                             first.cursor.execute(f"Select Count(*) As n From {table}").fetchone()["n"])
+
+    def test_consistency(self):
+        db_manager = self.new_db("database.db")
+        triggers = self.triggers(db_manager)
+
+        Demo.populate(db_manager, 300, seed=1, until=self.UNTIL)
+
+        self.assertEqual(triggers, self.triggers(db_manager))
+        self.assertEqual([], db_manager.cursor.execute("PRAGMA foreign_key_check").fetchall())
+
+        # generated datetimes are kept (triggers didn't touch tasks) and in the past
+        wrong = db_manager.cursor.execute(f"Select Count(*) As n From {db_manager.task_table_name} "
+                                          f"Where updated_at < created_at Or updated_at > ?", (str(self.UNTIL),)).fetchone()["n"]
+        self.assertEqual(0, wrong)
+
+        # to-do items of done tasks are done
+        undone = db_manager.cursor.execute(f"Select Count(*) As n From {db_manager.todo_item_table_name} t "
+                                           f"Join {db_manager.task_table_name} k On k.id = t.task_id "
+                                           f"Where k.task_status_id = ? And t.done = 0", (db_manager.done_task_status_id,)).fetchone()["n"]
+        self.assertEqual(0, undone)
+
+    def test_pending_transaction(self):
+        db_manager = self.new_db("database.db")
+
+        # sqlite3 opens a transaction implicitly before an insert
+        db_manager.cursor.execute(f"Insert Into {db_manager.task_label_table_name} (name, hex_color) Values ('x', '#000000')")
+        self.assertTrue(db_manager.connection.in_transaction)
+
+        counts = Demo.populate(db_manager, 300, seed=1, until=self.UNTIL)
+
+        self.assertFalse(db_manager.connection.in_transaction)
+
+        # everything is committed, so another connection sees it
+        other = DBManager(db_path=os.path.join(self.tmp_dir.name, "database.db"))
+        self.addCleanup(other.close_connection)
+
+        self.assertEqual(counts[db_manager.task_table_name],
+                         other.cursor.execute(f"Select Count(*) As n From {db_manager.task_table_name}").fetchone()["n"])
+
+    def test_rollback(self):
+        db_manager = self.new_db("database.db")
+        triggers = self.triggers(db_manager)
+        bulk_insert = db_manager.bulk_insert
+
+        def failing(table_name, *args):
+            if table_name == db_manager.todo_item_table_name:
+                raise RuntimeError("disk full")
+
+            return bulk_insert(table_name, *args)
+
+        with mock.patch.object(db_manager, "bulk_insert", side_effect=failing):
+            self.assertRaises(RuntimeError, Demo.populate, db_manager, 300, 1, self.UNTIL)
+
+        self.assertEqual(0, db_manager.cursor.execute(f"Select Count(*) As n From {db_manager.task_table_name}").fetchone()["n"])
+        self.assertEqual(1, db_manager.cursor.execute(f"Select Count(*) As n From {db_manager.user_table_name}").fetchone()["n"])
+        self.assertEqual(triggers, self.triggers(db_manager))
+
+
+if __name__ == '__main__':
+    unittest.main()
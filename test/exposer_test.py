@@ -0,0 +1,140 @@
+import os
+import eel
+import tempfile
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from lib.db.db import DBManager
+from lib.db.entity.user import UsersManager, RolesManager
+from lib.db.entity.task import TasksManager, TaskStatusManager, TaskAssignmentsManager, TaskTaskLabelPivotManager, \
+    TaskLabelsManager, TodoItemsManager
+from lib.repo.repo import RepoManager
+from lib.app.service.auth import AuthService
+from lib.app.service.exposer import ExposerService
+from lib.utils.error import Errors
+
+
+class ExposerServiceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):  # run once before all test cases
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+
+        db_manager = DBManager.creating_database(os.path.join(cls.tmp_dir.name, "database.db"))
+        db_manager.generate_base_db_structure(strict=True)
+
+        task_assignment_manager = TaskAssignmentsManager(db_manager)
+        task_task_label_pivot_manager = TaskTaskLabelPivotManager(db_manager)
+
+        cls.project_manager = SimpleNamespace(
+            db_manager=db_manager,
+            task_status_manager=TaskStatusManager(db_manager),
+            todo_items_manager=TodoItemsManager(db_manager),
+            task_assignment_manager=task_assignment_manager,
+            task_task_label_pivot_manager=task_task_label_pivot_manager,
+            task_labels_manager=TaskLabelsManager(db_manager),
+            tasks_manager=TasksManager(db_manager, task_assignment_manager, task_task_label_pivot_manager),
+            users_manager=UsersManager(db_manager),
+            roles_manager=RolesManager(db_manager),
+            repo_manager=RepoManager(),
+            project_information=lambda: None,
+        )
+
+        cls.project_manager.users_manager.create_from_dict({"username": "pm", "email": "pm@email.com",
+                                                            "password": "psw", "avatar_hex_color": "#ffffff",
+                                                            "role_id": 1})
+
+        cls.auth_service = AuthService(users_manager=cls.project_manager.users_manager,
+                                       vault_path=os.path.join(cls.tmp_dir.name, "vault.json"))
+
+        cls.exposer = ExposerService(cls.project_manager, auth_service=cls.auth_service, dashboard_service=None)
+        cls.exposer.expose_methods()
+
+    @classmethod
+    def tearDownClass(cls):  # run once after all test cases
+        cls.project_manager.db_manager.close_connection()
+        cls.tmp_dir.cleanup()
+
+    def tearDown(self):  # run after each test case
+        self.auth_service.logout()
+
+    def test_batch_login_required(self):
+        results = self.exposer.batch([{"method": "task_status_all", "args": []}])
+
+        self.assertIsNone(results[0]["result"])
+        self.assertEqual(Errors.LOGIN_REQUIRE.code, results[0]["error"]["code"])
+
+    def test_batch_results_are_positional(self):
+        self.auth_service.login("pm@email.com", "psw")
+
+        results = self.exposer.batch([
+            {"method": "task_status_all", "args": []},
+            {"method": "unknown_method", "args": []},
+            {"method": "user_find", "args": [1]},
+            {"method": "task_label_find", "args": {"entity_id": 1, "with_relations": False}},
+            {"method": "batch", "args": [[]]},
+            "invalid",
+        ])
+
+        self.assertEqual(8, len(results[0]["result"]))
+        self.assertEqual(Errors.METHOD_NOT_FOUND.code, results[1]["error"]["code"])
+        self.assertEqual("pm@email.com", results[2]["result"]["email"])
+        self.assertEqual(1, results[3]["result"]["id"])
+        self.assertEqual(Errors.METHOD_NOT_FOUND.code, results[4]["error"]["code"])
+        self.assertEqual(Errors.INVALID_CALL.code, results[5]["error"]["code"])
+
+    def test_batch_shares_identity_map(self):
+        db_manager = self.project_manager.db_manager
+
+        with db_manager.read_transaction():
+            first = self.project_manager.users_manager.find(1)
+
+            self.assertIn((db_manager.user_table_name, 1), db_manager.identity_map)
+            self.assertEqual(first, self.project_manager.users_manager.find(1))
+
+            # a write erases identity map
+            self.project_manager.task_labels_manager.update_from_dict(1, {"description": "changed"})
+            self.assertNotIn((db_manager.user_table_name, 1), db_manager.identity_map)
+
+        self.assertIsNone(db_manager.identity_map)
+
+    def test_batch_rechecks_auth(self):
+        results = self.exposer.batch([
+            {"method": "task_status_all", "args": []},
+            {"method": "auth_login", "args": ["pm@email.com", "psw"]},
+            {"method": "task_status_all", "args": []},
+            {"method": "auth_logout", "args": []},
+            {"method": "task_status_all", "args": []},
+        ])
+
+        self.assertEqual(Errors.LOGIN_REQUIRE.code, results[0]["error"]["code"])
+        self.assertEqual(8, len(results[2]["result"]))
+        self.assertEqual(Errors.LOGIN_REQUIRE.code, results[4]["error"]["code"])
+
+    def test_batch_write_ends_snapshot(self):
+        self.auth_service.login("pm@email.com", "psw")
+        db_manager = self.project_manager.db_manager
+
+        with mock.patch.object(db_manager, "read_transaction", wraps=db_manager.read_transaction) as read_transaction:
+            results = self.exposer.batch([
+                {"method": "task_label_find", "args": [1]},
+                {"method": "task_label_update", "args": [1, {"description": "in batch"}]},
+                {"method": "task_label_find", "args": [1]},
+            ])
+
+        self.assertEqual(2, read_transaction.call_count)      # a new transaction after the write
+        self.assertEqual("in batch", results[2]["result"]["description"])
+
+    def test_metrics_snapshot(self):
+        self.auth_service.login("pm@email.com", "psw")
+
+        eel._exposed_functions["task_status_all"]()
+
+        metrics = eel._exposed_functions[ExposerService.METRICS_SNAPSHOT_ALIAS]()["methods"]["task_status_all"]
+
+        self.assertGreaterEqual(metrics["calls"], 1)
+        self.assertGreaterEqual(metrics["db_statements"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import json
+import tempfile
+import unittest
+from lib.file.file_manager import JsonStore
+
+
+class JsonStoreTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "vault.json")
+        self.store = JsonStore()
+
+    def tearDown(self):  # run after each test case
+        self.tmp_dir.cleanup()
+
+    def test_cached_reads(self):
+        with open(self.path, "w") as file:
+            json.dump({"email": "a@example.com"}, file)
+
+        self.assertEqual({"email": "a@example.com"}, self.store.read(self.path))
+
+        data = self.store.read(self.path)
+        data["email"] = "changed"       # copy, store is not modified
+
+        self.assertEqual({"email": "a@example.com"}, self.store.read(self.path))
+        self.assertEqual({"hits": 2, "misses": 1, "entries": 1}, self.store.stats())
+
+    def test_revalidation(self):
+        self.store.write(self.path, {"email": "a@example.com"})
+
+        self.assertEqual({"email": "a@example.com"}, self.store.read(self.path))
+        self.assertEqual(0, self.store.stats()["misses"])      # written data is cached
+
+        # changed by another process
+        with open(self.path, "w") as file:
+            json.dump({"email": "b@example.com", "password": "x"}, file)
+
+        self.assertEqual({"email": "b@example.com", "password": "x"}, self.store.read(self.path))
+        self.assertEqual(1, self.store.stats()["misses"])
+
+        os.remove(self.path)
+
+        with self.assertRaises(OSError):
+            self.store.read(self.path)
+
+    def test_atomic_write(self):
+        self.store.write(self.path, {"a": 1})
+        self.store.write(self.path, {"a": 2})
+
+        self.assertEqual(["vault.json"], os.listdir(self.tmp_dir.name))
+
+        with open(self.path) as file:
+            self.assertEqual({"a": 2}, json.load(file))
+
+
+if __name__ == '__main__':
+    unittest.main()
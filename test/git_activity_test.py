@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from lib.repo.repo import RepoManager
+from lib.repo.activity import GitActivityIndex
+from lib.app.service.git_activity import GitActivityService
+from benchmark.fixtures import BenchmarkProject, generate_repo
+
+
+class GitActivityIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):  # run once before all test cases
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+
+        generate_repo(cls.tmp_dir.name, n_commits=200, n_branches=3, merge_every=10, tag_every=50)
+
+        cls.repo_manager = RepoManager(project_path=cls.tmp_dir.name)
+        cls.repo_manager.open_repo(cls.tmp_dir.name)
+
+        records, context = cls.repo_manager.read_commits()
+
+        cls.index = GitActivityIndex.build(records, refs=context.membership.refs, bits=context.membership.bits,
+                                           heads=context.heads,
+                                           default_ref=cls.repo_manager.get_default_branch(context),
+                                           task_branches={1: "feature-0", 2: "feature-2", 3: "missing"},
+                                           user_of_email={"user1@email.com": 10, "user2@email.com": 20})
+
+    @classmethod
+    def tearDownClass(cls):  # run once after all test cases
+        cls.repo_manager.repo.close()
+        cls.tmp_dir.cleanup()
+
+    def git(self, *args: str) -> str:
+        return self.repo_manager.repo.git.execute(["git", *args])
+
+    def test_task_stats(self):
+        self.assertEqual("main", self.index.default_ref)
+
+        for task_id, branch in ((1, "feature-0"), (2, "feature-2")):
+            stats = self.index.tasks[task_id]
+
+            behind, ahead = self.git("rev-list", "--left-right", "--count", f"main...{branch}").split()
+            self.assertEqual((int(ahead), int(behind)), (stats.ahead, stats.behind))
+
+            # first-parent line of branch until it joins first-parent line of main
+            main_line = set(self.git("rev-list", "--first-parent", "main").split())
+            line = [h for h in self.git("rev-list", "--first-parent", branch).split()]
+            expected = []
+            for h in line:
+                if h in main_line:
+                    break
+                expected.append(h)
+
+            self.assertEqual(len(expected), stats.commits)
+            self.assertEqual(expected[:5], [c["hexsha"] for c in self.index.task_activity(task_id, last=5)["last_commits"]])
+            self.assertEqual(self.git("log", "-1", "--format=%cI", branch), stats.last_commit_at)
+
+        self.assertIsNone(self.index.tasks[3].ref)
+        self.assertEqual(0, self.index.tasks[3].commits)
+        self.assertIsNone(self.index.task_activity(4))
+
+    def test_user_stats(self):
+        commits = self.git("log", "--all", "--author=<user1@email.com>", "--format=%H").split()
+
+        self.assertEqual(len(commits), self.index.users[10].commits)
+        self.assertEqual(self.git("log", "-1", "--all", "--author=<user1@email.com>", "--format=%cI"),
+                         self.index.users[10].last_commit_at)
+
+        for commit in self.index.task_activity(1)["last_commits"]:
+            self.assertEqual(self.index.user_of_email.get(commit["author_email"]), commit["user_id"])
+
+
+class GitActivityServiceTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        generate_repo(self.tmp_dir.name, n_commits=50, n_branches=2, merge_every=10)
+
+        self.repo_manager = RepoManager(project_path=self.tmp_dir.name)
+        self.repo_manager.open_repo(self.tmp_dir.name)
+
+        self.project = BenchmarkProject(self.tmp_dir.name, n_users=5, n_tasks=50)
+        self.project.db_manager.connection.execute("Update task Set git_branch = 'feature-0' Where id = 1")
+        self.project.db_manager.connection.commit()
+
+        self.service = GitActivityService(repo_manager=lambda: self.repo_manager,
+                                          tasks_manager=self.project.tasks_manager,
+                                          users_manager=self.project.users_manager)
+
+        self.builds = mock.patch.object(self.repo_manager, "read_commits", wraps=self.repo_manager.read_commits).start()
+        self.all_tasks = mock.patch.object(self.project.tasks_manager, "all_as_model",
+                                           wraps=self.project.tasks_manager.all_as_model).start()
+        self.refs = mock.patch.object(self.repo_manager, "refs_snapshot", wraps=self.repo_manager.refs_snapshot).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):  # run after each test case
+        self.project.db_manager.close_connection()
+        self.repo_manager.repo.close()
+        self.tmp_dir.cleanup()
+
+    def test_cache_hit(self):
+        first = self.service.index()
+
+        for _ in range(5):
+            self.assertIs(first, self.service.index())
+            self.service.summary()
+
+        # nothing is read again
+        self.assertEqual(1, self.builds.call_count)
+        self.assertEqual(1, self.all_tasks.call_count)
+        self.assertEqual(1, self.refs.call_count)
+
+    def test_rebuild_on_changes(self):
+        first = self.service.index()
+
+        # a write which doesn't change branches: tasks are read again, index is the same
+        self.project.db_manager.connection.execute("Update task Set priority = 1 Where id = 2")
+        self.assertIs(first, self.service.index())
+        self.assertEqual(2, self.all_tasks.call_count)
+
+        # another task branch
+        self.project.db_manager.connection.execute("Update task Set git_branch = 'feature-1' Where id = 2")
+        second = self.service.index()
+        self.assertIsNot(first, second)
+        self.assertIsNotNone(second.tasks[2].ref)
+
+        # refs changed by a fetch (repository is invalidated) are read immediately
+        self.repo_manager.repo.git.branch("feature-new", "main")
+        self.repo_manager.invalidate()
+        self.assertIsNot(second, self.service.index())
+        self.assertEqual(2, self.refs.call_count)
+
+    def test_switch_project(self):
+        db_manager = self.project.db_manager
+        db_manager.refresh_connection(db_path=os.path.join(self.tmp_dir.name, "database.db"))     # no changes yet
+
+        first = self.service.index()
+        self.assertIsNotNone(first.tasks[1].ref)
+        version = db_manager.data_version
+
+        # another project: same repository, task 1 has not a branch and user emails are different
+        os.mkdir(os.path.join(self.tmp_dir.name, "other"))
+        other = BenchmarkProject(os.path.join(self.tmp_dir.name, "other"), n_users=3, n_tasks=10)
+        other.db_manager.close_connection()
+
+        db_manager.refresh_connection(db_path=os.path.join(self.tmp_dir.name, "other", "database.db"))
+        self.assertNotEqual(version, db_manager.data_version)
+
+        second = self.service.index()
+
+        self.assertEqual(2, self.all_tasks.call_count)      # branches and emails are read again
+        self.assertIsNone(second.tasks.get(1))
+        self.assertEqual({f"user{n}@email.com" for n in range(1, 4)}, set(second.user_of_email.keys()))
+
+    def test_invalidate(self):
+        first = self.service.index()
+
+        self.service.invalidate()
+
+        self.assertIsNot(first, self.service.index())
+        self.assertEqual(2, self.builds.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
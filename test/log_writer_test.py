@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from lib.utils.log_writer import LogWriter, LogRecord, LogSink, RotatingFileSink
+
+
+class BlockingSink(LogSink):
+    """
+    Sink which waits until it is released, so queue can be filled
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lines = []
+        self.closed = False
+
+    def write(self, record: LogRecord) -> None:
+        self.release.wait(5)
+
+        if self.closed:
+            raise ValueError("write on closed sink")
+
+        self.lines.append(record.line)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class LogWriterTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):  # run after each test case
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def record(line: str) -> LogRecord:
+        return LogRecord(created=0, level=20, module="test", line=line)
+
+    def fill(self, drop_policy: str) -> (LogWriter, BlockingSink):
+        sink = BlockingSink()
+        writer = LogWriter(sinks=[sink], max_queue_size=2, drop_policy=drop_policy)
+
+        writer.put(self.record("first"))        # taken by writer thread, it blocks on sink
+
+        while writer.stats()["queued"] > 0:
+            pass
+
+        for line in ("second", "third", "fourth"):
+            writer.put(self.record(line))
+
+        sink.release.set()
+        writer.close()
+
+        return writer, sink
+
+    def test_drop_newest(self):
+        writer, sink = self.fill(LogWriter.DROP_NEWEST)
+
+        self.assertEqual(1, writer.dropped)
+        self.assertEqual(["first", "second", "third"], sink.lines)
+
+    def test_drop_oldest(self):
+        writer, sink = self.fill(LogWriter.DROP_OLDEST)
+
+        self.assertEqual(1, writer.dropped)
+        self.assertEqual(["first", "third", "fourth"], sink.lines)
+
+    def test_drop_oldest_keeps_flush(self):
+        sink = BlockingSink()
+        writer = LogWriter(sinks=[sink], max_queue_size=2, drop_policy=LogWriter.DROP_OLDEST)
+
+        writer.put(self.record("first"))        # taken by writer thread, it blocks on sink
+
+        while writer.stats()["queued"] > 0:
+            pass
+
+        flushed = []
+        flusher = threading.Thread(target=lambda: flushed.append(writer.flush()))
+        flusher.start()
+
+        while writer.stats()["queued"] < 1:
+            pass
+
+        writer.put(self.record("second"))
+        writer.put(self.record("third"))       # queue is full: "second" is dropped, not the (older) flush request
+
+        flusher.join(0.2)
+        self.assertTrue(flusher.is_alive())     # still waiting for records before it
+
+        sink.release.set()
+        flusher.join()
+        writer.close()
+
+        self.assertEqual([True], flushed)
+        self.assertEqual(1, writer.dropped)
+        self.assertEqual(["first", "third"], sink.lines)
+
+    def test_close_timeout(self):
+        sink = BlockingSink()
+        writer = LogWriter(sinks=[sink])
+        writer.FLUSH_TIMEOUT = 0.05
+
+        writer.put(self.record("first"))
+        writer.put(self.record("second"))
+
+        writer.close()      # writer thread is still blocked on sink
+
+        self.assertTrue(writer.closed)
+        self.assertFalse(sink.closed)
+
+        sink.release.set()
+
+        deadline = time.time() + 5
+        while not sink.closed and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertTrue(sink.closed)
+        self.assertEqual(["first", "second"], sink.lines)
+        self.assertEqual(0, writer.sink_errors)
+
+    def test_rotating_file_sink(self):
+        path = os.path.join(self.tmp_dir.name, "test.log")
+
+        writer = LogWriter(sinks=[RotatingFileSink(path, max_bytes=100, backup_count=2, json_lines=True)])
+        for i in range(20):
+            writer.put(self.record(f"\x1b[36mline {i}"))
+
+        writer.close()
+
+        self.assertTrue(os.path.isfile(path + ".1"))
+        self.assertTrue(os.path.isfile(path + ".2"))
+        self.assertFalse(os.path.isfile(path + ".3"))
+
+        with open(path) as file:
+            last = json.loads(file.readlines()[-1])
+
+        self.assertEqual("line 19", last["message"])
+
+
+if __name__ == '__main__':
+    unittest.main()
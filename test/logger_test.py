@@ -0,0 +1,38 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from lib.utils.logger import Logger
+
+
+class LoggerTest(unittest.TestCase):
+
+    def tearDown(self):  # run after each test case
+        Logger.level = Logger.DEBUG
+
+    def test_deferred_message_is_not_rendered_if_discarded(self):
+        def fail():
+            raise AssertionError("message rendered")
+
+        Logger.log(msg=fail, is_verbose=False)
+        Logger.log_info(msg=fail, is_verbose=False)
+
+        Logger.level = Logger.ERROR
+        Logger.log_warning(msg=fail)
+
+    def test_deferred_message_is_rendered(self):
+        with redirect_stdout(io.StringIO()) as out:
+            Logger.log(msg=lambda: "lazy message", msg_row=True)
+            Logger.log(msg="%s of %s", args=(1, 2), msg_row=True)
+
+        self.assertEqual("lazy message\n1 of 2\n", out.getvalue())
+
+    def test_level(self):
+        Logger.level = Logger.WARNING
+
+        self.assertFalse(Logger.is_enabled_for(Logger.INFO))
+        self.assertTrue(Logger.is_enabled_for(Logger.ERROR))
+        self.assertFalse(Logger.is_enabled_for(Logger.ERROR, is_verbose=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import json
+import tempfile
+import unittest
+from lib.app.service.metrics import MetricsService, percentile
+from lib.utils.error import Errors
+
+
+class MetricsServiceTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.metrics = MetricsService()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(95, percentile(values, 95))
+        self.assertEqual(100, percentile(values, 100))
+        self.assertEqual(0, percentile([], 50))
+
+    def test_instrument(self):
+        statements = [0]
+
+        def query(n: int) -> list:
+            statements[0] += 2
+            return [n] * n
+
+        def fail():
+            raise ValueError()
+
+        self.metrics.statements_counter = lambda: statements[0]
+
+        instrumented_query = self.metrics.instrument("query", query)
+        instrumented_fail = self.metrics.instrument("fail", fail)
+        instrumented_denied = self.metrics.instrument("denied", lambda: Errors.LOGIN_REQUIRE.to_dict())
+
+        self.assertEqual("query", instrumented_query.__name__)
+
+        for _ in range(3):
+            self.assertEqual([3, 3, 3], instrumented_query(3))
+
+        with self.assertRaises(ValueError):
+            instrumented_fail()
+
+        instrumented_denied()
+
+        snapshot = self.metrics.snapshot()["methods"]
+
+        self.assertEqual(3, snapshot["query"]["calls"])
+        self.assertEqual(0, snapshot["query"]["errors"])
+        self.assertEqual(6, snapshot["query"]["db_statements"])
+        self.assertEqual(len(json.dumps([3, 3, 3])), snapshot["query"]["payload_bytes_avg"])
+        self.assertEqual(1, snapshot["fail"]["errors"])
+        self.assertEqual(1, snapshot["denied"]["errors"])
+
+    def test_disabled(self):
+        self.metrics.enabled = False
+
+        self.metrics.instrument("noop", lambda: None)()
+
+        self.assertEqual({}, self.metrics.snapshot()["methods"])
+
+    def test_dump(self):
+        self.metrics.instrument("noop", lambda: None)()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, MetricsService.DUMP_FILE_NAME)
+
+            self.assertTrue(self.metrics.dump(path))
+
+            with open(path) as file:
+                self.assertEqual(1, json.load(file)["methods"]["noop"]["calls"])
+
+
+if __name__ == '__main__':
+    unittest.main()
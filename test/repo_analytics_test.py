@@ -0,0 +1,132 @@
+import tempfile
+import unittest
+from unittest import mock
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime
+from lib.repo.repo import RepoManager
+from lib.repo.analytics import CommitColumns, utc_offset_of
+from lib.app.service.repo_analytics import RepoAnalyticsService
+from benchmark.fixtures import generate_repo
+
+
+class CommitColumnsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):  # run before all test cases
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        generate_repo(cls.tmp_dir.name, n_commits=300, n_branches=3, merge_every=10, tag_every=100)
+
+        # parallel backend in-process, to read diff stats
+        cls.repo_manager = RepoManager(project_path=cls.tmp_dir.name, backend=RepoManager.BACKEND_PARALLEL,
+                                       workers=1, diff_stats=True)
+        cls.repo_manager.open_repo(cls.tmp_dir.name)
+
+        cls.records, context = cls.repo_manager.read_commits()
+        cls.membership = context.membership
+        cls.columns = CommitColumns(cls.records, refs=context.membership.refs, bits=context.membership.bits)
+
+    @classmethod
+    def tearDownClass(cls):  # run after all test cases
+        cls.repo_manager.repo.close()
+        cls.tmp_dir.cleanup()
+
+    def test_utc_offset(self):
+        self.assertEqual(7200, utc_offset_of("2024-01-31T10:00:00+02:00"))
+        self.assertEqual(-19800, utc_offset_of("2024-01-31T10:00:00-05:30"))
+        self.assertEqual(0, utc_offset_of("2024-01-31T10:00:00Z"))
+
+    def test_commits_per_author_per_day(self):
+        expected = Counter((r.author_email, datetime.fromisoformat(r.committed_at).date().isoformat()) for r in self.records)
+
+        result = self.columns.commits_per_author_per_day()
+
+        self.assertEqual(expected, Counter({(row["author_email"], day): n for row in result for day, n in row["days"].items()}))
+        self.assertEqual(len(self.records), sum(row["commits"] for row in result))
+
+        # range
+        dates = sorted(r.committed_date for r in self.records)
+        since, until = dates[50], dates[100]
+        result = self.columns.commits_per_author_per_day(since, until)
+
+        self.assertEqual(sum(1 for d in dates if since <= d <= until), sum(row["commits"] for row in result))
+
+    def test_branch_activity(self):
+        activity = {row["ref"]: row for row in self.columns.branch_activity()}
+
+        for ref in self.membership.refs:
+            records = [r for r in self.records if self.membership.contains(ref, r.hexsha)]
+
+            self.assertEqual(len(records), activity[ref]["commits"])
+            self.assertEqual(len(set(r.author_email for r in records)), activity[ref]["authors"])
+            self.assertEqual(sum(r.additions for r in records), activity[ref]["additions"])
+
+    def test_churn(self):
+        self.assertTrue(self.columns.has_stats)
+
+        churn = self.columns.churn(by="author")
+
+        self.assertTrue(churn["stats_available"])
+        self.assertEqual(sum(r.additions for r in self.records), sum(row["additions"] for row in churn["rows"]))
+        self.assertEqual(sum(r.deletions for r in self.records), sum(row["deletions"] for row in churn["rows"]))
+
+        by_day = {row["day"]: row for row in self.columns.churn(by="day")["rows"]}
+        day = datetime.fromisoformat(self.records[0].committed_at).date().isoformat()
+        self.assertEqual(sum(r.additions for r in self.records if r.committed_at.startswith(day)), by_day[day]["additions"])
+
+        without_stats = CommitColumns([replace(r, additions=None, deletions=None) for r in self.records], refs=[], bits={})
+        self.assertFalse(without_stats.churn()["stats_available"])
+
+        with self.assertRaises(ValueError):
+            self.columns.churn(by="month")
+
+    def test_hour_of_week(self):
+        expected = Counter()
+        for r in self.records:
+            committed_at = datetime.fromisoformat(r.committed_at)
+            expected[(committed_at.weekday(), committed_at.hour)] += 1
+
+        heatmap = self.columns.hour_of_week()
+
+        self.assertEqual(7, len(heatmap))
+        self.assertEqual(expected, Counter({(day, hour): n for day, row in enumerate(heatmap) for hour, n in enumerate(row) if n > 0}))
+
+        email = self.records[0].author_email
+        self.assertEqual(sum(1 for r in self.records if r.author_email == email),
+                         sum(map(sum, self.columns.hour_of_week(author_email=email))))
+
+
+class RepoAnalyticsServiceTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        generate_repo(self.tmp_dir.name, n_commits=50, n_branches=2)
+
+        self.repo_manager = RepoManager(project_path=self.tmp_dir.name)
+        self.repo_manager.open_repo(self.tmp_dir.name)
+
+        self.service = RepoAnalyticsService(repo_manager=lambda: self.repo_manager)
+
+    def tearDown(self):  # run after each test case
+        self.repo_manager.repo.close()
+        self.tmp_dir.cleanup()
+
+    def test_refs_are_not_read_on_each_request(self):
+        with mock.patch.object(self.repo_manager, "refs_snapshot", wraps=self.repo_manager.refs_snapshot) as refs:
+            first = self.service.columns()
+
+            for _ in range(5):
+                self.assertIs(first, self.service.branch_activity() and self.service.columns())
+
+            self.assertEqual(1, refs.call_count)
+
+            # refs changed by a fetch (repository is invalidated) are read immediately
+            self.repo_manager.repo.git.branch("feature-new", "main")
+            self.repo_manager.invalidate()
+
+            self.assertIsNot(first, self.service.columns())
+            self.assertEqual(2, refs.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from typing import List
+from lib.repo.repo import RepoManager
+from lib.repo.cache import CommitGraphCache
+from lib.settings.settings import SettingsBase
+from benchmark.fixtures import generate_repo
+
+
+class CountingRepoManager(RepoManager):
+    """
+    RepoManager which counts commits read from repository
+    """
+
+    read: int = 0
+
+    def iter_records(self, include: List[str], exclude: List[str]):
+        for record in super().iter_records(include, exclude):
+            self.read += 1
+            yield record
+
+
+class CommitGraphCacheTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name
+
+        generate_repo(self.path, n_commits=200, n_branches=3, merge_every=10, tag_every=50)
+        os.mkdir(os.path.join(self.path, SettingsBase.WORK_DIRECTORY_NAME))
+
+        self.repo_manager = self.open()
+
+    def tearDown(self):  # run after each test case
+        self.repo_manager.repo.close()
+        self.tmp_dir.cleanup()
+
+    def open(self) -> CountingRepoManager:
+        repo_manager = CountingRepoManager(project_path=self.path)
+        repo_manager.open_repo(self.path)
+
+        return repo_manager
+
+    def uncached_commits(self) -> dict:
+        repo_manager = RepoManager(project_path=self.path)
+        repo_manager.open_repo(self.path)
+        repo_manager.cache = None
+
+        commits = {node.hexsha: node.to_dict() for node in repo_manager.get_commits()}
+        repo_manager.repo.close()
+
+        return commits
+
+    def cached_commits(self) -> dict:
+        return {node.hexsha: node.to_dict() for node in self.repo_manager.get_commits()}
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.uncached_commits(), self.cached_commits())
+        self.assertEqual(200, self.repo_manager.read)
+        self.assertTrue(os.path.isfile(os.path.join(self.path, SettingsBase.WORK_DIRECTORY_NAME, CommitGraphCache.FILE_NAME)))
+
+        self.repo_manager.repo.index.commit("new commit")
+
+        self.assertEqual(self.uncached_commits(), self.cached_commits())
+        self.assertEqual(201, self.repo_manager.read)
+
+        # re-opened project uses persisted graph
+        self.repo_manager.repo.close()
+        self.repo_manager = self.open()
+
+        self.assertEqual(self.uncached_commits(), self.cached_commits())
+        self.assertEqual(0, self.repo_manager.read)
+
+    def test_rewritten_ref(self):
+        repo = self.repo_manager.repo
+        removed = repo.index.commit("pushed commit").hexsha
+
+        self.assertIn(removed, self.cached_commits())
+
+        repo.git.reset("--hard", "HEAD~1")      # like a force-push
+        repo.index.commit("rewritten commit")
+
+        commits = self.cached_commits()
+
+        self.assertNotIn(removed, commits)
+        self.assertEqual(self.uncached_commits(), commits)
+
+    def test_stable_cursor(self):
+        first = self.repo_manager.get_commits(limit=50)
+        second = self.repo_manager.get_commits(limit=50, before=first.next_cursor)
+
+        self.repo_manager.repo.index.commit("new commit")
+
+        self.assertEqual([node.hexsha for node in second.commits],
+                         [node.hexsha for node in self.repo_manager.get_commits(limit=50, before=first.next_cursor).commits])
+
+
+if __name__ == '__main__':
+    unittest.main()
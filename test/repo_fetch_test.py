@@ -0,0 +1,199 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import git
+from lib.repo.repo import RepoManager
+from lib.repo.fetcher import FetchScheduler
+from lib.settings.settings import SettingsBase
+from benchmark.fixtures import generate_repo
+
+
+class FetchSchedulerTest(unittest.TestCase):
+
+    def test_backoff(self):
+        def fail() -> bool:
+            raise RuntimeError("remote unreachable")
+
+        scheduler = FetchScheduler(fail, interval=10, max_interval=30)
+
+        self.assertFalse(scheduler.fetch_once())
+        self.assertEqual(FetchScheduler.FAILED, scheduler.state)
+        self.assertEqual(20, scheduler.delay)
+
+        scheduler.fetch_once()
+        self.assertEqual(30, scheduler.delay)       # capped
+        self.assertEqual("remote unreachable", scheduler.status()["last_error"])
+        self.assertIsNone(scheduler.status()["last_fetch_at"])
+
+        scheduler.fetch = lambda: False
+
+        self.assertTrue(scheduler.fetch_once())
+        self.assertEqual(10, scheduler.delay)
+        self.assertIsNotNone(scheduler.status()["last_fetch_at"])
+
+    def test_background(self):
+        calls = []
+
+        scheduler = FetchScheduler(lambda: calls.append(time.time()) is None, interval=60)
+        scheduler.start()
+
+        deadline = time.time() + 5
+        while len(calls) < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        scheduler.wake()        # second fetch is anticipated
+
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        scheduler.stop()
+
+        self.assertEqual(2, len(calls))
+        self.assertEqual(FetchScheduler.STOPPED, scheduler.status()["state"])
+        self.assertIsNotNone(scheduler.status()["last_change_at"])
+
+    def test_restart_after_join_timeout(self):
+        release = threading.Event()
+        threads = []
+
+        def fetch() -> bool:
+            threads.append(threading.current_thread())
+            if len(threads) == 1:
+                release.wait(5)         # first fetch is longer than JOIN_TIMEOUT
+
+            return False
+
+        scheduler = FetchScheduler(fetch, interval=60)
+
+        with mock.patch.object(FetchScheduler, "JOIN_TIMEOUT", 0.05):
+            scheduler.start()
+
+            deadline = time.time() + 5
+            while len(threads) < 1 and time.time() < deadline:
+                time.sleep(0.01)
+
+            scheduler.stop()        # join times out
+            scheduler.start()
+            release.set()
+
+            while len(threads) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+
+            threads[0].join(5)
+
+            self.assertFalse(threads[0].is_alive())         # old run exits instead of fetching again
+            self.assertTrue(scheduler.running)
+            self.assertEqual(FetchScheduler.IDLE, scheduler.state)
+
+            scheduler.stop()
+
+        self.assertEqual(2, len(threads))
+        self.assertNotEqual(threads[0], threads[1])
+
+
+class RepoFetchTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        upstream = os.path.join(self.tmp_dir.name, "upstream")
+        remote = os.path.join(self.tmp_dir.name, "remote.git")
+        self.path = os.path.join(self.tmp_dir.name, "project")
+
+        generate_repo(upstream, n_commits=50, n_branches=2)
+
+        self.upstream = git.Repo(upstream)
+        self.upstream.git.clone("--bare", upstream, remote)
+        self.upstream.create_remote("origin", remote)
+
+        git.Repo.clone_from(remote, self.path).close()
+        os.mkdir(os.path.join(self.path, SettingsBase.WORK_DIRECTORY_NAME))
+
+        self.repo_manager = RepoManager(project_path=self.path)
+        self.repo_manager.open_repo(self.path)
+
+    def tearDown(self):  # run after each test case
+        self.repo_manager.stop_fetching()
+        self.repo_manager.repo.close()
+        self.upstream.close()
+        self.tmp_dir.cleanup()
+
+    def test_fetch_changes_refs(self):
+        self.assertEqual(50, len(self.repo_manager.get_commits()))
+        self.assertFalse(self.repo_manager.fetch())
+
+        pushed = self.upstream.index.commit("pushed commit").hexsha
+        self.upstream.remote("origin").push("main")
+
+        self.assertTrue(self.repo_manager.fetch())
+        self.assertIsNone(self.repo_manager.get_branches_of(pushed))        # invalidated
+
+        commits = self.repo_manager.get_commits()
+
+        self.assertEqual(51, len(commits))
+        self.assertIn("origin/main", self.repo_manager.get_branches_of(pushed))
+
+    def test_fetch_waits_reading(self):
+        self.upstream.index.commit("pushed commit")
+        self.upstream.remote("origin").push("main")
+
+        reading = threading.Event()
+        release = threading.Event()
+        iter_records = self.repo_manager.iter_records
+
+        def slow_iter_records(*args):
+            reading.set()
+            release.wait(5)
+
+            yield from iter_records(*args)
+
+        results = []
+        generation = self.repo_manager.generation
+
+        with mock.patch.object(self.repo_manager, "iter_records", side_effect=slow_iter_records):
+            reader = threading.Thread(target=lambda: results.append(self.repo_manager.read_commits()))
+            reader.start()
+            reading.wait(5)
+
+            fetcher = threading.Thread(target=lambda: results.append(self.repo_manager.fetch()))
+            fetcher.start()
+            fetcher.join(0.5)
+
+            # fetch doesn't touch data of a reading in progress
+            self.assertTrue(fetcher.is_alive())
+            self.assertEqual(generation, self.repo_manager.generation)
+
+            release.set()
+            reader.join()
+            fetcher.join()
+
+        records, context = results[0]
+
+        self.assertEqual(50, len(records))
+        self.assertTrue(results[1])
+        self.assertEqual(generation + 1, self.repo_manager.generation)
+        self.assertIsNone(self.repo_manager.context)
+
+    def test_unreachable_remote(self):
+        self.repo_manager.repo.remote("origin").set_url(os.path.join(self.tmp_dir.name, "missing.git"))
+
+        self.repo_manager.start_fetching(interval=60)
+
+        deadline = time.time() + 10
+        while self.repo_manager.get_fetch_status()["failures"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        status = self.repo_manager.get_fetch_status()
+
+        self.assertEqual(FetchScheduler.FAILED, status["state"])
+        self.assertEqual(1, status["failures"])
+
+        # commits are read from local repository anyway
+        self.assertEqual(50, len(self.repo_manager.get_commits()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import threading
+import unittest
+from typing import Dict, List
+import lib.repo.repo as repo_module
+from lib.repo.repo import RepoManager
+from lib.repo.pool import RepoManagerPool
+from benchmark.fixtures import generate_repo
+
+
+class RepoManagerPoolTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        self.paths: List[str] = []
+        for i, (n_commits, n_branches) in enumerate(((300, 4), (200, 2), (100, 1))):
+            path = os.path.join(self.tmp_dir.name, f"repo{i}")
+            os.mkdir(path)
+            generate_repo(path, n_commits=n_commits, n_branches=n_branches, merge_every=10, tag_every=50, seed=i)
+
+            self.paths.append(path)
+
+        self.pool = RepoManagerPool(capacity=2)
+
+    def tearDown(self):  # run after each test case
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def commits_of(repo_manager: RepoManager) -> Dict[str, dict]:
+        return {node.hexsha: node.to_dict() for node in repo_manager.get_commits()}
+
+    def test_no_module_state(self):
+        for name in ("associations_commits_tags", "associations_commits_branches", "DEBUG_MODE"):
+            self.assertFalse(hasattr(repo_module, name))
+
+    def test_concurrent_repositories(self):
+        sequential = [self.commits_of(self.pool.get(path)) for path in self.paths[:2]]
+
+        # fresh managers, read at the same time by several threads (two of them on the same repository)
+        pool = RepoManagerPool(capacity=2)
+        results: Dict[int, Dict[str, dict]] = dict()
+
+        def read(i: int, path: str) -> None:
+            results[i] = self.commits_of(pool.get(path))
+
+        threads = [threading.Thread(target=read, args=(i, path)) for i, path in enumerate(self.paths[:2] + self.paths[:2])]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        pool.close()
+
+        self.assertEqual([sequential[0], sequential[1], sequential[0], sequential[1]], [results[i] for i in range(4)])
+        self.assertNotEqual(sequential[0].keys(), sequential[1].keys())
+
+        self.assertEqual({path: sequential[i] for i, path in enumerate(self.paths[:2])},
+                         self.pool.map(self.paths[:2], self.commits_of))
+
+    def test_lru(self):
+        first = self.pool.get(self.paths[0])
+        first.get_commits()
+        context = first.context
+
+        second = self.pool.get(self.paths[1])
+
+        self.assertIs(first, self.pool.get(self.paths[0]))     # warm
+        self.assertIs(context, first.context)
+
+        self.pool.get(self.paths[2])      # second is the least recently used
+
+        self.assertEqual([os.path.realpath(self.paths[0]), os.path.realpath(self.paths[2])], self.pool.paths())
+        self.assertIsNot(second, self.pool.get(self.paths[1]))
+
+        with self.assertRaises(ValueError):
+            self.pool.map(self.paths, self.commits_of)
+
+
+if __name__ == '__main__':
+    unittest.main()
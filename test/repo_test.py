@@ -0,0 +1,230 @@
+import tempfile
+import unittest
+from dataclasses import asdict
+from typing import List, Dict, Any
+from lib.repo.repo import RepoManager, RepoNode
+from lib.repo.log_reader import parse_log, LOG_FORMAT
+from lib.repo.ingest import ParallelReader
+from benchmark.fixtures import generate_repo
+
+
+class RepoManagerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):  # run once before all test cases
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+
+        generate_repo(cls.tmp_dir.name, n_commits=120, n_branches=3, merge_every=10, tag_every=50)
+
+        cls.repo_manager = RepoManager(project_path=cls.tmp_dir.name)
+        cls.repo_manager.open_repo(cls.tmp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):  # run once after all test cases
+        cls.repo_manager.repo.close()
+        cls.tmp_dir.cleanup()
+
+    def quadratic_commits(self) -> List[RepoNode]:
+        """
+        Commits elaborated searching children of each commit in all commits (old algorithm), used as reference
+        """
+
+        _, context = self.repo_manager.read_commits()
+
+        commits = sorted(self.repo_manager.repo.iter_commits('--all', reverse=True), key=lambda c: c.committed_datetime)
+
+        nodes = []
+        for commit in commits:
+            node = RepoNode.from_commit(commit, context=context)
+
+            for candidate in commits:
+                if node.hexsha in (parent.hexsha for parent in candidate.parents):
+                    node.add_child(RepoNode.from_commit(candidate, context=context))
+
+            nodes.append(node)
+
+        return nodes
+
+    def test_get_commits(self):
+        commits = self.repo_manager.get_commits()
+
+        self.assertEqual(120, len(commits))
+        self.assertEqual([node.to_dict() for node in self.quadratic_commits()], [node.to_dict() for node in commits])
+
+        merges = [node for node in commits if len(node.parents) == 2]
+        self.assertGreater(len(merges), 0)
+
+        self.assertEqual(asdict(merges[0]), merges[0].to_dict())
+
+    def test_backends(self):
+        git_log = list(self.repo_manager.iter_records(["--all"], []))
+
+        gitpython = RepoManager(project_path=self.tmp_dir.name, backend=RepoManager.BACKEND_GITPYTHON)
+        gitpython.open_repo(self.tmp_dir.name)
+
+        self.assertEqual(list(gitpython.iter_records(["--all"], [])), git_log)
+        self.assertEqual([node.to_dict() for node in gitpython.get_commits()],
+                         [node.to_dict() for node in self.repo_manager.get_commits()])
+
+        gitpython.repo.close()
+
+    def test_parallel_reader(self):
+        git_log = list(self.repo_manager.iter_records(["--all"], []))
+
+        # small chunks, so they are read by worker processes
+        records = list(ParallelReader(workers=2, chunk_size=30, with_stats=True).read(self.tmp_dir.name, ["--all"]))
+
+        self.assertEqual([record.hexsha for record in git_log], [record.hexsha for record in records])
+        self.assertEqual(git_log[0].message, records[0].message)
+
+        for record in records:
+            numstat = self.repo_manager.repo.git.log("-1", "--format=", "--numstat", record.hexsha).splitlines()
+
+            self.assertEqual(len(numstat), record.files_changed)
+            self.assertEqual(sum(int(line.split("\t")[0]) for line in numstat), record.additions)
+            self.assertEqual(sum(int(line.split("\t")[1]) for line in numstat), record.deletions)
+
+    def test_parse_log(self):
+        output: bytes = self.repo_manager.repo.git.log("-z", "--topo-order", f"--format={LOG_FORMAT}", "--all",
+                                                       stdout_as_string=False)
+
+        output += "\x1f".join((40 * "a", "", "é@email.com", "é", "2020-01-01T00:00:00+00:00", "0", "\x1fmessage é\n")).encode()
+
+        # chunks split entries and multi-byte characters
+        chunks = [output[i:i + 7] for i in range(0, len(output), 7)]
+        records = list(parse_log(chunks))
+
+        self.assertEqual(list(self.repo_manager.iter_records(["--all"], [])), records[:-1])
+        self.assertEqual("é", records[-1].author_name)
+        self.assertEqual("\x1fmessage é\n", records[-1].message)
+        self.assertEqual([], records[-1].parents)
+
+    def test_commits_pages(self):
+        history = list(reversed(self.repo_manager.get_commits()))      # newest first
+
+        hexshas: List[str] = []
+        cursor = None
+        while True:
+            page = self.repo_manager.get_commits(False, 25, cursor)
+            hexshas.extend(node.hexsha for node in page.commits)
+
+            if not page.has_more:
+                break
+
+            cursor = page.next_cursor
+
+        self.assertEqual([node.hexsha for node in history], hexshas)
+        self.assertIsNone(page.next_cursor)
+
+        # parents are linked also if they are in next page
+        first_page = self.repo_manager.get_commits(limit=25).to_dict()["commits"]
+        self.assertEqual([[p.hexsha for p in node.parents] for node in history[:25]],
+                         [[p["hexsha"] for p in node["parents"]] for node in first_page])
+
+    def test_filtered_commits(self):
+        history = list(reversed(self.repo_manager.get_commits()))
+
+        page = self.repo_manager.get_commits(branch="feature-1")
+        self.assertEqual([node.hexsha for node in history if "feature-1" in self.repo_manager.get_branches_of(node.hexsha)],
+                         [node.hexsha for node in page.commits])
+
+        author = history[0].author.email
+        page = self.repo_manager.get_commits(limit=5, author=author)
+        self.assertEqual([node.hexsha for node in history if node.author.email == author][:5],
+                         [node.hexsha for node in page.commits])
+
+        since, until = history[40].committed_at, history[10].committed_at
+        page = self.repo_manager.get_commits(since=since, until=until)
+        self.assertEqual([node.hexsha for node in history[10:41]], [node.hexsha for node in page.commits])
+
+    def test_branch_membership(self):
+        commits = self.repo_manager.get_commits()
+
+        # reference: commits of each branch, last branch wins
+        owners = dict()
+        for branch in self.repo_manager.get_branches():
+            for commit in self.repo_manager.repo.iter_commits(branch):
+                owners[commit.hexsha] = str(branch)
+
+        self.assertEqual(owners, {node.hexsha: node.of_branch for node in commits})
+
+        root = [node for node in commits if len(node.parents) == 0][0]
+        self.assertEqual(set(str(branch) for branch in self.repo_manager.get_branches()) | {"tags/v1", "tags/v2"},
+                         set(self.repo_manager.get_branches_of(root.hexsha)))
+
+        head = self.repo_manager.repo.heads["feature-0"].commit.hexsha
+        self.assertTrue(self.repo_manager.membership.contains("feature-0", head))
+        self.assertFalse(self.repo_manager.membership.contains("feature-1", head))
+
+    def test_flat_commits(self):
+        commits = self.repo_manager.get_commits()
+        graph = self.repo_manager.get_commits(flat=True)
+
+        self.assertEqual([node.hexsha for node in commits], graph.hexsha)
+
+        for row, node in enumerate(commits):
+            self.assertEqual(row, graph.index[node.hexsha])
+            self.assertEqual([p.hexsha for p in node.parents], [graph.hexsha[p] for p in graph.parents[row]])
+            self.assertEqual(asdict(node.author), asdict(graph.authors[graph.author[row]]))
+            self.assertEqual(node.of_branch, graph.branches[graph.branch[row]])
+            self.assertEqual(node.tag, graph.tag[row])
+
+        self.assertEqual(120, len(graph.to_dict()["hexsha"]))
+        self.assertEqual(set(graph.hexsha), set(self.repo_manager.get_tree(flat=True).hexsha))
+
+    @staticmethod
+    def expanded_hexsha(tree: Dict[str, Any]) -> List[str]:
+        """
+        Return hexsha of nodes of a tree dict which have children
+        """
+
+        hexsha, stack = [], [tree]
+        while len(stack) > 0:
+            node = stack.pop()
+
+            if node["children"] is not None:
+                hexsha.append(node["hexsha"])
+                stack.extend(node["children"])
+
+        return hexsha
+
+    def test_get_tree(self):
+        tree = self.repo_manager.get_tree()
+
+        self.assertEqual(0, len(tree.parents))
+        self.assertEqual(120, len(self.all_nodes(tree)))
+
+        # merge commits are emitted with their children only once
+        expanded = self.expanded_hexsha(tree.to_dict())
+        self.assertEqual(len(expanded), len(set(expanded)))
+
+    @staticmethod
+    def all_nodes(tree: RepoNode) -> List[RepoNode]:
+        nodes, stack, visited = [], [tree], set()
+        while len(stack) > 0:
+            node = stack.pop()
+
+            if id(node) not in visited:
+                visited.add(id(node))
+                nodes.append(node)
+                stack.extend(node.children or [])
+
+        return nodes
+
+    def test_get_tree_of_long_history(self):
+        with tempfile.TemporaryDirectory() as directory:
+            generate_repo(directory, n_commits=3000, n_branches=0)
+
+            repo_manager = RepoManager(project_path=directory)
+            repo_manager.open_repo(directory)
+
+            tree = repo_manager.get_tree()
+
+            self.assertEqual(3000, len(self.expanded_hexsha(tree.to_dict())) + 1)      # last commit has not children
+            self.assertEqual(1, len(RepoNode.search_node_by_hexsha(tree, repo_manager.repo.head.commit.hexsha)))
+
+            repo_manager.repo.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
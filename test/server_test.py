@@ -0,0 +1,151 @@
+import os
+import json
+import socket
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.client import HTTPConnection
+from types import SimpleNamespace
+from typing import Any, Tuple
+from lib.app.service.auth import login_required
+from lib.app.service.server import RpcServer
+from lib.utils.error import Errors
+
+
+class RpcServerTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.auth = SimpleNamespace(is_logged=lambda: False)
+        self.calls = []
+
+        def add(a: int, b: int = 0) -> int:
+            self.calls.append(threading.current_thread().name)
+            return a + b
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        self.methods = {
+            "add": add,
+            "fail": fail,
+            "secret": login_required(lambda: "secret", self.auth),
+        }
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        self.servers = []
+
+    def tearDown(self):  # run after each test case
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.stop(), self.loop).result()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.tmp_dir.cleanup()
+
+    def start(self, **kwargs) -> RpcServer:
+        server = RpcServer(self.methods, port=0, **kwargs)
+        asyncio.run_coroutine_threadsafe(server.start(), self.loop).result()
+
+        self.servers.append(server)
+
+        return server
+
+    def connect(self, server: RpcServer) -> HTTPConnection:
+        host, port = server.address.removeprefix("http://").split(":")
+
+        return HTTPConnection(host, int(port), timeout=5)
+
+    @staticmethod
+    def post(connection: HTTPConnection, alias: str, args: Any = None) -> Tuple[int, Any]:
+        body = json.dumps(args) if args is not None else ""
+        connection.request("POST", f"/rpc/{alias}", body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+
+        return response.status, json.loads(response.read())
+
+    def test_calls_on_keep_alive_connection(self):
+        connection = self.connect(self.start())
+
+        self.assertEqual((200, {"result": 3, "error": None}), self.post(connection, "add", [1, 2]))
+        sock = connection.sock
+
+        self.assertEqual((200, {"result": 5, "error": None}), self.post(connection, "add", {"a": 5}))
+        self.assertIs(sock, connection.sock)        # same connection
+
+        status, payload = self.post(connection, "missing")
+        self.assertEqual(404, status)
+        self.assertEqual(Errors.METHOD_NOT_FOUND.code, payload["error"]["code"])
+
+        status, payload = self.post(connection, "fail")
+        self.assertEqual(500, status)
+        self.assertEqual(Errors.CALL_FAILED.code, payload["error"]["code"])
+
+        connection.request("GET", "/rpc")
+        self.assertEqual(["add", "fail", "secret"], json.loads(connection.getresponse().read())["result"])
+
+        connection.close()
+
+        self.assertEqual(1, len(set(self.calls)))      # methods run in only one thread
+
+    def test_login_required(self):
+        connection = self.connect(self.start())
+
+        self.assertEqual((200, {"result": Errors.LOGIN_REQUIRE.to_dict(), "error": None}), self.post(connection, "secret"))
+
+        self.auth.is_logged = lambda: True
+
+        self.assertEqual((200, {"result": "secret", "error": None}), self.post(connection, "secret"))
+
+        connection.close()
+
+    def test_concurrent_connections(self):
+        server = self.start()
+        results = []
+
+        def client(n: int) -> None:
+            connection = self.connect(server)
+            results.extend(self.post(connection, "add", [n, i])[1]["result"] for i in range(20))
+            connection.close()
+
+        clients = [threading.Thread(target=client, args=(n,)) for n in range(8)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+
+        self.assertEqual(sorted(n + i for n in range(8) for i in range(20)), sorted(results))
+
+    def test_malformed_request(self):
+        connection = self.connect(self.start())
+
+        connection.request("POST", "/rpc/add", body="{not json")
+        response = connection.getresponse()
+
+        self.assertEqual(400, response.status)
+        self.assertEqual("close", response.getheader("Connection"))
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+    def test_unix_socket(self):
+        path = os.path.join(self.tmp_dir.name, "rpc.sock")
+        self.start(unix_socket=path)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(b"POST /rpc/add HTTP/1.1\r\nContent-Length: 6\r\nConnection: close\r\n\r\n[4, 5]")
+
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 OK"))
+        self.assertEqual({"result": 9, "error": None}, json.loads(response.split(b"\r\n\r\n", 1)[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import gc
+import os
+import json
+import tempfile
+import unittest
+import weakref
+from time import sleep
+from unittest import mock
+from lib.file.file_manager import FileManger
+from lib.settings.settings import SettingsManager
+
+
+class SettingsPersistenceTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, SettingsManager.SETTINGS_FILE_NAME)
+
+        patcher = mock.patch.object(SettingsManager, "settings_path", return_value=self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):  # run after each test case
+        self.tmp_dir.cleanup()
+
+    def stored(self) -> dict:
+        with open(self.path) as file:
+            return json.load(file)
+
+    def test_startup(self):
+        SettingsManager().flush()       # file is created
+
+        with mock.patch.object(FileManger, "read_json", wraps=FileManger.read_json) as read_json, \
+                mock.patch.object(FileManger, "write_json", wraps=FileManger.write_json) as write_json:
+            settings_manager = SettingsManager()
+            settings_manager.flush()
+
+        self.assertEqual(1, read_json.call_count)
+        self.assertEqual(0, write_json.call_count)      # nothing is changed
+        self.assertFalse(settings_manager.dirty)
+
+    def test_coalesced_writes(self):
+        settings_manager = SettingsManager()
+        settings_manager.flush()
+
+        with mock.patch.object(FileManger, "write_json", wraps=FileManger.write_json) as write_json:
+            settings_manager.update_settings({SettingsManager.KEY_VERBOSE: False, SettingsManager.KEY_APP_PORT: 9000,
+                                              SettingsManager.KEY_LOG_LEVEL: "warning"})
+            settings_manager.set(SettingsManager.KEY_APP_PORT, 9001)
+
+            self.assertTrue(settings_manager.dirty)
+            self.assertEqual(0, write_json.call_count)
+
+            sleep(SettingsManager.SAVE_DELAY * 4)
+
+            self.assertEqual(1, write_json.call_count)
+
+        self.assertFalse(settings_manager.dirty)
+        self.assertEqual(9001, self.stored()[SettingsManager.KEY_APP_PORT])
+        self.assertEqual(["settings.json"], os.listdir(self.tmp_dir.name))        # temporary file is renamed
+
+    def test_flush(self):
+        settings_manager = SettingsManager()
+        settings_manager.set(SettingsManager.KEY_APP_PORT, 9002)
+
+        settings_manager.flush()        # e.g. on close
+
+        self.assertEqual(9002, self.stored()[SettingsManager.KEY_APP_PORT])
+        self.assertEqual(SettingsManager.VALUE_BASE_APP_PORT, SettingsManager.BASE_SETTINGS[SettingsManager.KEY_APP_PORT])
+
+    def test_set_modified_in_place(self):
+        settings_manager = SettingsManager()
+        settings_manager.flush()
+
+        paths = settings_manager.get_setting_by_key(SettingsManager.KEY_PROJECT_PATHS_STORED)
+        paths.append("/tmp/project")
+
+        settings_manager.set(SettingsManager.KEY_PROJECT_PATHS_STORED, paths)     # same object, changed
+        self.assertTrue(settings_manager.dirty)
+
+        settings_manager.flush()
+
+        self.assertEqual(["/tmp/project"], self.stored()[SettingsManager.KEY_PROJECT_PATHS_STORED][-1:])
+
+    def test_flush_all_on_exit(self):
+        settings_manager = SettingsManager()
+        settings_manager.set(SettingsManager.KEY_APP_PORT, 9003)
+
+        discarded = weakref.ref(SettingsManager())
+        gc.collect()
+
+        self.assertIsNone(discarded())      # instances are not kept alive to be flushed on exit
+
+        SettingsManager.flush_all()         # registered once with atexit
+
+        self.assertEqual(9003, self.stored()[SettingsManager.KEY_APP_PORT])
+
+
+if __name__ == '__main__':
+    unittest.main()
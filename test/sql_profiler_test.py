@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from lib.db.db import DBManager
+from lib.db.profiler import SqlProfiler, normalize_sql, params_shape, rpc_scope
+
+
+class SqlProfilerTest(unittest.TestCase):
+
+    def setUp(self):  # run before each test case
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        self.db_manager = DBManager.creating_database(os.path.join(self.tmp_dir.name, "database.db"))
+        self.db_manager.generate_base_db_structure(strict=True)
+
+        self.profiler = self.db_manager.enable_profiler()
+
+    def tearDown(self):  # run after each test case
+        self.db_manager.close_connection()
+        self.tmp_dir.cleanup()
+
+    def test_normalize_sql(self):
+        self.assertEqual("Select * From user Where id = ? And name = ?",
+                         normalize_sql("Select *  From user\n Where id = 12 And name = 'it''s'"))
+        self.assertEqual("Select * From task Where id In (?...)",
+                         normalize_sql("Select * From task Where id In (1, 2, 3)"))
+        self.assertEqual("(int, str)", params_shape((1, "a")))
+        self.assertEqual("{id: int}", params_shape({"id": 1}))
+
+    def test_record_statements(self):
+        self.assertIsNot(sqlite3.Cursor, type(self.db_manager.cursor))
+
+        roles = self.db_manager.cursor.execute("Select * From role").fetchall()
+
+        report = self.profiler.report()
+        stats = [s for s in report["statements"] if s["sql"] == "Select * From role"][0]
+
+        self.assertEqual(1, stats["calls"])
+        self.assertEqual(len(roles), stats["rows"])
+        self.assertIn("SqlProfilerTest.test_record_statements", stats["callers"])
+
+    def test_n_plus_one_and_full_scan(self):
+        for _ in range(2):
+            with rpc_scope("task_labels"):
+                for task_id in range(SqlProfiler.N_PLUS_ONE_THRESHOLD):
+                    self.db_manager.cursor.execute("Select * From task_task_label_pivot Where task_id = ?", (task_id,)).fetchall()
+
+        report = self.profiler.report()
+
+        self.assertEqual([{"rpc": "task_labels", "sql": "Select * From task_task_label_pivot Where task_id = ?",
+                           "occurrences": 2}], report["n_plus_one"])
+        self.assertIn("Select * From task_task_label_pivot Where task_id = ?", report["full_scans"])
+
+        self.assertIn("probable N+1", SqlProfiler.format_report(report))
+
+    def test_connection_statements(self):
+        self.db_manager.connection.execute("Insert Into task_label (name, hex_color) Values (?, ?)", ("x", "#000000"))
+        self.db_manager.connection.executemany("Insert Into task_label (name, hex_color) Values (?, ?)",
+                                               [("y", "#000000"), ("z", "#000000")])
+        self.db_manager.connection.commit()
+
+        stats = [s for s in self.profiler.report()["statements"] if s["sql"].startswith("Insert Into task_label")][0]
+
+        self.assertEqual(2, stats["calls"])
+        self.assertEqual(3, stats["rows"])
+
+    def test_explain_is_not_counted(self):
+        before = self.db_manager.statements_count
+
+        # a new filtered shape: profiler runs also its EXPLAIN QUERY PLAN
+        self.db_manager.cursor.execute("Select * From task_label Where description = ?", ("x",)).fetchall()
+
+        self.assertIn("Select * From task_label Where description = ?", self.profiler.report()["full_scans"])
+        self.assertEqual(before + 1, self.db_manager.statements_count)
+
+    def test_disable(self):
+        self.db_manager.disable_profiler()
+
+        self.assertIsNone(self.db_manager.profiler)
+        self.assertIs(sqlite3.Cursor, type(self.db_manager.cursor))
+        self.assertIs(sqlite3.Connection, type(self.db_manager.connection))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+import unittest
+from unittest import mock
+
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_repository_is_not_imported(self):
+        # GitPython is imported only when repository is used (deferred startup phase or first repo RPC)
+        process = subprocess.run([sys.executable, "-c", "import sys, lib.app.app; print('git' in sys.modules)"],
+                                 cwd=ROOT, capture_output=True, text=True)
+
+        self.assertEqual(0, process.returncode, process.stderr)
+        self.assertEqual("False", process.stdout.strip())
+
+    def test_server_is_not_imported(self):
+        # headless server (and asyncio) is imported only by serve()
+        process = subprocess.run([sys.executable, "-c", "import sys, lib.app.app; print('lib.app.service.server' in sys.modules)"],
+                                 cwd=ROOT, capture_output=True, text=True)
+
+        self.assertEqual(0, process.returncode, process.stderr)
+        self.assertEqual("False", process.stdout.strip())
+
+    def test_close_does_not_wait_slow_deferred(self):
+        from lib.app.app import AppManager
+        from lib.app.service.project import ProjectManager
+        from lib.settings.settings import SettingsManager
+
+        loading = threading.Event()
+
+        def slow_repo_manager(project_manager):
+            loading.set()
+            time.sleep(3)
+
+            raise RuntimeError("repository is not available")
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(SettingsManager, "settings_path", return_value=os.path.join(tmp_dir, "settings.json")), \
+                mock.patch.object(ProjectManager, "repo_manager", property(slow_repo_manager)), \
+                mock.patch.object(AppManager, "DEFERRED_JOIN_TIMEOUT", 0.2):
+
+            app = AppManager(headless=True)
+            app.start_deferred()
+            loading.wait(5)
+
+            started_at = time.perf_counter()
+            app.close()
+
+            self.assertLess(time.perf_counter() - started_at, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()